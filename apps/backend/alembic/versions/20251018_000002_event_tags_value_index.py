@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20251018_000002"
+down_revision = "20250921_000001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_event_tags_value", "event_tags", ["value", "event_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_tags_value", table_name="event_tags")
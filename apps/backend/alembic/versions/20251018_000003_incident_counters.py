@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20251018_000003"
+down_revision = "20251018_000002"
+branch_labels = None
+depends_on = None
+
+incidents = sa.table(
+    "incidents",
+    sa.column("id", sa.UUID(as_uuid=True)),
+    sa.column("event_count", sa.Integer()),
+    sa.column("first_event_at", sa.DateTime(timezone=True)),
+    sa.column("sources", sa.JSON()),
+    sa.column("tag_counts", sa.JSON()),
+)
+events = sa.table(
+    "events",
+    sa.column("id", sa.UUID(as_uuid=True)),
+    sa.column("incident_id", sa.UUID(as_uuid=True)),
+    sa.column("source", sa.String()),
+    sa.column("occurred_at", sa.DateTime(timezone=True)),
+)
+event_tags = sa.table(
+    "event_tags",
+    sa.column("event_id", sa.UUID(as_uuid=True)),
+    sa.column("value", sa.String()),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("incidents") as batch:
+        batch.add_column(sa.Column("first_event_at", sa.DateTime(timezone=True), nullable=True))
+        batch.add_column(
+            sa.Column("event_count", sa.Integer(), server_default="0", nullable=False)
+        )
+        batch.add_column(sa.Column("sources", sa.JSON(), server_default="[]", nullable=False))
+        batch.add_column(sa.Column("tag_counts", sa.JSON(), server_default="{}", nullable=False))
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "CREATE INDEX ix_incidents_last_event_at "
+            "ON incidents (last_event_at DESC NULLS LAST, id)"
+        )
+    else:
+        op.create_index("ix_incidents_last_event_at", "incidents", ["last_event_at", "id"])
+
+    _backfill()
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    linked = events.c.incident_id == incidents.c.id
+    bind.execute(
+        incidents.update().values(
+            event_count=sa.select(sa.func.count(events.c.id)).where(linked).scalar_subquery(),
+            first_event_at=sa.select(sa.func.min(events.c.occurred_at))
+            .where(linked)
+            .scalar_subquery(),
+        )
+    )
+
+    sources: dict = {}
+    for incident_id, source in bind.execute(
+        sa.select(events.c.incident_id, events.c.source)
+        .where(events.c.incident_id.is_not(None))
+        .group_by(events.c.incident_id, events.c.source)
+    ):
+        sources.setdefault(incident_id, []).append(source)
+    tag_counts: dict = {}
+    for incident_id, tag, count in bind.execute(
+        sa.select(events.c.incident_id, event_tags.c.value, sa.func.count())
+        .select_from(events.join(event_tags, event_tags.c.event_id == events.c.id))
+        .where(events.c.incident_id.is_not(None))
+        .group_by(events.c.incident_id, event_tags.c.value)
+    ):
+        tag_counts.setdefault(incident_id, {})[tag] = count
+
+    for incident_id in sources.keys() | tag_counts.keys():
+        bind.execute(
+            incidents.update()
+            .where(incidents.c.id == incident_id)
+            .values(
+                sources=sorted(sources.get(incident_id, [])),
+                tag_counts=tag_counts.get(incident_id, {}),
+            )
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_incidents_last_event_at", table_name="incidents")
+    with op.batch_alter_table("incidents") as batch:
+        batch.drop_column("tag_counts")
+        batch.drop_column("sources")
+        batch.drop_column("event_count")
+        batch.drop_column("first_event_at")
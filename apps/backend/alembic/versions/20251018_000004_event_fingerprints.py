@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from datetime import timezone
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20251018_000004"
+down_revision = "20251018_000003"
+branch_labels = None
+depends_on = None
+
+events = sa.table(
+    "events",
+    sa.column("id", sa.UUID(as_uuid=True)),
+    sa.column("source", sa.String()),
+    sa.column("occurred_at", sa.DateTime(timezone=True)),
+    sa.column("received_at", sa.DateTime(timezone=True)),
+    sa.column("entity_type", sa.String()),
+    sa.column("entity_id", sa.String()),
+    sa.column("type", sa.String()),
+    sa.column("title", sa.String()),
+    sa.column("fingerprint", sa.String()),
+)
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("fingerprint", sa.String(length=96), nullable=True))
+    _backfill()
+    with op.batch_alter_table("events") as batch:
+        batch.create_unique_constraint("uq_events_fingerprint", ["fingerprint"])
+
+
+def _fingerprint(source, occurred_at, entity_type, entity_id, type_, title) -> str:
+    # Frozen copy of app.ingest.ces.Event.fingerprint over epoch milliseconds.
+    if occurred_at.tzinfo is None:
+        occurred_at = occurred_at.replace(tzinfo=timezone.utc)
+    core = {
+        "source": source,
+        "occurred_at": int(occurred_at.timestamp() * 1000),
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "type": type_,
+        "title": title,
+    }
+    digest = hashlib.sha256(json.dumps(core, sort_keys=True).encode()).hexdigest()
+    return f"{source}:{digest[:20]}"
+
+
+def _backfill() -> None:
+    """Fingerprint existing rows; only the earliest received copy of a duplicate keeps it.
+
+    Rows are read in primary-key pages and their fingerprints staged in a scratch table,
+    so memory stays bounded; one ranked ``UPDATE`` then picks the copy to keep.
+    """
+
+    bind = op.get_bind()
+    staged = op.create_table(
+        "_event_fingerprints",
+        sa.Column("event_id", sa.UUID(as_uuid=True), primary_key=True),
+        sa.Column("fingerprint", sa.String(length=96), nullable=False),
+    )
+    page = sa.select(
+        events.c.id,
+        events.c.source,
+        events.c.occurred_at,
+        events.c.entity_type,
+        events.c.entity_id,
+        events.c.type,
+        events.c.title,
+    ).order_by(events.c.id)
+    last_id = None
+    while True:
+        stmt = page if last_id is None else page.where(events.c.id > last_id)
+        rows = bind.execute(stmt.limit(BATCH_SIZE)).all()
+        if not rows:
+            break
+        bind.execute(
+            staged.insert(),
+            [
+                {"event_id": event_id, "fingerprint": _fingerprint(*core)}
+                for event_id, *core in rows
+            ],
+        )
+        last_id = rows[-1][0]
+
+    ranked = (
+        sa.select(
+            staged.c.event_id,
+            staged.c.fingerprint,
+            sa.func.row_number()
+            .over(
+                partition_by=staged.c.fingerprint,
+                order_by=(events.c.received_at, events.c.id),
+            )
+            .label("rank"),
+        )
+        .join(events, events.c.id == staged.c.event_id)
+        .subquery()
+    )
+    bind.execute(
+        events.update()
+        .where(events.c.id == ranked.c.event_id, ranked.c.rank == 1)
+        .values(fingerprint=ranked.c.fingerprint)
+    )
+    op.drop_table("_event_fingerprints")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("events") as batch:
+        batch.drop_constraint("uq_events_fingerprint", type_="unique")
+        batch.drop_column("fingerprint")
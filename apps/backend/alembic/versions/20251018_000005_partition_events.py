@@ -0,0 +1,272 @@
+"""Range-partition events, event_tags and event_metrics by occurred_at on Postgres.
+
+The child tables gain ``occurred_at`` (copied from their event) on every dialect, since a
+partition key has to be part of each primary key, unique constraint and foreign key. On
+Postgres the three tables are rebuilt as partitioned tables and the rows copied over;
+SQLite keeps its plain tables.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime, time, timedelta, timezone
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20251018_000005"
+down_revision = "20251018_000004"
+branch_labels = None
+depends_on = None
+
+# Frozen copies of ``app.db.partitions``; the migration must not change with the app.
+# Parent first: children reference ``events`` and are dropped before it.
+PARTITIONED_TABLES = ("events", "event_tags", "event_metrics")
+PARTITIONS_AHEAD = 4
+INTERVALS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+EVENT_COLUMNS = (
+    "id, source, occurred_at, received_at, entity_type, entity_id, type, title, body,"
+    " severity_raw, links, extras, features, score, explain, incident_id, fingerprint"
+)
+EVENT_INDEXES = {
+    "ix_events_incident_id": ("events", "incident_id"),
+    "ix_events_source": ("events", "source"),
+    "ix_events_occurred_at": ("events", "occurred_at"),
+    "ix_events_entity_window": ("events", "entity_type, entity_id, occurred_at"),
+    "ix_event_tags_event_id": ("event_tags", "event_id"),
+    "ix_event_tags_value": ("event_tags", "value, event_id"),
+    "ix_event_metrics_event_id": ("event_metrics", "event_id"),
+    "ix_event_metrics_name": ("event_metrics", "name"),
+}
+# Indexes backing constraints; their names are schema-wide, so they move aside with the table.
+CONSTRAINT_INDEXES = (
+    "events_pkey",
+    "uq_events_fingerprint",
+    "event_tags_pkey",
+    "uq_event_tags_value",
+    "event_metrics_pkey",
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        _partition()
+        return
+    for table in ("event_tags", "event_metrics"):
+        with op.batch_alter_table(table) as batch:
+            batch.add_column(sa.Column("occurred_at", sa.DateTime(timezone=True), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET occurred_at ="
+            f" (SELECT occurred_at FROM events WHERE events.id = {table}.event_id)"
+        )
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column("occurred_at", nullable=False)
+
+
+def _set_aside(suffix: str) -> None:
+    for table in PARTITIONED_TABLES:
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_{suffix}")
+    for index in EVENT_INDEXES:
+        op.execute(f"DROP INDEX {index}")
+    for index in CONSTRAINT_INDEXES:
+        op.execute(f"ALTER INDEX {index} RENAME TO {index}_{suffix}")
+
+
+def _create_indexes() -> None:
+    for index, (table, columns) in EVENT_INDEXES.items():
+        op.execute(f"CREATE INDEX {index} ON {table} ({columns})")
+
+
+def _range_start(moment: datetime, interval: str) -> datetime:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    day = moment.astimezone(timezone.utc).date()
+    if interval == "week":
+        day -= timedelta(days=day.weekday())
+    return datetime.combine(day, time(), tzinfo=timezone.utc)
+
+
+def _create_partitions(oldest: datetime, now: datetime) -> None:
+    """Create the ranges from ``oldest`` through ``PARTITIONS_AHEAD`` intervals after ``now``.
+
+    Names and bounds match ``app.db.partitions``, which maintains them from here on.
+    """
+
+    interval = os.getenv("EVENT_PARTITION_INTERVAL", "week").lower()
+    if interval not in INTERVALS:
+        raise ValueError(f"EVENT_PARTITION_INTERVAL must be one of {sorted(INTERVALS)}")
+    step = INTERVALS[interval]
+    lower = _range_start(oldest, interval)
+    while lower <= now + step * PARTITIONS_AHEAD:
+        upper = lower + step
+        for table in PARTITIONED_TABLES:
+            op.execute(
+                f"CREATE TABLE {table}_p{lower:%Y%m%d} PARTITION OF {table}"
+                f" FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+            )
+        lower = upper
+
+
+def _partition() -> None:
+    bind = op.get_bind()
+    _set_aside("unpartitioned")
+    op.execute(
+        """
+        CREATE TABLE events (
+            id UUID NOT NULL,
+            source VARCHAR(64) NOT NULL,
+            occurred_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            received_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            entity_type VARCHAR(64) NOT NULL,
+            entity_id VARCHAR(128) NOT NULL,
+            type VARCHAR(64) NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            body TEXT,
+            severity_raw VARCHAR(32),
+            links JSON NOT NULL,
+            extras JSON NOT NULL,
+            features JSON NOT NULL,
+            score FLOAT,
+            explain JSON NOT NULL,
+            incident_id UUID,
+            fingerprint VARCHAR(96),
+            CONSTRAINT events_pkey PRIMARY KEY (id, occurred_at),
+            CONSTRAINT events_incident_id_fkey FOREIGN KEY (incident_id) REFERENCES incidents (id),
+            CONSTRAINT uq_events_fingerprint UNIQUE (fingerprint, occurred_at)
+        ) PARTITION BY RANGE (occurred_at)
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE event_tags (
+            id INTEGER NOT NULL DEFAULT nextval('event_tags_id_seq'),
+            event_id UUID NOT NULL,
+            occurred_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            value VARCHAR(64) NOT NULL,
+            CONSTRAINT event_tags_pkey PRIMARY KEY (id, occurred_at),
+            CONSTRAINT uq_event_tags_value UNIQUE (event_id, value, occurred_at),
+            CONSTRAINT event_tags_event_id_fkey FOREIGN KEY (event_id, occurred_at)
+                REFERENCES events (id, occurred_at) ON DELETE CASCADE
+        ) PARTITION BY RANGE (occurred_at)
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE event_metrics (
+            id INTEGER NOT NULL DEFAULT nextval('event_metrics_id_seq'),
+            event_id UUID NOT NULL,
+            occurred_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            name VARCHAR(128) NOT NULL,
+            value FLOAT NOT NULL,
+            unit VARCHAR(32),
+            CONSTRAINT event_metrics_pkey PRIMARY KEY (id, occurred_at),
+            CONSTRAINT event_metrics_event_id_fkey FOREIGN KEY (event_id, occurred_at)
+                REFERENCES events (id, occurred_at) ON DELETE CASCADE
+        ) PARTITION BY RANGE (occurred_at)
+        """
+    )
+    _create_indexes()
+    for table in ("event_tags", "event_metrics"):
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+    now = datetime.now(timezone.utc)
+    oldest = bind.execute(sa.text("SELECT min(occurred_at) FROM events_unpartitioned")).scalar()
+    _create_partitions(oldest or now, now)
+    for table in PARTITIONED_TABLES:
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+    op.execute(
+        f"INSERT INTO events ({EVENT_COLUMNS}) SELECT {EVENT_COLUMNS} FROM events_unpartitioned"
+    )
+    op.execute(
+        "INSERT INTO event_tags (id, event_id, occurred_at, value)"
+        " SELECT t.id, t.event_id, e.occurred_at, t.value FROM event_tags_unpartitioned t"
+        " JOIN events_unpartitioned e ON e.id = t.event_id"
+    )
+    op.execute(
+        "INSERT INTO event_metrics (id, event_id, occurred_at, name, value, unit)"
+        " SELECT m.id, m.event_id, e.occurred_at, m.name, m.value, m.unit"
+        " FROM event_metrics_unpartitioned m JOIN events_unpartitioned e ON e.id = m.event_id"
+    )
+    for table in reversed(PARTITIONED_TABLES):
+        op.execute(f"DROP TABLE {table}_unpartitioned")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        for table in ("event_metrics", "event_tags"):
+            with op.batch_alter_table(table) as batch:
+                batch.drop_column("occurred_at")
+        return
+
+    _set_aside("partitioned")
+    op.execute(
+        """
+        CREATE TABLE events (
+            id UUID NOT NULL,
+            source VARCHAR(64) NOT NULL,
+            occurred_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            received_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            entity_type VARCHAR(64) NOT NULL,
+            entity_id VARCHAR(128) NOT NULL,
+            type VARCHAR(64) NOT NULL,
+            title VARCHAR(255) NOT NULL,
+            body TEXT,
+            severity_raw VARCHAR(32),
+            links JSON NOT NULL,
+            extras JSON NOT NULL,
+            features JSON NOT NULL,
+            score FLOAT,
+            explain JSON NOT NULL,
+            incident_id UUID,
+            fingerprint VARCHAR(96),
+            CONSTRAINT events_pkey PRIMARY KEY (id),
+            CONSTRAINT events_incident_id_fkey FOREIGN KEY (incident_id) REFERENCES incidents (id),
+            CONSTRAINT uq_events_fingerprint UNIQUE (fingerprint)
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE event_tags (
+            id INTEGER NOT NULL DEFAULT nextval('event_tags_id_seq'),
+            event_id UUID NOT NULL,
+            value VARCHAR(64) NOT NULL,
+            CONSTRAINT event_tags_pkey PRIMARY KEY (id),
+            CONSTRAINT event_tags_event_id_fkey FOREIGN KEY (event_id)
+                REFERENCES events (id) ON DELETE CASCADE,
+            CONSTRAINT uq_event_tags_value UNIQUE (event_id, value)
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TABLE event_metrics (
+            id INTEGER NOT NULL DEFAULT nextval('event_metrics_id_seq'),
+            event_id UUID NOT NULL,
+            name VARCHAR(128) NOT NULL,
+            value FLOAT NOT NULL,
+            unit VARCHAR(32),
+            CONSTRAINT event_metrics_pkey PRIMARY KEY (id),
+            CONSTRAINT event_metrics_event_id_fkey FOREIGN KEY (event_id)
+                REFERENCES events (id) ON DELETE CASCADE
+        )
+        """
+    )
+    _create_indexes()
+    for table in ("event_tags", "event_metrics"):
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    op.execute(
+        f"INSERT INTO events ({EVENT_COLUMNS}) SELECT {EVENT_COLUMNS} FROM events_partitioned"
+    )
+    op.execute(
+        "INSERT INTO event_tags (id, event_id, value)"
+        " SELECT id, event_id, value FROM event_tags_partitioned"
+    )
+    op.execute(
+        "INSERT INTO event_metrics (id, event_id, name, value, unit)"
+        " SELECT id, event_id, name, value, unit FROM event_metrics_partitioned"
+    )
+    for table in reversed(PARTITIONED_TABLES):
+        op.execute(f"DROP TABLE {table}_partitioned")
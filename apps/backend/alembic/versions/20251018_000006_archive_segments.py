@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20251018_000006"
+down_revision = "20251018_000005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "archive_segments",
+        sa.Column("id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("key", sa.String(length=512), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("source", sa.String(length=64), nullable=False),
+        sa.Column("row_count", sa.Integer(), nullable=False),
+        sa.Column("min_occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("max_occurred_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("key"),
+    )
+    op.create_index("ix_archive_segments_source", "archive_segments", ["source"], unique=False)
+    op.create_index(
+        "ix_archive_segments_range",
+        "archive_segments",
+        ["max_occurred_at", "min_occurred_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_archive_segments_range", table_name="archive_segments")
+    op.drop_index("ix_archive_segments_source", table_name="archive_segments")
+    op.drop_table("archive_segments")
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20251018_000008"
+down_revision = "20251018_000007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "digests",
+        sa.Column("id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("user_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("period", sa.String(length=16), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("event_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("max_score", sa.Float(), nullable=True),
+        sa.Column("top_events", sa.JSON(), nullable=False),
+        sa.Column("incidents", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "period", "bucket_start", name="uq_digests_bucket"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("digests")
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20251018_000010"
+down_revision = "20251018_000009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scoring_models",
+        sa.Column("version", sa.String(length=64), nullable=False),
+        sa.Column("definition", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("version"),
+    )
+    op.create_index("ix_scoring_models_status", "scoring_models", ["status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_scoring_models_status", table_name="scoring_models")
+    op.drop_table("scoring_models")
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "20251018_000011"
+down_revision = "20251018_000010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "feedback",
+        sa.Column("id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("event_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("source", sa.String(length=64), nullable=False),
+        sa.Column("score", sa.Float(), nullable=True),
+        sa.Column("outcome", sa.String(length=16), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("event_id"),
+    )
+    op.create_index("ix_feedback_source", "feedback", ["source"])
+    op.create_table(
+        "calibrators",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("source", sa.String(length=64), nullable=False),
+        sa.Column("a", sa.Float(), nullable=False),
+        sa.Column("b", sa.Float(), nullable=False),
+        sa.Column("samples", sa.Integer(), nullable=False),
+        sa.Column("positives", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("version", "source", name="uq_calibrators_version_source"),
+    )
+    op.create_index("ix_calibrators_version", "calibrators", ["version"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_calibrators_version", table_name="calibrators")
+    op.drop_table("calibrators")
+    op.drop_index("ix_feedback_source", table_name="feedback")
+    op.drop_table("feedback")
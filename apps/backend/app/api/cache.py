@@ -0,0 +1,148 @@
+"""Redis response cache for the event and incident listings.
+
+An entry is keyed by the route, its normalized query parameters, and the current
+generation of every scope the filters pin down: ``events:source:<source>``,
+``events:entity:<type>:<id>`` and ``events:incident:<id>``, or the global ``events`` feed
+when none of them is set (and always ``incidents`` for the incident list). Ingest bumps
+the generations of the scopes it wrote to once its transaction commits, so entries for
+unrelated sources and entities stay warm and stale entries are simply never read again.
+
+``RESPONSE_CACHE_TTL`` (seconds, default 0 = off) bounds how long an entry lives, which
+also covers writes that bypass ingest (archiving, retention). A request sent with
+``Cache-Control: no-cache`` skips the lookup and stores a fresh entry. Redis errors are
+counted and the request is served uncached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from collections.abc import Iterable, Mapping
+from typing import Any, cast
+from uuid import UUID
+
+import redis
+from pydantic_core import to_json
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+
+from app.db import Event, Incident
+from app.db.hooks import after_commit
+from app.db.redis import get_redis_client
+from app.telemetry import record_cache
+
+GENERATION_PREFIX = "signalos:cache:gen:"
+ENTRY_PREFIX = "signalos:cache:entry:"
+GENERATION_TTL = 7 * 24 * 3600  # must outlive any entry built on the generation
+
+logger = logging.getLogger(__name__)
+
+
+def cache_ttl() -> int:
+    return int(os.getenv("RESPONSE_CACHE_TTL", "0"))
+
+
+def event_scopes(
+    source: str | None = None,
+    entity_type: str | None = None,
+    entity_id: str | None = None,
+    incident_id: UUID | str | None = None,
+) -> list[str]:
+    """Scopes whose writes can change a listing with these filters."""
+
+    scopes = []
+    if source is not None:
+        scopes.append(f"events:source:{source}")
+    if entity_type is not None and entity_id is not None:
+        scopes.append(f"events:entity:{entity_type}:{entity_id}")
+    if incident_id is not None:
+        scopes.append(f"events:incident:{incident_id}")
+    return scopes or ["events"]
+
+
+def skips_cache(cache_control: str | None) -> bool:
+    return cache_control is not None and "no-cache" in cache_control.lower()
+
+
+class ResponseCache:
+    def __init__(self, client: redis.Redis, route: str, ttl: int) -> None:
+        self.client = client
+        self.route = route
+        self.ttl = ttl
+        self.key: str | None = None
+
+    def lookup(
+        self, params: Mapping[str, Any], scopes: Iterable[str], bypass: bool = False
+    ) -> str | None:
+        """Resolve the entry key for the current generations and return a cached body."""
+
+        try:
+            scopes = sorted(set(scopes))
+            generations = self.client.mget([GENERATION_PREFIX + scope for scope in scopes])
+            digest = hashlib.sha256(
+                to_json([sorted(params.items()), scopes, generations])
+            ).hexdigest()
+            self.key = f"{ENTRY_PREFIX}{self.route}:{digest}"
+            if bypass:
+                record_cache(self.route, "bypass")
+                return None
+            body = cast(str | None, self.client.get(self.key))
+        except redis.RedisError:
+            logger.warning("response cache lookup failed", exc_info=True)
+            record_cache(self.route, "error")
+            self.key = None
+            return None
+        record_cache(self.route, "miss" if body is None else "hit")
+        return body
+
+    def store(self, body: bytes | str) -> None:
+        if self.key is None:
+            return
+        try:
+            self.client.set(self.key, body, ex=self.ttl)
+        except redis.RedisError:
+            logger.warning("response cache store failed", exc_info=True)
+            record_cache(self.route, "error")
+
+
+def invalidate_on_commit(session: Session) -> None:
+    """Bump the scopes of the pending event and incident writes once ``session`` commits.
+
+    Call before flushing, while new and modified rows are still pending.
+    """
+
+    if cache_ttl() <= 0:
+        return
+    scopes: set[str] = set()
+    for row in (*session.new, *session.dirty):
+        if isinstance(row, Incident):
+            scopes.add("incidents")
+        elif isinstance(row, Event):
+            # Only loaded attributes: reading others here would emit a query mid-ingest.
+            values = inspect(row).dict
+            scopes.add("events")
+            scopes.update(
+                event_scopes(
+                    values.get("source"),
+                    values.get("entity_type"),
+                    values.get("entity_id"),
+                    values.get("incident_id"),
+                )
+            )
+            history = inspect(row).attrs.incident_id.history
+            scopes.update(f"events:incident:{value}" for value in history.deleted if value)
+    if scopes:
+        after_commit(session, lambda: _bump(scopes), blocking=True)
+
+
+def _bump(scopes: Iterable[str]) -> None:
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        for scope in scopes:
+            pipe.incr(GENERATION_PREFIX + scope)
+            pipe.expire(GENERATION_PREFIX + scope, GENERATION_TTL)
+        pipe.execute()
+    except redis.RedisError:
+        logger.warning("response cache invalidation failed", exc_info=True)
+        record_cache("invalidate", "error")
@@ -0,0 +1,291 @@
+"""Push feed of new events and incident changes for ``/events/stream``.
+
+Ingest hands its new events and touched incidents to ``publish_on_commit``; once the
+transaction commits they go to the in-process ``LiveHub``, which fans each message out
+to the subscribers whose filters match. With ``LIVE_FEED_BRIDGE=redis`` messages are
+published on ``LIVE_CHANNEL`` instead and every API worker relays the channel into its
+own hub, so events ingested by other workers or by stream consumers reach everyone.
+
+Each subscriber has a bounded queue (``LIVE_QUEUE_SIZE``, default 256). When a slow
+consumer's queue is full the oldest message is dropped, and the next message it
+receives is preceded by ``{"type": "dropped", "count": n}`` so it can resync from
+``GET /events``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections.abc import AsyncGenerator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import redis
+from fastapi import WebSocket
+from pydantic_core import from_json, to_json
+from sqlalchemy.orm import Session
+
+from app.db import Event, Incident
+from app.db.hooks import after_commit
+from app.db.redis import get_redis_client, get_redis_url
+from app.telemetry import record_live
+
+LIVE_CHANNEL = "signalos:live"
+DEFAULT_QUEUE_SIZE = 256
+RECONNECT_SECONDS = 1.0
+HEARTBEAT_SECONDS = 15.0
+
+logger = logging.getLogger(__name__)
+
+Message = dict[str, Any]
+
+
+def bridge_enabled() -> bool:
+    return os.getenv("LIVE_FEED_BRIDGE", "").lower() == "redis"
+
+
+@dataclass(frozen=True)
+class FeedFilter:
+    """Subscriber filters; incidents match on ``source`` and ``min_score`` only."""
+
+    source: str | None = None
+    entity_type: str | None = None
+    entity_id: str | None = None
+    tag: str | None = None
+    min_score: float | None = None
+
+    def matches(self, message: Message) -> bool:
+        if message["type"] == "incident":
+            incident = message["incident"]
+            if self.source is not None and self.source not in incident["sources"]:
+                return False
+            return self.min_score is None or (incident.get("score") or 0.0) >= self.min_score
+        event = message["event"]
+        entity = event["entity"]
+        return (
+            (self.source is None or event["source"] == self.source)
+            and (self.entity_type is None or entity["type"] == self.entity_type)
+            and (self.entity_id is None or entity["id"] == self.entity_id)
+            and (self.tag is None or self.tag in event["tags"])
+            and (self.min_score is None or (event.get("score") or 0.0) >= self.min_score)
+        )
+
+
+class Subscription:
+    def __init__(self, filters: FeedFilter, maxsize: int) -> None:
+        self.filters = filters
+        self.queue: asyncio.Queue[Message] = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def offer(self, message: Message) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+            record_live("dropped")
+        self.queue.put_nowait(message)
+
+    async def next(self) -> list[Message]:
+        """The next message, preceded by a ``dropped`` notice if any were lost."""
+
+        message = await self.queue.get()
+        record_live("delivered")
+        if not self.dropped:
+            return [message]
+        notice = {"type": "dropped", "count": self.dropped}
+        self.dropped = 0
+        return [notice, message]
+
+
+class LiveHub:
+    """Fans messages out to subscribers on the event loop the hub was started on."""
+
+    def __init__(self) -> None:
+        self.subscriptions: set[Subscription] = set()
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._relay: asyncio.Task[None] | None = None
+
+    async def start(self, client: Any | None = None) -> None:
+        """Bind to the running loop; relay ``LIVE_CHANNEL`` from ``client`` when bridged."""
+
+        self.loop = asyncio.get_running_loop()
+        if client is None and bridge_enabled():
+            import redis.asyncio
+
+            client = redis.asyncio.Redis.from_url(get_redis_url())
+        if client is not None:
+            self._relay = asyncio.create_task(self._run_relay(client))
+
+    async def stop(self) -> None:
+        if self._relay is not None:
+            self._relay.cancel()
+            try:
+                await self._relay
+            except asyncio.CancelledError:
+                pass
+            self._relay = None
+        self.loop = None
+
+    def subscribe(self, filters: FeedFilter) -> Subscription:
+        size = int(os.getenv("LIVE_QUEUE_SIZE", DEFAULT_QUEUE_SIZE))
+        subscription = Subscription(filters, size)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.subscriptions.discard(subscription)
+
+    def publish(self, messages: Sequence[Message]) -> None:
+        """Deliver ``messages`` from any thread."""
+
+        loop = self.loop
+        if loop is None or loop.is_closed() or not self.subscriptions:
+            return
+        loop.call_soon_threadsafe(self._fan_out, messages)
+
+    def _fan_out(self, messages: Sequence[Message]) -> None:
+        for subscription in list(self.subscriptions):
+            for message in messages:
+                if subscription.filters.matches(message):
+                    subscription.offer(message)
+
+    async def _run_relay(self, client: Any) -> None:
+        while True:
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(LIVE_CHANNEL)
+                    async for item in pubsub.listen():
+                        if item["type"] == "message":
+                            self._fan_out(from_json(item["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("live feed relay lost its Redis subscription", exc_info=True)
+                await asyncio.sleep(RECONNECT_SECONDS)
+
+
+hub = LiveHub()
+
+
+async def sse_frames(
+    filters: FeedFilter, heartbeat: float = HEARTBEAT_SECONDS
+) -> AsyncGenerator[bytes, None]:
+    """Server-Sent Events for a new subscription, with comment heartbeats while idle.
+
+    A heartbeat does not cancel the pending read: cancelling it could lose a message
+    taken off the queue just as the timeout fired.
+    """
+
+    subscription = hub.subscribe(filters)
+    read: asyncio.Task[list[Message]] | None = None
+    try:
+        yield b": connected\n\n"
+        while True:
+            if read is None:
+                read = asyncio.ensure_future(subscription.next())
+            done, _ = await asyncio.wait({read}, timeout=heartbeat)
+            if not done:
+                yield b": keepalive\n\n"
+                continue
+            messages, read = read.result(), None
+            for message in messages:
+                yield b"event: %s\ndata: %s\n\n" % (message["type"].encode(), to_json(message))
+    finally:
+        if read is not None:
+            read.cancel()
+        hub.unsubscribe(subscription)
+
+
+async def serve_websocket(websocket: WebSocket, filters: FeedFilter) -> None:
+    """Send matching messages as JSON text frames until the client goes away."""
+
+    subscription = hub.subscribe(filters)
+
+    async def pump() -> None:
+        while True:
+            for message in await subscription.next():
+                await websocket.send_text(to_json(message).decode())
+
+    sender = asyncio.create_task(pump())
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        sender.cancel()
+        hub.unsubscribe(subscription)
+
+
+def publish_on_commit(session: Session) -> None:
+    """Publish the pending new events and touched incidents once ``session`` commits.
+
+    Call before flushing, while new and modified rows are still pending.
+    """
+
+    if not bridge_enabled() and not hub.subscriptions:
+        return
+    messages: list[Message] = [
+        {"type": "event", "event": _event_message(row)}
+        for row in session.new
+        if isinstance(row, Event) and not _held_back(row)
+    ]
+    messages.extend(
+        {"type": "incident", "incident": _incident_message(row)}
+        for row in (*session.new, *session.dirty)
+        if isinstance(row, Incident)
+    )
+    if messages:
+        after_commit(session, lambda: _publish(messages), blocking=True)
+
+
+def _publish(messages: list[Message]) -> None:
+    if not bridge_enabled():
+        hub.publish(messages)
+        return
+    try:
+        get_redis_client().publish(LIVE_CHANNEL, to_json(messages))
+    except redis.RedisError:
+        logger.warning("live feed publish failed", exc_info=True)
+        record_live("error")
+
+
+def _held_back(row: Event) -> bool:
+    """Storm control routed the event to the digest instead of pushing it."""
+
+    delivery = (row.explain or {}).get("delivery", {})
+    return "storm" in delivery and delivery.get("route") == "digest"
+
+
+def _event_message(row: Event) -> Message:
+    message = {
+        "id": row.id,
+        "source": row.source,
+        "occurred_at": row.occurred_at,
+        "entity": {"type": row.entity_type, "id": row.entity_id},
+        "type": row.type,
+        "title": row.title,
+        "severity_raw": row.severity_raw,
+        "tags": row.tags,
+        "score": row.score,
+        "incident_id": row.incident_id,
+    }
+    return _json_ready(message)
+
+
+def _incident_message(incident: Incident) -> Message:
+    message = {
+        "id": incident.id,
+        "status": incident.status,
+        "score": incident.score,
+        "first_event_at": incident.first_event_at,
+        "last_event_at": incident.last_event_at,
+        "event_count": incident.event_count,
+        "sources": list(incident.sources or []),
+        "top_tags": incident.top_tags(),
+    }
+    return _json_ready(message)
+
+
+def _json_ready(message: Message) -> Message:
+    """Same shape whether delivered locally or relayed through Redis."""
+
+    return from_json(to_json({key: value for key, value in message.items() if value is not None}))
@@ -0,0 +1,62 @@
+"""Keyset cursors and optional totals shared by the list endpoints."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+
+class TotalMode(str, Enum):
+    """How ``total`` is computed: skipped, exact ``count(*)``, or a planner estimate."""
+
+    none = "false"
+    exact = "true"
+    estimate = "estimate"
+
+
+def encode_cursor(sort_value: datetime | None, row_id: UUID) -> str:
+    payload = [sort_value.isoformat() if sort_value is not None else None, str(row_id)]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            datetime.fromisoformat(sort_value) if sort_value is not None else None,
+            UUID(row_id),
+        )
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from exc
+
+
+def count_rows(session: Session, stmt: Select[Any], mode: TotalMode) -> int | None:
+    """Return the total for ``stmt`` (a filtered, unpaginated select) according to ``mode``.
+
+    Estimates come from the Postgres planner; other databases fall back to an exact count.
+    """
+
+    if mode is TotalMode.none:
+        return None
+    bind = session.get_bind()
+    if mode is TotalMode.estimate and bind.dialect.name == "postgresql":
+        compiled = stmt.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+        # Run as driver SQL: text() would read ":name" inside the inlined literals as binds.
+        explain = f"EXPLAIN (FORMAT JSON) {compiled}"
+        plan = session.connection().exec_driver_sql(explain).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    count_stmt = select(func.count()).select_from(stmt.order_by(None).subquery())
+    return session.execute(count_stmt).scalar_one()
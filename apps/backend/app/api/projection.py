@@ -0,0 +1,115 @@
+"""Sparse fieldsets (``fields=id,title,score``) for the event list.
+
+Only the requested columns are selected, tags and metrics are fetched with one query each
+when asked for, and items are built as plain dicts that are serialized without being
+validated as ``EventResponse``. ``id`` and ``occurred_at`` are always selected for the
+keyset cursor but only returned when requested.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import Any
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement
+
+from app.api.schemas import EventResponse
+from app.db import Event, EventMetric, EventTag
+
+EVENT_FIELDS = tuple(EventResponse.model_fields)
+PAYLOAD_FIELDS = {"body", "links", "extras"}
+_RELATED = {"tags", "metrics"}
+
+
+def parse_fields(raw: str | None) -> tuple[str, ...] | None:
+    """Requested field names in response order, or ``None`` for the full event."""
+
+    if raw is None:
+        return None
+    wanted = {name.strip() for name in raw.split(",") if name.strip()}
+    unknown = sorted(wanted - set(EVENT_FIELDS))
+    if unknown or not wanted:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}" if unknown else "No fields requested",
+        )
+    if wanted & PAYLOAD_FIELDS:
+        # Offloaded payloads come back empty; the reference tells clients where to look.
+        wanted.add("payload_ref")
+    return tuple(name for name in EVENT_FIELDS if name in wanted)
+
+
+def projected_columns(fields: Sequence[str]) -> list[ColumnElement[Any]]:
+    columns: dict[str, Any] = {"id": Event.id, "occurred_at": Event.occurred_at}
+    for name in fields:
+        if name == "entity":
+            columns["entity_type"] = Event.entity_type
+            columns["entity_id"] = Event.entity_id
+        elif name not in _RELATED:
+            columns[name] = getattr(Event, name)
+    return list(columns.values())
+
+
+async def project_rows(
+    session: AsyncSession, items: Sequence[Any], fields: Sequence[str]
+) -> list[dict[str, Any]]:
+    return await session.run_sync(project_items, items, fields)
+
+
+def project_items(
+    session: Session, items: Sequence[Any], fields: Sequence[str]
+) -> list[dict[str, Any]]:
+    """Build response dicts from projected rows and archived records (plain dicts)."""
+
+    rows = [item for item in items if not isinstance(item, dict)]
+    tags: dict[Any, list[str]] = defaultdict(list)
+    metrics: dict[Any, list[dict[str, Any]]] = defaultdict(list)
+    if rows and _RELATED & set(fields):
+        ids = [row.id for row in rows]
+        # The occurred_at bounds let Postgres prune the child partitions.
+        window = (min(row.occurred_at for row in rows), max(row.occurred_at for row in rows))
+        if "tags" in fields:
+            for event_id, value in session.execute(
+                select(EventTag.event_id, EventTag.value)
+                .where(EventTag.event_id.in_(ids), EventTag.occurred_at.between(*window))
+                .order_by(EventTag.id)
+            ):
+                tags[event_id].append(value)
+        if "metrics" in fields:
+            for event_id, name, value, unit in session.execute(
+                select(EventMetric.event_id, EventMetric.name, EventMetric.value, EventMetric.unit)
+                .where(EventMetric.event_id.in_(ids), EventMetric.occurred_at.between(*window))
+                .order_by(EventMetric.id)
+            ):
+                metric = {"name": name, "value": value}
+                if unit is not None:
+                    metric["unit"] = unit
+                metrics[event_id].append(metric)
+
+    projected = []
+    for item in items:
+        if isinstance(item, dict):
+            values = {name: item.get(name) for name in fields}
+            if "metrics" in values:
+                values["metrics"] = [
+                    {key: value for key, value in metric.items() if value is not None}
+                    for metric in values["metrics"] or []
+                ]
+        else:
+            values = {}
+            for name in fields:
+                if name == "entity":
+                    values[name] = {"type": item.entity_type, "id": item.entity_id}
+                elif name == "tags":
+                    values[name] = tags.get(item.id, [])
+                elif name == "metrics":
+                    values[name] = metrics.get(item.id, [])
+                else:
+                    values[name] = getattr(item, name)
+        projected.append({name: value for name, value in values.items() if value is not None})
+    return projected
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Literal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas import DigestResponse
+from app.db import Digest
+from app.db.session import get_async_session
+from app.ingest.digests import NO_USER, bucket_start
+from app.timeutil import utc
+
+router = APIRouter()
+
+
+@router.get("/{period}", response_model=DigestResponse, response_model_exclude_none=True)
+async def get_digest(
+    period: Literal["day", "week"],
+    user_id: UUID | None = None,
+    at: datetime | None = None,
+    session: AsyncSession = Depends(get_async_session),
+) -> DigestResponse:
+    """Return the precomputed digest of the period containing ``at`` (default: now)."""
+
+    start = bucket_start(period, at or datetime.now(timezone.utc))
+    stmt = select(Digest).where(
+        Digest.user_id == (user_id or NO_USER),
+        Digest.period == period,
+        Digest.bucket_start == start,
+    )
+    digest = (await session.execute(stmt)).scalar_one_or_none()
+    if digest is None:
+        return DigestResponse(user_id=user_id, period=period, bucket_start=start)
+    # top_events and incidents are stored as JSON; validation builds their entry models.
+    return DigestResponse.model_validate(
+        {
+            "user_id": user_id,
+            "period": period,
+            "bucket_start": utc(digest.bucket_start),
+            "event_count": digest.event_count,
+            "max_score": digest.max_score,
+            "top_events": digest.top_events,
+            "incidents": digest.incidents,
+            "updated_at": digest.updated_at and utc(digest.updated_at),
+        }
+    )
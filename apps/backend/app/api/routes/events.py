@@ -1,108 +1,214 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import asdict
 from datetime import datetime, timezone
+from time import perf_counter
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, status
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session, selectinload
+import redis
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    WebSocket,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload, sessionmaker
 from sqlalchemy.sql import Select
 
-from app.api.schemas import EventCreate, EventResponse, PaginatedEvents
-from app.db import Event, EventMetric, EventTag, Incident
-from app.db.session import get_session
-from app.ingest.pipeline import process_event
+from app.api.cache import ResponseCache, cache_ttl, event_scopes, skips_cache
+from app.api.export import export_lines, gzip_chunks
+from app.api.live import FeedFilter, serve_websocket, sse_frames
+from app.api.pagination import TotalMode, count_rows, decode_cursor, encode_cursor
+from app.api.projection import EVENT_FIELDS, parse_fields, project_rows, projected_columns
+from app.api.schemas import (
+    BatchEventResult,
+    BatchEventsResponse,
+    EventCreate,
+    EventResponse,
+    FeedbackCreate,
+    FeedbackResponse,
+    PaginatedEvents,
+    QueuedEventResponse,
+)
+from app.archive.blobs import load_payload, resolve_payloads
+from app.archive.query import (
+    EventFilters,
+    archive_horizon,
+    count_archived,
+    find_segments,
+    read_archived,
+    sort_key,
+)
+from app.archive.store import get_object_store
+from app.db import ArchiveSegment, Event, EventTag, Feedback, Incident
+from app.db.hooks import defer_blocking, run_callbacks, take_deferred
+from app.db.redis import get_redis
+from app.db.session import get_async_session, get_session, get_session_factory
+from app.ingest.dedup import insert_events
+from app.ingest.stream import enqueue_event
+from app.telemetry import record_ingest
+from app.timeutil import utc
 
 router = APIRouter()
 
+MAX_BATCH_SIZE = 500
 
-def _normalize_to_utc(dt: datetime) -> datetime:
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
-
-def _apply_event_filters(
-    stmt: Select[Any],
-    *,
-    source: str | None,
-    entity_type: str | None,
-    entity_id: str | None,
-    incident_id: UUID | None,
-    occurred_after: datetime | None,
-    occurred_before: datetime | None,
-    tag: str | None,
-) -> Select[Any]:
+
+def _apply_event_filters(stmt: Select[Any], filters: EventFilters) -> Select[Any]:
     for column, value in [
-        (Event.source, source),
-        (Event.entity_type, entity_type),
-        (Event.entity_id, entity_id),
-        (Event.incident_id, incident_id),
+        (Event.source, filters.source),
+        (Event.entity_type, filters.entity_type),
+        (Event.entity_id, filters.entity_id),
+        (Event.incident_id, filters.incident_id),
     ]:
         if value is not None:
             stmt = stmt.where(column == value)
+    occurred_after, occurred_before = filters.occurred_after, filters.occurred_before
     if occurred_after:
         stmt = stmt.where(Event.occurred_at >= occurred_after)
     if occurred_before:
         stmt = stmt.where(Event.occurred_at <= occurred_before)
-    if tag:
-        stmt = stmt.join(EventTag, EventTag.event_id == Event.id).where(EventTag.value == tag)
+    if filters.tag:
+        stmt = stmt.join(
+            EventTag,
+            (EventTag.event_id == Event.id) & (EventTag.occurred_at == Event.occurred_at),
+        ).where(EventTag.value == filters.tag)
+        if occurred_after:
+            stmt = stmt.where(EventTag.occurred_at >= occurred_after)
+        if occurred_before:
+            stmt = stmt.where(EventTag.occurred_at <= occurred_before)
     return stmt
 
+
 @router.post(
     "/",
     status_code=status.HTTP_201_CREATED,
     response_model=EventResponse,
     response_model_exclude_none=True,
 )
-def create_event(event: EventCreate, session: Session = Depends(get_session)) -> EventResponse:
-    deduped_tags = list(dict.fromkeys(event.tags))
-    pipeline_result = process_event(event, session)
-    incident_id = pipeline_result.incident_id
-    db_event = Event(
-        source=event.source,
-        occurred_at=event.occurred_at,
-        received_at=event.received_at,
-        entity_type=event.entity.type,
-        entity_id=event.entity.id,
-        type=event.type,
-        title=event.title,
-        body=event.body,
-        severity_raw=event.severity_raw,
-        links=[link.model_dump(mode="json", exclude_none=True) for link in event.links],
-        extras=event.extras,
-        features=pipeline_result.features,
-        score=pipeline_result.score,
-        explain=pipeline_result.explain,
-        incident_id=incident_id,
+async def create_event(
+    event: EventCreate,
+    response: Response,
+    session: AsyncSession = Depends(get_async_session),
+) -> EventResponse:
+    """Ingest one event; a replay of a stored fingerprint returns the stored event with 200."""
+
+    start = perf_counter()
+    stored, created, deferred = await session.run_sync(_ingest_event, event)
+    await run_in_threadpool(run_callbacks, deferred)
+    record_ingest("api", perf_counter() - start, int(created), int(not created))
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    if stored.payload_ref is not None:
+        # Answer with the full payload, as GET /events/{id} does.
+        payload = await run_in_threadpool(load_payload, stored.payload_ref)
+        stored = EventResponse.model_validate({**stored.model_dump(), **payload})
+    return stored
+
+
+def _ingest_event(
+    session: Session, event: EventCreate
+) -> tuple[EventResponse, bool, list[Callable[[], None]]]:
+    # Commit hooks that do I/O would block the event loop here; the caller runs them.
+    defer_blocking(session)
+    try:
+        db_event, created = insert_events(session, [event])[0]
+        if created:
+            session.refresh(db_event)
+    finally:
+        deferred = take_deferred(session)
+    return EventResponse.model_validate(db_event), created, deferred
+
+
+@router.post(
+    "/async",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=QueuedEventResponse,
+)
+def create_event_async(
+    event: EventCreate, client: redis.Redis = Depends(get_redis)
+) -> QueuedEventResponse:
+    fingerprint, stream_id = enqueue_event(client, event)
+    return QueuedEventResponse(fingerprint=fingerprint, stream_id=stream_id)
+
+
+@router.post(
+    "/batch",
+    response_model=BatchEventsResponse,
+    response_model_exclude_none=True,
+)
+def create_events_batch(
+    payload: list[dict[str, Any]] = Body(..., max_length=MAX_BATCH_SIZE),
+    session: Session = Depends(get_session),
+) -> BatchEventsResponse:
+    items: list[BatchEventResult | None] = [None] * len(payload)
+    accepted: list[tuple[int, EventCreate]] = []
+    for index, raw in enumerate(payload):
+        try:
+            accepted.append((index, EventCreate.model_validate(raw)))
+        except ValidationError as exc:
+            items[index] = _batch_error(index, exc.errors(include_url=False, include_context=False))
+
+    referenced = {event.incident_id for _, event in accepted if event.incident_id is not None}
+    if referenced:
+        known = set(
+            session.execute(select(Incident.id).where(Incident.id.in_(referenced))).scalars()
+        )
+        for index, event in accepted:
+            if event.incident_id is not None and event.incident_id not in known:
+                items[index] = _batch_error(
+                    index,
+                    [{"loc": ["incident_id"], "msg": "Incident not found", "type": "not_found"}],
+                )
+        accepted = [(index, event) for index, event in accepted if items[index] is None]
+
+    start = perf_counter()
+    outcomes = insert_events(session, [event for _, event in accepted])
+    resolve_payloads([row for row, _ in outcomes])
+    for (index, _), (row, created) in zip(accepted, outcomes):
+        items[index] = BatchEventResult(
+            index=index,
+            status="created" if created else "duplicate",
+            event=EventResponse.model_validate(row),
+        )
+    created_count = sum(created for _, created in outcomes)
+    record_ingest("batch", perf_counter() - start, created_count, len(outcomes) - created_count)
+    return BatchEventsResponse(
+        created=created_count,
+        duplicates=len(outcomes) - created_count,
+        failed=len(payload) - len(outcomes),
+        items=[item for item in items if item is not None],
     )
-    db_event.tag_rows = [EventTag(value=value) for value in deduped_tags]
-    db_event.metrics = [
-        EventMetric(name=metric.name, value=metric.value, unit=metric.unit)
-        for metric in event.metrics
-    ]
-    session.add(db_event)
-    if incident_id is not None:
-        incident = session.get(Incident, incident_id)
-        if incident is not None:
-            last_event_at = incident.last_event_at
-            if last_event_at is None or _normalize_to_utc(event.occurred_at) > _normalize_to_utc(last_event_at):
-                incident.last_event_at = event.occurred_at
-            score_value = pipeline_result.score
-            if score_value is not None:
-                if incident.score is None or score_value > incident.score:
-                    incident.score = score_value
-    session.commit()
-    session.refresh(db_event)
-    return EventResponse.model_validate(db_event)
+
+
+def _batch_error(index: int, errors: list[Any]) -> BatchEventResult:
+    return BatchEventResult(
+        index=index,
+        status="error",
+        errors=[{key: error[key] for key in ("loc", "msg", "type")} for error in errors],
+    )
+
 
 @router.get(
     "/",
     response_model=PaginatedEvents,
     response_model_exclude_none=True,
 )
-def list_events(
-    session: Session = Depends(get_session),
+async def list_events(
+    session: AsyncSession = Depends(get_async_session),
     source: str | None = None,
     entity_type: str | None = None,
     entity_id: str | None = None,
@@ -112,37 +218,249 @@ def list_events(
     occurred_before: datetime | None = None,
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
-) -> PaginatedEvents:
-    base_stmt = (
-        select(Event)
-        .options(selectinload(Event.metrics), selectinload(Event.tag_rows))
-        .order_by(Event.occurred_at.desc(), Event.id.desc())
-    )
-    base_stmt = _apply_event_filters(
-        base_stmt,
+    cursor: str | None = None,
+    include_total: TotalMode = TotalMode.none,
+    fields: str | None = Query(
+        default=None, description="Comma-separated event fields to return, e.g. id,title,score"
+    ),
+    cache_control: str | None = Header(default=None),
+    client: redis.Redis = Depends(get_redis),
+) -> PaginatedEvents | Response:
+    projection = parse_fields(fields)
+    filters = EventFilters(
         source=source,
         entity_type=entity_type,
         entity_id=entity_id,
         incident_id=incident_id,
+        tag=tag,
         occurred_after=occurred_after,
         occurred_before=occurred_before,
-        tag=tag,
     )
-    paginated_stmt = base_stmt.offset(offset).limit(limit)
-    events = session.execute(paginated_stmt).unique().scalars().all()
-    items = [EventResponse.model_validate(event) for event in events]
+    cache = ResponseCache(client, "events", cache_ttl()) if cache_ttl() > 0 else None
+    if cache is not None:
+        params = {
+            **asdict(filters),
+            "limit": limit,
+            "offset": offset,
+            "cursor": cursor,
+            "include_total": include_total.value,
+            "fields": projection,
+        }
+        scopes = event_scopes(source, entity_type, entity_id, incident_id)
+        cached = await run_in_threadpool(cache.lookup, params, scopes, skips_cache(cache_control))
+        if cached is not None:
+            return Response(cached, media_type="application/json")
+    if projection is None:
+        stmt = select(Event).options(selectinload(Event.metrics), selectinload(Event.tag_rows))
+    else:
+        stmt = select(*projected_columns(projection))
+    stmt = _apply_event_filters(stmt.order_by(Event.occurred_at.desc(), Event.id.desc()), filters)
+    after = decode_cursor(cursor) if cursor is not None else None
+    if after is not None:
+        after_occurred, after_id = after
+        stmt = stmt.where(
+            or_(
+                Event.occurred_at < after_occurred,
+                and_(Event.occurred_at == after_occurred, Event.id < after_id),
+            )
+        )
+    horizon = await archive_horizon(session)
+    segments: list[ArchiveSegment] | None = None
+    if filters.reaches(horizon):
+        needed = offset + limit + 1
+        rows = await _fetch(session, stmt.limit(needed), projection)
+        # Archived rows all occurred at or before the horizon: a page filled by newer hot
+        # rows needs none of them.
+        if horizon is not None and (
+            len(rows) < needed or utc(_keyset(rows[needed - 1])[0]) <= horizon
+        ):
+            cursor_at = after[0] if after is not None else None
+            segments = await find_segments(session, filters, cursor_at)
+            archived = await run_in_threadpool(
+                read_archived,
+                get_object_store(),
+                segments,
+                filters,
+                after=sort_key(cursor_at, after[1]) if after and cursor_at else None,
+                needed=needed,
+                hot=[row.occurred_at for row in rows],
+            )
+            # Merged in the same keyset order as the SQL: newest first, ties by id.
+            rows = sorted([*rows, *archived], key=lambda row: sort_key(*_keyset(row)), reverse=True)
+        rows = rows[offset:needed]
+    else:
+        rows = await _fetch(session, stmt.offset(offset).limit(limit + 1), projection)
+    page = rows[:limit]
+    next_cursor = encode_cursor(*_keyset(page[-1])) if len(rows) > limit else None
+
+    total = await session.run_sync(
+        count_rows, _apply_event_filters(select(Event.id), filters), include_total
+    )
+    if total is not None and filters.reaches(horizon):
+        if segments is None or after is not None:
+            segments = await find_segments(session, filters)
+        total += await run_in_threadpool(
+            count_archived,
+            get_object_store(),
+            segments,
+            filters,
+            include_total is TotalMode.exact,
+        )
+    if projection is not None:
+        body = {
+            "items": await project_rows(session, page, projection),
+            "total": total,
+            "limit": limit,
+            "offset": offset,
+            "next_cursor": next_cursor,
+        }
+        response = Response(
+            to_json({key: value for key, value in body.items() if value is not None}),
+            media_type="application/json",
+        )
+    else:
+        result = PaginatedEvents(
+            items=[EventResponse.model_validate(row) for row in page],
+            total=total,
+            limit=limit,
+            offset=offset,
+            next_cursor=next_cursor,
+        )
+        if cache is None:
+            return result
+        response = Response(
+            result.model_dump_json(exclude_none=True), media_type="application/json"
+        )
+    if cache is not None:
+        await run_in_threadpool(cache.store, response.body)
+    return response
+
+
+async def _fetch(
+    session: AsyncSession, stmt: Select[Any], projection: tuple[str, ...] | None
+) -> list[Any]:
+    result = await session.execute(stmt)
+    if projection is None:
+        return list(result.unique().scalars())
+    return list(result)
+
+
+def _keyset(row: Any) -> tuple[datetime, UUID]:
+    if isinstance(row, dict):
+        return row["occurred_at"], row["id"]
+    return row.occurred_at, row.id
+
 
-    count_stmt = select(func.count(func.distinct(Event.id))).select_from(Event)
-    count_stmt = _apply_event_filters(
-        count_stmt,
+@router.get("/export", response_class=StreamingResponse)
+def export_events(
+    factory: sessionmaker[Session] = Depends(get_session_factory),
+    source: str | None = None,
+    entity_type: str | None = None,
+    entity_id: str | None = None,
+    incident_id: UUID | None = None,
+    tag: str | None = None,
+    occurred_after: datetime | None = None,
+    occurred_before: datetime | None = None,
+    gzip: bool = Query(default=False, description="Return the NDJSON gzip-compressed"),
+) -> StreamingResponse:
+    """Stream every matching event as NDJSON, oldest first, archived events included."""
+
+    filters = EventFilters(
         source=source,
         entity_type=entity_type,
         entity_id=entity_id,
         incident_id=incident_id,
+        tag=tag,
         occurred_after=occurred_after,
         occurred_before=occurred_before,
-        tag=tag,
     )
-    total = session.execute(count_stmt).scalar_one()
+    stmt = _apply_event_filters(
+        select(*projected_columns(EVENT_FIELDS)).order_by(Event.occurred_at, Event.id), filters
+    )
+    chunks = export_lines(factory, stmt, filters)
+    if gzip:
+        return StreamingResponse(
+            gzip_chunks(chunks),
+            media_type="application/gzip",
+            headers={"Content-Disposition": 'attachment; filename="events.ndjson.gz"'},
+        )
+    return StreamingResponse(chunks, media_type="application/x-ndjson")
+
+
+def _feed_filter(
+    source: str | None = None,
+    entity_type: str | None = None,
+    entity_id: str | None = None,
+    tag: str | None = None,
+    min_score: float | None = None,
+) -> FeedFilter:
+    return FeedFilter(source, entity_type, entity_id, tag, min_score)
+
 
-    return PaginatedEvents(items=items, total=total, limit=limit, offset=offset)
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_events(filters: FeedFilter = Depends(_feed_filter)) -> StreamingResponse:
+    """Push new events and incident changes as Server-Sent Events."""
+
+    return StreamingResponse(
+        sse_frames(filters),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/stream")
+async def stream_events_ws(
+    websocket: WebSocket, filters: FeedFilter = Depends(_feed_filter)
+) -> None:
+    """Push new events and incident changes as JSON text frames."""
+
+    await websocket.accept()
+    await serve_websocket(websocket, filters)
+
+
+@router.post("/{event_id}/feedback", response_model=FeedbackResponse)
+async def record_feedback(
+    event_id: UUID, body: FeedbackCreate, session: AsyncSession = Depends(get_async_session)
+) -> Feedback:
+    """Record a verdict on an event for calibration; a later verdict replaces it.
+
+    Only events in the hot tables are found: segments are not indexed by event id, so an
+    archived event returns ``404``.
+    """
+
+    event = await session.get(Event, event_id)
+    if event is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Event not found")
+    feedback = (
+        await session.execute(select(Feedback).where(Feedback.event_id == event_id))
+    ).scalar_one_or_none()
+    if feedback is None:
+        feedback = Feedback(event_id=event_id)
+        session.add(feedback)
+    calibration = (event.explain or {}).get("calibration")
+    feedback.source = event.source
+    feedback.score = calibration["raw_score"] if calibration else event.score
+    feedback.outcome = body.outcome
+    feedback.created_at = datetime.now(timezone.utc)
+    await session.commit()
+    return feedback
+
+
+# Keep this route last: ``/{event_id}`` would otherwise capture fixed GET paths added after it.
+@router.get(
+    "/{event_id}",
+    response_model=EventResponse,
+    response_model_exclude_none=True,
+)
+async def get_event(
+    event_id: UUID, session: AsyncSession = Depends(get_async_session)
+) -> EventResponse:
+    """Return one event with an offloaded payload resolved from the blob store."""
+
+    event = await session.get(
+        Event, event_id, options=[selectinload(Event.metrics), selectinload(Event.tag_rows)]
+    )
+    if event is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Event not found")
+    await run_in_threadpool(resolve_payloads, [event])
+    return EventResponse.model_validate(event)
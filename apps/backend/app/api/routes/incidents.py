@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+from datetime import datetime
 from typing import Any
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+import redis
+from fastapi import APIRouter, Depends, Header, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
 
+from app.api.cache import ResponseCache, cache_ttl, skips_cache
+from app.api.pagination import TotalMode, count_rows, decode_cursor, encode_cursor
 from app.api.schemas import IncidentResponse, PaginatedIncidents
-from app.db import Event, Incident
-from app.db.session import get_session
+from app.db import Incident
+from app.db.redis import get_redis
+from app.db.session import get_async_session
 
 router = APIRouter()
 
@@ -19,30 +26,49 @@ router = APIRouter()
     response_model=PaginatedIncidents,
     response_model_exclude_none=True,
 )
-def list_incidents(
-    session: Session = Depends(get_session),
+async def list_incidents(
+    session: AsyncSession = Depends(get_async_session),
     status: str | None = None,
     user_id: UUID | None = None,
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
-) -> PaginatedIncidents:
+    cursor: str | None = None,
+    include_total: TotalMode = TotalMode.none,
+    cache_control: str | None = Header(default=None),
+    client: redis.Redis = Depends(get_redis),
+) -> PaginatedIncidents | Response:
+    cache = ResponseCache(client, "incidents", cache_ttl()) if cache_ttl() > 0 else None
+    if cache is not None:
+        params = {
+            "status": status,
+            "user_id": user_id,
+            "limit": limit,
+            "offset": offset,
+            "cursor": cursor,
+            "include_total": include_total.value,
+        }
+        cached = await run_in_threadpool(
+            cache.lookup, params, ["incidents"], skips_cache(cache_control)
+        )
+        if cached is not None:
+            return Response(cached, media_type="application/json")
+
     filters: list[Any] = []
     if status is not None:
         filters.append(Incident.status == status)
     if user_id is not None:
         filters.append(Incident.user_id == user_id)
 
-    stmt = (
-        select(Incident, func.count(Event.id).label("event_count"))
-        .outerjoin(Event, Incident.id == Event.incident_id)
-        .group_by(Incident.id)
-        .order_by(Incident.last_event_at.desc().nullslast(), Incident.id)
-    )
+    stmt = select(Incident).order_by(Incident.last_event_at.desc().nullslast(), Incident.id)
     if filters:
         stmt = stmt.where(*filters)
-    stmt = stmt.offset(offset).limit(limit)
-
-    rows = session.execute(stmt).all()
+    if cursor is not None:
+        stmt = stmt.where(_after_cursor(*decode_cursor(cursor)))
+    rows = (await session.execute(stmt.offset(offset).limit(limit + 1))).scalars().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].last_event_at, rows[-1].id)
     items = [
         IncidentResponse(
             id=incident.id,
@@ -50,15 +76,33 @@ def list_incidents(
             status=incident.status,
             score=incident.score,
             summary=incident.summary,
+            first_event_at=incident.first_event_at,
             last_event_at=incident.last_event_at,
-            event_count=event_count,
+            event_count=incident.event_count,
+            sources=incident.sources,
+            top_tags=incident.top_tags(),
         )
-        for incident, event_count in rows
+        for incident in rows
     ]
 
-    count_stmt = select(func.count(Incident.id))
-    if filters:
-        count_stmt = count_stmt.where(*filters)
-    total = session.execute(count_stmt).scalar_one()
+    total = await session.run_sync(count_rows, select(Incident.id).where(*filters), include_total)
+    result = PaginatedIncidents(
+        items=items, total=total, limit=limit, offset=offset, next_cursor=next_cursor
+    )
+    if cache is None:
+        return result
+    body = result.model_dump_json(exclude_none=True)
+    await run_in_threadpool(cache.store, body)
+    return Response(body, media_type="application/json")
+
 
-    return PaginatedIncidents(items=items, total=total, limit=limit, offset=offset)
+def _after_cursor(last_event_at: datetime | None, incident_id: UUID) -> ColumnElement[bool]:
+    """Rows after the cursor in ``last_event_at DESC NULLS LAST, id ASC`` order."""
+
+    if last_event_at is None:
+        return and_(Incident.last_event_at.is_(None), Incident.id > incident_id)
+    return or_(
+        Incident.last_event_at < last_event_at,
+        and_(Incident.last_event_at == last_event_at, Incident.id > incident_id),
+        Incident.last_event_at.is_(None),
+    )
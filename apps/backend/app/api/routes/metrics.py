@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from app.telemetry import render_metrics
+
+router = APIRouter()
+
+
+@router.get("", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus text exposition of the pipeline, ingest, and pool metrics."""
+
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
@@ -1,6 +1,110 @@
-from fastapi import APIRouter
-from app.services.scoring import score
+import math
+
+from fastapi import APIRouter, Body, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.api.schemas import (
+    EventCreate,
+    ScoringBatchResponse,
+    ScoringModelDefinition,
+    ScoringModelResponse,
+    ScoringModelStatus,
+)
+from app.db import ModelVersion
+from app.db.session import get_session
+from app.ingest.baselines import observe_metrics
+from app.ingest.calibration import current_calibration
+from app.ingest.pipeline import score_events
+from app.ingest.scoring_models import current_models, register_model, set_status
+from app.services.scoring import ScoringModel
+from app.services.vectorized import FACTORS, FEATURES
+
 router = APIRouter()
+
+MAX_SCORING_BATCH = 10_000
+
+
 @router.post("/debug")
-def debug_score(features: dict) -> dict:
-    return {"score": score(features)}
+def debug_score(features: dict, session: Session = Depends(get_session)) -> dict:
+    live, shadow = current_models(session)
+    result = {"score": live.score(features), "model": live.version}
+    if shadow is not None:
+        result["shadow"] = {"model": shadow.version, "score": shadow.score(features)}
+    return result
+
+
+@router.post("/batch", response_model=ScoringBatchResponse)
+def score_batch(
+    events: list[EventCreate] = Body(..., max_length=MAX_SCORING_BATCH),
+    session: Session = Depends(get_session),
+) -> ScoringBatchResponse:
+    """Score events without storing them, as the pipeline would at ingest.
+
+    Metrics are compared with the stored baselines, but the events do not update them,
+    and each source's calibrator is applied to its raw score.
+    """
+
+    live, _ = current_models(session)
+    batch = score_events(events, observe_metrics(session, events, record=False), live)
+    raw_scores = batch.scores.tolist()
+    calibration = current_calibration(session)
+    calibrated = [
+        calibration.calibrate(event.source, score_value)
+        for event, score_value in zip(events, raw_scores)
+    ]
+    explains = list(batch.explains())
+    columns = batch.features.T.tolist()
+    return ScoringBatchResponse(
+        model=live.version,
+        calibration=calibration.version if any(value is not None for value in calibrated) else None,
+        scores=[raw if value is None else value for raw, value in zip(raw_scores, calibrated)],
+        raw_scores=raw_scores,
+        features={
+            name: [None if math.isnan(value) else value for value in column]
+            for name, column in zip(FEATURES, columns)
+        },
+        contributions={
+            name: [explain["contributions"][name] for explain in explains] for name in FACTORS
+        },
+        top_factors=[explain["top_factor"] for explain in explains],
+    )
+
+
+@router.get("/models", response_model=list[ScoringModelResponse])
+def list_models(session: Session = Depends(get_session)) -> list[ModelVersion]:
+    stmt = select(ModelVersion).order_by(ModelVersion.created_at, ModelVersion.version)
+    return list(session.execute(stmt).scalars())
+
+
+@router.put("/models/{version}", response_model=ScoringModelResponse)
+def put_model(
+    version: str,
+    definition: ScoringModelDefinition,
+    session: Session = Depends(get_session),
+) -> ModelVersion:
+    """Register an immutable model version; it starts ``inactive``."""
+
+    payload = definition.model_dump()
+    try:
+        ScoringModel.compile(version, payload)
+    except ValueError as exc:
+        raise HTTPException(status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    try:
+        return register_model(session, version, payload)
+    except ValueError as exc:
+        raise HTTPException(status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+
+
+@router.put("/models/{version}/status", response_model=ScoringModelResponse)
+def put_model_status(
+    version: str,
+    body: ScoringModelStatus,
+    session: Session = Depends(get_session),
+) -> ModelVersion:
+    """Promote a version to ``live`` or ``shadow``, or retire it."""
+
+    row = set_status(session, version, body.status)
+    if row is None:
+        raise HTTPException(status.HTTP_404_NOT_FOUND, detail="Scoring model not found")
+    return row
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 from uuid import UUID
 
 from pydantic import AnyHttpUrl, BaseModel, ConfigDict, Field
@@ -28,6 +28,8 @@ INCIDENT_RESPONSE_EXAMPLE = {
     "id": "ccf6d6f4-5f1b-4f23-8b61-ec5d5f4b1d12",
     "status": "open",
     "event_count": 3,
+    "sources": ["alpaca", "coinbase"],
+    "top_tags": ["finance", "portfolio"],
 }
 
 
@@ -75,6 +77,7 @@ class EventCreate(BaseModel):
 
 class EventResponse(EventCreate):
     id: UUID
+    payload_ref: str | None = None  # set when body/links/extras are only in GET /events/{id}
 
     model_config = ConfigDict(
         from_attributes=True,
@@ -82,22 +85,58 @@ class EventResponse(EventCreate):
     )
 
 
+class QueuedEventResponse(BaseModel):
+    fingerprint: str
+    stream_id: str
+
+
+class BatchEventResult(BaseModel):
+    index: int
+    status: Literal["created", "duplicate", "error"]
+    event: EventResponse | None = None
+    errors: list[dict[str, Any]] | None = None
+
+
+class BatchEventsResponse(BaseModel):
+    created: int
+    duplicates: int = 0
+    failed: int
+    items: list[BatchEventResult]
+
+
 class IncidentResponse(BaseModel):
     id: UUID
     user_id: UUID | None = None
     status: str
     score: float | None = None
     summary: str | None = None
+    first_event_at: datetime | None = None
     last_event_at: datetime | None = None
     event_count: int
+    sources: list[str] = Field(default_factory=list)
+    top_tags: list[str] = Field(default_factory=list)
 
     model_config = ConfigDict(json_schema_extra={"example": INCIDENT_RESPONSE_EXAMPLE})
 
 
+class FeedbackCreate(BaseModel):
+    outcome: Literal["useful", "not_useful", "took_action"]
+
+
+class FeedbackResponse(FeedbackCreate):
+    event_id: UUID
+    source: str
+    score: float | None = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class PaginatedBase(BaseModel):
-    total: int
+    total: int | None = None
     limit: int
     offset: int
+    next_cursor: str | None = None
 
 
 class PaginatedEvents(PaginatedBase):
@@ -106,3 +145,71 @@ class PaginatedEvents(PaginatedBase):
 
 class PaginatedIncidents(PaginatedBase):
     items: list[IncidentResponse]
+
+
+class DigestEvent(BaseModel):
+    id: UUID
+    score: float | None = None
+    source: str
+    title: str
+    occurred_at: datetime
+    incident_id: UUID | None = None
+    storm: bool = False
+
+
+class DigestIncident(BaseModel):
+    events: int
+    max_score: float | None = None
+    last_event_at: datetime | None = None
+
+
+class DigestResponse(BaseModel):
+    """Events routed below the push threshold in one period, read from ``digests``."""
+
+    user_id: UUID | None = None
+    period: Literal["day", "week"]
+    bucket_start: datetime
+    event_count: int = 0
+    max_score: float | None = None
+    top_events: list[DigestEvent] = Field(default_factory=list)
+    incidents: dict[UUID, DigestIncident] = Field(default_factory=dict)
+    updated_at: datetime | None = None
+
+
+class ScoringBatchResponse(BaseModel):
+    """Column-oriented scores: entry ``i`` of every list belongs to request item ``i``."""
+
+    model: str | None = None
+    calibration: int | None = None  # the calibration version applied to any score
+    scores: list[float]
+    raw_scores: list[float]  # before calibration
+    features: dict[str, list[float | None]]
+    contributions: dict[str, list[float]]
+    top_factors: list[str]
+
+
+class FactorDefinition(BaseModel):
+    features: list[str]
+    default: float = 0.0
+
+
+class ScoringModelDefinition(BaseModel):
+    """Factor weights plus optional per-factor features, defaults and caps."""
+
+    weights: dict[str, float]
+    factors: dict[str, FactorDefinition] = Field(default_factory=dict)
+    caps: dict[str, float] = Field(default_factory=dict)
+
+
+class ScoringModelResponse(BaseModel):
+    version: str
+    status: Literal["live", "shadow", "inactive"]
+    definition: ScoringModelDefinition
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ScoringModelStatus(BaseModel):
+    status: Literal["live", "shadow", "inactive"]
@@ -0,0 +1,111 @@
+"""Move events older than a cutoff out of the hot tables into archived segments.
+
+Events are taken one UTC day at a time, written as one segment per source, and deleted
+in the same transaction that records the segments, so a row is always either in the hot
+tables or reachable through ``archive_segments``. A failed commit removes the objects it
+had written.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.archive.query import forget_horizon
+from app.archive.segments import encode_segment, segment_key
+from app.archive.store import ObjectStore, get_object_store
+from app.db import ArchiveSegment, Event, EventMetric, EventTag
+from app.timeutil import utc
+
+DEFAULT_BATCH_SIZE = 5_000
+
+
+@dataclass
+class ArchiveResult:
+    events: int = 0
+    segments: int = 0
+
+
+def archive_events(
+    session: Session,
+    cutoff: datetime,
+    store: ObjectStore | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ArchiveResult:
+    """Archive every event that occurred before ``cutoff``, committing per batch."""
+
+    store = store or get_object_store()
+    cutoff = utc(cutoff)
+    result = ArchiveResult()
+    while True:
+        oldest = session.execute(
+            select(func.min(Event.occurred_at)).where(Event.occurred_at < cutoff)
+        ).scalar()
+        if oldest is None:
+            return result
+        day = utc(oldest).date()
+        start = datetime.combine(day, time(), tzinfo=timezone.utc)
+        end = min(start + timedelta(days=1), cutoff)
+        window = (Event.occurred_at >= start, Event.occurred_at < end)
+        events = (
+            session.execute(
+                select(Event)
+                .options(selectinload(Event.tag_rows), selectinload(Event.metrics))
+                .where(*window)
+                .order_by(Event.occurred_at, Event.id)
+                .limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        by_source: dict[str, list[Event]] = defaultdict(list)
+        for event in events:
+            by_source[event.source].append(event)
+
+        written = []
+        try:
+            for source, group in by_source.items():
+                key = segment_key(day, source)
+                store.put(key, encode_segment(group))
+                written.append(key)
+                session.add(
+                    ArchiveSegment(
+                        key=key,
+                        day=day,
+                        source=source,
+                        row_count=len(group),
+                        min_occurred_at=utc(group[0].occurred_at),
+                        max_occurred_at=utc(group[-1].occurred_at),
+                        created_at=datetime.now(timezone.utc),
+                    )
+                )
+            ids = [event.id for event in events]
+            # Bounded by the day so Postgres only touches that day's partitions.
+            models: tuple[type[EventTag] | type[EventMetric], ...] = (EventTag, EventMetric)
+            for model in models:
+                session.execute(
+                    delete(model).where(
+                        model.event_id.in_(ids),
+                        model.occurred_at >= start,
+                        model.occurred_at < end,
+                    ),
+                    execution_options={"synchronize_session": False},
+                )
+            session.execute(
+                delete(Event).where(Event.id.in_(ids), *window),
+                execution_options={"synchronize_session": False},
+            )
+            session.commit()
+            forget_horizon(session.get_bind())
+        except Exception:
+            session.rollback()
+            for key in written:
+                store.delete(key)
+            raise
+        session.expunge_all()
+        result.events += len(events)
+        result.segments += len(written)
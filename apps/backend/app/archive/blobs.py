@@ -0,0 +1,144 @@
+"""Content-addressed storage for large event payloads.
+
+When ``body``, ``links`` and ``extras`` together serialize to more than
+``EVENT_PAYLOAD_INLINE_BYTES`` (default 8192) of canonical JSON, they are written to the
+object store under their SHA-256 and the row keeps only ``payload_ref``, so identical
+payloads are stored once. Lists and correlation read the slim row; the detail view and
+exports call ``resolve_payloads``. Blobs are immutable, so fetched payloads are cached.
+
+Blobs are written once the ingest transaction commits, and only for the rows it created,
+so duplicates and rollbacks leave nothing behind. A blob that cannot be written is put
+back inline into its rows instead.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.archive.store import ObjectStore, get_object_store
+from app.db import Event
+from app.db.hooks import after_commit
+from app.db.session import sync_engine
+
+PAYLOAD_FIELDS = ("body", "links", "extras")
+DEFAULT_INLINE_BYTES = 8192
+CACHE_SIZE = 1024
+
+_known: OrderedDict[tuple[int, str], None] = OrderedDict()  # (store, digest) pairs written
+_payloads: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def inline_limit() -> int:
+    return int(os.getenv("EVENT_PAYLOAD_INLINE_BYTES", DEFAULT_INLINE_BYTES))
+
+
+def blob_key(digest: str) -> str:
+    return f"blobs/sha256/{digest[:2]}/{digest}.json.gz"
+
+
+def offload_payloads(
+    session: Session, rows: Iterable[Event], store: ObjectStore | None = None
+) -> None:
+    """Move the payloads of ``rows`` over the inline limit to the blob store on commit."""
+
+    pending: dict[str, tuple[bytes, list[UUID]]] = {}
+    for row in rows:
+        payload = {name: getattr(row, name) for name in PAYLOAD_FIELDS}
+        encoded = _encode(payload)
+        if len(encoded) <= inline_limit():
+            continue
+        digest = hashlib.sha256(encoded).hexdigest()
+        row.payload_ref = digest
+        row.body, row.links, row.extras = None, [], {}
+        pending.setdefault(digest, (encoded, []))[1].append(row.id)
+        _remember(_payloads, digest, payload)
+    if pending:
+        engine = sync_engine(session.get_bind())
+        # Blocking: writes to the object store.
+        after_commit(session, lambda: _write_blobs(pending, engine, store), blocking=True)
+
+
+def load_payload(digest: str, store: ObjectStore | None = None) -> dict[str, Any]:
+    with _lock:
+        cached = _payloads.get(digest)
+        if cached is not None:
+            _payloads.move_to_end(digest)
+            return cached
+    data = (store or get_object_store()).get(blob_key(digest))
+    payload = json.loads(gzip.decompress(data))
+    _remember(_payloads, digest, payload)
+    return payload
+
+
+def resolve_payloads(records: Iterable[Any], store: ObjectStore | None = None) -> None:
+    """Fill ``body``/``links``/``extras`` in place on rows or dicts carrying a ``payload_ref``.
+
+    ORM rows get the values as committed state, so they are never flushed back inline.
+    """
+
+    for record in records:
+        if isinstance(record, dict):
+            if record.get("payload_ref"):
+                record.update(load_payload(record["payload_ref"], store))
+            continue
+        if record.payload_ref:
+            payload = load_payload(record.payload_ref, store)
+            for name in PAYLOAD_FIELDS:
+                set_committed_value(record, name, payload[name])
+
+
+def _remember(cache: OrderedDict[Any, Any], key: Any, value: Any) -> None:
+    with _lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+
+
+def _encode(payload: dict[str, Any]) -> bytes:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _write_blobs(
+    pending: dict[str, tuple[bytes, list[UUID]]], engine: Engine, store: ObjectStore | None
+) -> None:
+    store = store or get_object_store()
+    for digest, (encoded, event_ids) in pending.items():
+        try:
+            _put_blob(store, digest, encoded)
+        except Exception:
+            logger.exception("payload blob %s not written; keeping it inline", digest)
+            with engine.begin() as connection:
+                connection.execute(
+                    update(Event)
+                    .where(Event.id.in_(event_ids))
+                    .values(payload_ref=None, **json.loads(encoded))
+                )
+
+
+def _put_blob(store: ObjectStore, digest: str, encoded: bytes) -> None:
+    known = (id(store), digest)
+    with _lock:
+        if known in _known:
+            return
+    key = blob_key(digest)
+    if not store.exists(key):
+        store.put(key, gzip.compress(encoded))
+    _remember(_known, known, None)
@@ -0,0 +1,203 @@
+"""Read path that lets ``GET /events`` fall through to archived segments.
+
+Segment metadata lives in ``archive_segments``, so a request only opens the files whose
+day range and source can hold rows for it. Segments are read newest first and reading
+stops once enough rows are known to be newer than anything left, so pages served from
+the hot tables never touch object storage.
+
+The newest archived ``occurred_at`` (the archive horizon) is cached per process and
+database for ``ARCHIVE_HORIZON_TTL`` seconds (default 60): a request whose range and hot
+rows stay above it does not query ``archive_segments`` at all. ``archive_events`` clears
+the cache of its own process; other processes see a new archive run within the TTL.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import Select, func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.archive.segments import SCHEMA, count_segment, decode_segment
+from app.archive.store import ObjectStore
+from app.db import ArchiveSegment
+from app.db.session import database_key
+from app.timeutil import utc
+
+DEFAULT_HORIZON_TTL = 60.0
+
+SortKey = tuple[datetime, UUID]
+
+
+@dataclass(frozen=True)
+class EventFilters:
+    source: str | None = None
+    entity_type: str | None = None
+    entity_id: str | None = None
+    incident_id: UUID | None = None
+    tag: str | None = None
+    occurred_after: datetime | None = None
+    occurred_before: datetime | None = None
+
+    def expression(self) -> pc.Expression | None:
+        """Row filter pushed into the Parquet reader; ``tag`` is applied afterwards."""
+
+        terms = [
+            pc.field(name) == value
+            for name, value in (
+                ("source", self.source),
+                ("entity_type", self.entity_type),
+                ("entity_id", self.entity_id),
+                ("incident_id", str(self.incident_id) if self.incident_id else None),
+            )
+            if value is not None
+        ]
+        occurred_type = SCHEMA.field("occurred_at").type
+        if self.occurred_after is not None:
+            after = pa.scalar(utc(self.occurred_after), occurred_type)
+            terms.append(pc.field("occurred_at") >= after)
+        if self.occurred_before is not None:
+            before = pa.scalar(utc(self.occurred_before), occurred_type)
+            terms.append(pc.field("occurred_at") <= before)
+        expression = None
+        for term in terms:
+            expression = term if expression is None else expression & term
+        return expression
+
+    def covers(self, segment: ArchiveSegment) -> bool:
+        """Whether every row of ``segment`` matches, so its ``row_count`` is the exact count."""
+
+        if any(
+            value is not None
+            for value in (self.entity_type, self.entity_id, self.incident_id, self.tag)
+        ):
+            return False
+        if self.source is not None and segment.source != self.source:
+            return False
+        if self.occurred_after is not None and utc(segment.min_occurred_at) < utc(
+            self.occurred_after
+        ):
+            return False
+        return self.occurred_before is None or utc(segment.max_occurred_at) <= utc(
+            self.occurred_before
+        )
+
+    def reaches(self, horizon: datetime | None) -> bool:
+        """Whether archived rows, all at or before ``horizon``, can match."""
+
+        if horizon is None:
+            return False
+        return self.occurred_after is None or utc(self.occurred_after) <= horizon
+
+
+_horizons: dict[str, tuple[float, datetime | None]] = {}
+
+
+async def archive_horizon(session: AsyncSession) -> datetime | None:
+    """Newest archived ``occurred_at`` for the session's database, ``None`` if none."""
+
+    key = database_key(session.get_bind())
+    now = time.monotonic()
+    cached = _horizons.get(key)
+    if cached is not None and now - cached[0] < float(
+        os.getenv("ARCHIVE_HORIZON_TTL", DEFAULT_HORIZON_TTL)
+    ):
+        return cached[1]
+    newest = (await session.execute(select(func.max(ArchiveSegment.max_occurred_at)))).scalar()
+    horizon = utc(newest) if newest is not None else None
+    _horizons[key] = (now, horizon)
+    return horizon
+
+
+def forget_horizon(bind: Engine | Connection) -> None:
+    _horizons.pop(database_key(bind), None)
+
+
+async def find_segments(
+    session: AsyncSession, filters: EventFilters, before: datetime | None = None
+) -> list[ArchiveSegment]:
+    """Segments that may hold matching events older than ``before``, newest first."""
+
+    stmt = segments_query(filters, before).order_by(ArchiveSegment.max_occurred_at.desc())
+    return list((await session.execute(stmt)).scalars())
+
+
+def segments_query(filters: EventFilters, before: datetime | None = None) -> Select[Any]:
+    stmt = select(ArchiveSegment)
+    if filters.source is not None:
+        stmt = stmt.where(ArchiveSegment.source == filters.source)
+    if filters.occurred_after is not None:
+        stmt = stmt.where(ArchiveSegment.max_occurred_at >= filters.occurred_after)
+    upper = min(
+        (utc(value) for value in (filters.occurred_before, before) if value is not None),
+        default=None,
+    )
+    if upper is not None:
+        stmt = stmt.where(ArchiveSegment.min_occurred_at <= upper)
+    return stmt
+
+
+def read_archived(
+    store: ObjectStore,
+    segments: list[ArchiveSegment],
+    filters: EventFilters,
+    *,
+    after: SortKey | None,
+    needed: int,
+    hot: list[datetime],
+) -> list[dict[str, Any]]:
+    """Matching archived events older than the ``after`` cursor, enough to fill ``needed``.
+
+    ``hot`` holds the ``occurred_at`` of the rows the hot tables returned for the same page,
+    so no segment is read when those rows already fill it.
+    """
+
+    where = filters.expression()
+    hot = [utc(value) for value in hot]
+    found: list[dict[str, Any]] = []
+    seen = sorted(hot, reverse=True)
+    for segment in segments:
+        if len(seen) >= needed and utc(segment.max_occurred_at) < seen[needed - 1]:
+            break
+        for record in decode_segment(store.get(segment.key), where):
+            if filters.tag is not None and filters.tag not in record["tags"]:
+                continue
+            if after is not None and sort_key(record["occurred_at"], record["id"]) >= after:
+                continue
+            found.append(record)
+        seen = sorted([*hot, *(record["occurred_at"] for record in found)], reverse=True)
+    return found
+
+
+def count_archived(
+    store: ObjectStore, segments: list[ArchiveSegment], filters: EventFilters, exact: bool
+) -> int:
+    """Matching archived rows; without ``exact``, every row of every candidate segment.
+
+    Exact counts take ``row_count`` for the segments the filters match entirely; only
+    segments the filters cut through are read, and only their filtered columns.
+    """
+
+    if not exact:
+        return sum(segment.row_count for segment in segments)
+    where = filters.expression()
+    return sum(
+        (
+            segment.row_count
+            if filters.covers(segment)
+            else count_segment(store.get(segment.key), where, filters.tag)
+        )
+        for segment in segments
+    )
+
+
+def sort_key(occurred_at: datetime, event_id: UUID) -> SortKey:
+    return utc(occurred_at), event_id
@@ -0,0 +1,122 @@
+"""Parquet encoding of archived events.
+
+A segment holds the events of one UTC day and one source, with tags and metrics nested
+as list columns and the free-form JSON fields stored as JSON text. Keys are Hive-style,
+``events/date=2025-10-13/source=fitbit/<id>.parquet``, so any Parquet reader (DuckDB,
+Spark, pyarrow datasets) can scan the bucket directly.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import uuid
+from collections.abc import Sequence
+from datetime import date, datetime, timezone
+from typing import Any
+from urllib.parse import quote
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from app.db import Event
+
+SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("source", pa.string()),
+        ("occurred_at", pa.timestamp("us", tz="UTC")),
+        ("received_at", pa.timestamp("us", tz="UTC")),
+        ("entity_type", pa.string()),
+        ("entity_id", pa.string()),
+        ("type", pa.string()),
+        ("title", pa.string()),
+        ("body", pa.string()),
+        ("severity_raw", pa.string()),
+        ("links", pa.string()),
+        ("extras", pa.string()),
+        ("features", pa.string()),
+        ("score", pa.float64()),
+        ("explain", pa.string()),
+        ("incident_id", pa.string()),
+        ("fingerprint", pa.string()),
+        ("payload_ref", pa.string()),
+        ("tags", pa.list_(pa.string())),
+        (
+            "metrics",
+            pa.list_(
+                pa.struct([("name", pa.string()), ("value", pa.float64()), ("unit", pa.string())])
+            ),
+        ),
+    ]
+)
+_JSON_COLUMNS = ("links", "extras", "features", "explain")
+
+
+def segment_key(day: date, source: str) -> str:
+    return f"events/date={day:%Y-%m-%d}/source={quote(source, safe='')}/{uuid.uuid4().hex}.parquet"
+
+
+def encode_segment(events: Sequence[Event]) -> bytes:
+    """Serialize ORM events (tags and metrics loaded) as a zstd-compressed Parquet file."""
+
+    rows = [
+        {
+            "id": str(event.id),
+            "source": event.source,
+            "occurred_at": _utc(event.occurred_at),
+            "received_at": _utc(event.received_at),
+            "entity_type": event.entity_type,
+            "entity_id": event.entity_id,
+            "type": event.type,
+            "title": event.title,
+            "body": event.body,
+            "severity_raw": event.severity_raw,
+            **{name: json.dumps(getattr(event, name)) for name in _JSON_COLUMNS},
+            "score": event.score,
+            "incident_id": str(event.incident_id) if event.incident_id else None,
+            "fingerprint": event.fingerprint,
+            "payload_ref": event.payload_ref,
+            "tags": event.tags,
+            "metrics": [
+                {"name": metric.name, "value": metric.value, "unit": metric.unit}
+                for metric in event.metrics
+            ],
+        }
+        for event in events
+    ]
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(rows, schema=SCHEMA), buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+def decode_segment(data: bytes, where: pc.Expression | None = None) -> list[dict[str, Any]]:
+    """Read a segment back as ``EventResponse``-shaped dicts, keeping rows matching ``where``."""
+
+    table = pq.read_table(pa.BufferReader(data), filters=where)
+    records = []
+    for row in table.to_pylist():
+        for name in _JSON_COLUMNS:
+            row[name] = json.loads(row[name])
+        row["id"] = uuid.UUID(row["id"])
+        row["incident_id"] = uuid.UUID(row["incident_id"]) if row["incident_id"] else None
+        row["entity"] = {"type": row.pop("entity_type"), "id": row.pop("entity_id")}
+        records.append(row)
+    return records
+
+
+def count_segment(data: bytes, where: pc.Expression | None = None, tag: str | None = None) -> int:
+    """Rows of a segment matching ``where`` and carrying ``tag``, without decoding them."""
+
+    columns = ["tags"] if tag is not None else ["id"]
+    table = pq.read_table(pa.BufferReader(data), columns=columns, filters=where)
+    if tag is None:
+        return table.num_rows
+    return sum(1 for tags in table.column("tags").to_pylist() if tag in tags)
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
@@ -0,0 +1,115 @@
+"""Object storage for archive segments and payload blobs: MinIO/S3, or a local directory.
+
+``ARCHIVE_DIR`` selects a local directory. Otherwise ``S3_ENDPOINT_URL`` (with
+``S3_ACCESS_KEY``, ``S3_SECRET_KEY`` and ``ARCHIVE_BUCKET``, falling back to
+``S3_BUCKET``) selects an S3-compatible bucket such as the compose MinIO. With neither
+set, segments go to ``./archive``.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Protocol
+
+DEFAULT_ARCHIVE_DIR = "./archive"
+
+
+class ObjectStore(Protocol):
+    def put(self, key: str, data: bytes) -> None: ...
+
+    def get(self, key: str) -> bytes: ...
+
+    def exists(self, key: str) -> bool: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class LocalObjectStore:
+    """Keys are relative paths under ``root``; writes go through a temp file and rename."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"object key escapes the archive directory: {key!r}")
+        return path
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".partial")
+        partial.write_bytes(data)
+        partial.replace(path)
+
+    def get(self, key: str) -> bytes:
+        return self._path(key).read_bytes()
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+
+class S3ObjectStore:
+    def __init__(self, bucket: str, client: Any) -> None:
+        self.bucket = bucket
+        self.client = client
+
+    @classmethod
+    def from_env(cls) -> S3ObjectStore:
+        import boto3
+
+        client = boto3.client(
+            "s3",
+            endpoint_url=os.environ["S3_ENDPOINT_URL"],
+            aws_access_key_id=os.getenv("S3_ACCESS_KEY"),
+            aws_secret_access_key=os.getenv("S3_SECRET_KEY"),
+        )
+        bucket = os.getenv("ARCHIVE_BUCKET") or os.getenv("S3_BUCKET") or "signalos-raw"
+        return cls(bucket, client)
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+
+    def get(self, key: str) -> bytes:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"].read()
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+
+_store: ObjectStore | None = None
+_store_config: tuple[str | None, str | None] | None = None
+_lock = threading.Lock()
+
+
+def get_object_store() -> ObjectStore:
+    """Return the process-wide store for the current environment."""
+
+    global _store, _store_config
+    config = (os.getenv("ARCHIVE_DIR"), os.getenv("S3_ENDPOINT_URL"))
+    with _lock:
+        if _store is None or _store_config != config:
+            directory, endpoint = config
+            if directory or not endpoint:
+                _store = LocalObjectStore(directory or DEFAULT_ARCHIVE_DIR)
+            else:
+                _store = S3ObjectStore.from_env()
+            _store_config = config
+        return _store
@@ -1,13 +1,43 @@
-from .models import Base, Event, EventMetric, EventTag, Incident
-from .session import SessionLocal, get_engine, get_session
+from .models import (
+    ArchiveSegment,
+    Base,
+    Baseline,
+    Calibrator,
+    Digest,
+    Event,
+    EventMetric,
+    EventTag,
+    Feedback,
+    ImportCheckpoint,
+    Incident,
+    ModelVersion,
+)
+from .session import (
+    AsyncSessionLocal,
+    SessionLocal,
+    get_async_engine,
+    get_async_session,
+    get_engine,
+    get_session,
+)
 
 __all__ = [
+    "ArchiveSegment",
+    "AsyncSessionLocal",
     "Base",
+    "Baseline",
+    "Calibrator",
+    "Digest",
     "Event",
     "EventMetric",
     "EventTag",
+    "Feedback",
+    "ImportCheckpoint",
     "Incident",
+    "ModelVersion",
     "SessionLocal",
+    "get_async_engine",
+    "get_async_session",
     "get_engine",
     "get_session",
 ]
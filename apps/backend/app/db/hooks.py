@@ -0,0 +1,60 @@
+"""Callbacks that run once the surrounding session transaction commits.
+
+Callbacks registered with ``blocking=True`` do network or database I/O. An async route
+that runs ingest through ``AsyncSession.run_sync`` commits on the event loop, so it calls
+``defer_blocking`` first and runs what ``take_deferred`` returns in a worker thread;
+everywhere else they run in the commit hook like any other callback.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, SessionTransaction
+
+_PENDING_KEY = "after_commit_callbacks"
+_DEFERRED_KEY = "deferred_callbacks"
+
+
+def after_commit(session: Session, callback: Callable[[], None], blocking: bool = False) -> None:
+    """Run ``callback`` after the session's current transaction commits.
+
+    Callbacks are dropped if the transaction rolls back, so in-process state derived from
+    the transaction never gets ahead of the database.
+    """
+
+    session.info.setdefault(_PENDING_KEY, []).append((callback, blocking))
+
+
+def defer_blocking(session: Session) -> None:
+    """Queue blocking callbacks of later commits instead of running them in the hook."""
+
+    session.info.setdefault(_DEFERRED_KEY, [])
+
+
+def take_deferred(session: Session) -> list[Callable[[], None]]:
+    """Stop deferring and return the blocking callbacks of the commits since then."""
+
+    return session.info.pop(_DEFERRED_KEY, [])
+
+
+def run_callbacks(callbacks: Iterable[Callable[[], None]]) -> None:
+    for callback in callbacks:
+        callback()
+
+
+@event.listens_for(Session, "after_commit")
+def _run_pending(session: Session) -> None:
+    deferred = session.info.get(_DEFERRED_KEY)
+    for callback, blocking in session.info.pop(_PENDING_KEY, []):
+        if blocking and deferred is not None:
+            deferred.append(callback)
+        else:
+            callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
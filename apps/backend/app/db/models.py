@@ -1,10 +1,24 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from typing import Any
 
-from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text, UniqueConstraint, UUID
+from sqlalchemy import event as orm_event
+from sqlalchemy import (
+    JSON,
+    UUID,
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -14,6 +28,7 @@ class Base(DeclarativeBase):
 
 class Incident(Base):
     __tablename__ = "incidents"
+    __table_args__ = (Index("ix_incidents_last_event_at", "last_event_at", "id"),)
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True, index=True)
@@ -21,15 +36,24 @@ class Incident(Base):
     score: Mapped[float | None] = mapped_column(Float, nullable=True)
     summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     last_event_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    first_event_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    event_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    sources: Mapped[list[str]] = mapped_column(JSON, default=list, nullable=False)
+    tag_counts: Mapped[dict[str, int]] = mapped_column(JSON, default=dict, nullable=False)
 
     events: Mapped[list["Event"]] = relationship(back_populates="incident", cascade="all, delete-orphan")
 
+    def top_tags(self, limit: int = 5) -> list[str]:
+        ranked = sorted(self.tag_counts.items(), key=lambda item: (-item[1], item[0]))
+        return [tag for tag, _ in ranked[:limit]]
+
 
 class Event(Base):
     __tablename__ = "events"
     __table_args__ = (
         Index("ix_events_occurred_at", "occurred_at"),
         Index("ix_events_entity_window", "entity_type", "entity_id", "occurred_at"),
+        UniqueConstraint("fingerprint", name="uq_events_fingerprint"),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -48,6 +72,9 @@ class Event(Base):
     score: Mapped[float | None] = mapped_column(Float, nullable=True)
     explain: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict, nullable=False)
     incident_id: Mapped[uuid.UUID | None] = mapped_column(ForeignKey("incidents.id"), nullable=True, index=True)
+    fingerprint: Mapped[str | None] = mapped_column(String(96), nullable=True)
+    # SHA-256 of body/links/extras when they live in the blob store (see app.archive.blobs).
+    payload_ref: Mapped[str | None] = mapped_column(String(64), nullable=True)
 
     incident: Mapped["Incident"] = relationship(back_populates="events")
     metrics: Mapped[list["EventMetric"]] = relationship(back_populates="event", cascade="all, delete-orphan")
@@ -64,10 +91,15 @@ class Event(Base):
 
 class EventTag(Base):
     __tablename__ = "event_tags"
-    __table_args__ = (UniqueConstraint("event_id", "value", name="uq_event_tags_value"),)
+    __table_args__ = (
+        UniqueConstraint("event_id", "value", name="uq_event_tags_value"),
+        Index("ix_event_tags_value", "value", "event_id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     event_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Copy of the event's partition key; on Postgres the child tables are partitioned with it.
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     value: Mapped[str] = mapped_column(String(64), nullable=False)
 
     event: Mapped["Event"] = relationship(back_populates="tag_rows")
@@ -79,8 +111,134 @@ class EventMetric(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     event_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("events.id", ondelete="CASCADE"), nullable=False, index=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     name: Mapped[str] = mapped_column(String(128), nullable=False)
     value: Mapped[float] = mapped_column(Float, nullable=False)
     unit: Mapped[str | None] = mapped_column(String(32), nullable=True)
 
     event: Mapped["Event"] = relationship(back_populates="metrics")
+
+
+class ArchiveSegment(Base):
+    """One columnar file of archived events: a single UTC day and source."""
+
+    __tablename__ = "archive_segments"
+    __table_args__ = (Index("ix_archive_segments_range", "max_occurred_at", "min_occurred_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    key: Mapped[str] = mapped_column(String(512), nullable=False, unique=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    source: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    min_occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    max_occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class Digest(Base):
+    """Low-priority events of one user and period, maintained as events are ingested.
+
+    ``user_id`` is the max UUID for events not tied to a user's incident.
+    """
+
+    __tablename__ = "digests"
+    __table_args__ = (
+        UniqueConstraint("user_id", "period", "bucket_start", name="uq_digests_bucket"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    period: Mapped[str] = mapped_column(String(16), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    event_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    max_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    top_events: Mapped[list[dict[str, Any]]] = mapped_column(JSON, default=list, nullable=False)
+    incidents: Mapped[dict[str, dict[str, Any]]] = mapped_column(JSON, default=dict, nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class Baseline(Base):
+    """Running statistics of one metric for one entity; see ``app.ingest.baselines``."""
+
+    __tablename__ = "baselines"
+    __table_args__ = (
+        UniqueConstraint("entity_type", "entity_id", "metric", name="uq_baselines_key"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    entity_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    entity_id: Mapped[str] = mapped_column(String(128), nullable=False)
+    metric: Mapped[str] = mapped_column(String(128), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    mean: Mapped[float] = mapped_column(Float, nullable=False)
+    m2: Mapped[float] = mapped_column(Float, nullable=False)  # sum of squared deviations
+    ewm_mean: Mapped[float] = mapped_column(Float, nullable=False)
+    ewm_var: Mapped[float] = mapped_column(Float, nullable=False)
+    last_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class ModelVersion(Base):
+    """An immutable scoring model definition; see ``app.ingest.scoring_models``."""
+
+    __tablename__ = "scoring_models"
+
+    version: Mapped[str] = mapped_column(String(64), primary_key=True)
+    definition: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    # "live" (scores events), "shadow" (scored alongside, recorded in explain) or "inactive".
+    status: Mapped[str] = mapped_column(String(16), default="inactive", nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class Feedback(Base):
+    """A user's verdict on one event; the latest verdict per event is kept."""
+
+    __tablename__ = "feedback"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # No foreign key: events are partitioned on Postgres and may be archived.
+    event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, unique=True)
+    source: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    score: Mapped[float | None] = mapped_column(Float, nullable=True)  # before calibration
+    outcome: Mapped[str] = mapped_column(String(16), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class Calibrator(Base):
+    """Platt scaling parameters of one source in one fitted calibration version."""
+
+    __tablename__ = "calibrators"
+    __table_args__ = (UniqueConstraint("version", "source", name="uq_calibrators_version_source"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    source: Mapped[str] = mapped_column(String(64), nullable=False)
+    a: Mapped[float] = mapped_column(Float, nullable=False)
+    b: Mapped[float] = mapped_column(Float, nullable=False)
+    samples: Mapped[int] = mapped_column(Integer, nullable=False)
+    positives: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class ImportCheckpoint(Base):
+    """Rows of one archive member that a bulk import has committed."""
+
+    __tablename__ = "import_checkpoints"
+    __table_args__ = (UniqueConstraint("importer", "key", name="uq_import_checkpoints_key"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    importer: Mapped[str] = mapped_column(String(64), nullable=False)
+    # User, member name, CRC and size: importing the archive for another user, or a
+    # re-exported archive with changed contents, starts over.
+    key: Mapped[str] = mapped_column(String(512), nullable=False)
+    rows: Mapped[int] = mapped_column(Integer, nullable=False)
+    done: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+@orm_event.listens_for(EventTag, "before_insert")
+@orm_event.listens_for(EventMetric, "before_insert")
+def _copy_occurred_at(mapper: Any, connection: Any, target: EventTag | EventMetric) -> None:
+    if target.occurred_at is None and target.event is not None:
+        target.occurred_at = target.event.occurred_at
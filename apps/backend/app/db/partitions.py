@@ -0,0 +1,185 @@
+"""Range partitions of ``events``, ``event_tags`` and ``event_metrics`` on Postgres.
+
+All three tables are partitioned by ``occurred_at`` on the same boundaries (UTC days, or
+ISO weeks starting Monday; ``EVENT_PARTITION_INTERVAL``), and a partition of each is named
+after the table and its lower bound, e.g. ``event_tags_p20251013``. A ``*_default``
+partition catches rows outside every range so ingest never fails on a missing partition;
+keep it empty by creating partitions ahead of time. SQLite keeps plain tables and every
+function here is a no-op there.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+# Parent first: children reference ``events`` and are dropped before it.
+PARTITIONED_TABLES = ("events", "event_tags", "event_metrics")
+PARTITIONS_AHEAD = 4
+INTERVALS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+_BOUND = re.compile(r"FOR VALUES FROM \('(?P<lo>[^']+)'\) TO \('(?P<hi>[^']+)'\)")
+
+
+@dataclass(frozen=True)
+class Partition:
+    table: str
+    name: str
+    lower: datetime
+    upper: datetime
+
+
+def partition_interval() -> str:
+    interval = os.getenv("EVENT_PARTITION_INTERVAL", "week").lower()
+    if interval not in INTERVALS:
+        raise ValueError(f"EVENT_PARTITION_INTERVAL must be one of {sorted(INTERVALS)}")
+    return interval
+
+
+def is_partitioned(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql"
+
+
+def range_start(moment: datetime, interval: str) -> datetime:
+    """Lower bound of the partition that holds ``moment``."""
+
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    day = moment.astimezone(timezone.utc).date()
+    if interval == "week":
+        day -= timedelta(days=day.weekday())
+    return datetime.combine(day, time(), tzinfo=timezone.utc)
+
+
+def partition_ranges(
+    start: datetime, end: datetime, interval: str
+) -> list[tuple[datetime, datetime]]:
+    """Consecutive ``[lower, upper)`` ranges covering ``start`` through ``end``."""
+
+    step = INTERVALS[interval]
+    lower = range_start(start, interval)
+    ranges = []
+    while lower <= end:
+        ranges.append((lower, lower + step))
+        lower += step
+    return ranges
+
+
+def partition_name(table: str, lower: datetime) -> str:
+    return f"{table}_p{lower:%Y%m%d}"
+
+
+def list_partitions(connection: Connection, table: str) -> list[Partition]:
+    """Range partitions attached to ``table``, oldest first (the default one excluded)."""
+
+    rows = connection.execute(
+        text(
+            "SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)"
+            " FROM pg_inherits"
+            " JOIN pg_class parent ON parent.oid = pg_inherits.inhparent"
+            " JOIN pg_class child ON child.oid = pg_inherits.inhrelid"
+            " WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    partitions = []
+    for name, bound in rows:
+        match = _BOUND.search(bound or "")
+        if match is None:
+            continue
+        partitions.append(
+            Partition(table, name, _parse_bound(match["lo"]), _parse_bound(match["hi"]))
+        )
+    return sorted(partitions, key=lambda partition: partition.lower)
+
+
+def create_partitions(
+    connection: Connection, start: datetime, end: datetime, interval: str | None = None
+) -> list[str]:
+    """Create any missing partitions of every table for ``start`` through ``end``."""
+
+    if not is_partitioned(connection):
+        return []
+    interval = interval or partition_interval()
+    # API workers and the maintenance job may race at startup; serialize them.
+    connection.execute(text("SELECT pg_advisory_xact_lock(hashtext('signalos_partitions'))"))
+    existing = {
+        table: [(p.lower, p.upper) for p in list_partitions(connection, table)]
+        for table in PARTITIONED_TABLES
+    }
+    has_default = connection.execute(text("SELECT to_regclass('events_default')")).scalar()
+    created = []
+    for lower, upper in partition_ranges(start, end, interval):
+        missing = [
+            table
+            for table in PARTITIONED_TABLES
+            if not any(lower < hi and lo < upper for lo, hi in existing[table])
+        ]
+        if missing and has_default and _default_holds(connection, lower, upper):
+            # Postgres refuses a partition whose range already has rows in the default one.
+            continue
+        for table in missing:
+            name = partition_name(table, lower)
+            connection.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table}"
+                    f" FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+                )
+            )
+            created.append(name)
+    return created
+
+
+def ensure_partitions(engine: Engine, ahead: int = PARTITIONS_AHEAD) -> list[str]:
+    """Create partitions from the current one through ``ahead`` intervals in the future."""
+
+    if engine.dialect.name != "postgresql":
+        return []
+    interval = partition_interval()
+    now = datetime.now(timezone.utc)
+    with engine.begin() as connection:
+        return create_partitions(connection, now, now + INTERVALS[interval] * ahead, interval)
+
+
+def drop_partitions_before(connection: Connection, cutoff: datetime) -> list[str]:
+    """Drop every partition whose whole range ends at or before ``cutoff``.
+
+    Tag and metric partitions go first so the foreign keys into ``events`` never see a
+    missing parent row, and each partition is detached before it is dropped because the
+    composite foreign keys depend on the ``events`` partitions themselves.
+    """
+
+    if not is_partitioned(connection):
+        return []
+    dropped = []
+    for table in reversed(PARTITIONED_TABLES):
+        for partition in list_partitions(connection, table):
+            if partition.upper <= cutoff:
+                connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name}"))
+                connection.execute(text(f"DROP TABLE {partition.name}"))
+                dropped.append(partition.name)
+    return dropped
+
+
+def _default_holds(connection: Connection, lower: datetime, upper: datetime) -> bool:
+    return bool(
+        connection.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM events_default"
+                " WHERE occurred_at >= :lower AND occurred_at < :upper)"
+            ),
+            {"lower": lower, "upper": upper},
+        ).scalar()
+    )
+
+
+def _parse_bound(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import os
+
+import redis
+
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+
+_client: redis.Redis | None = None
+_client_url: str | None = None
+
+
+def get_redis_url() -> str:
+    return os.getenv("REDIS_URL", DEFAULT_REDIS_URL)
+
+
+def get_redis_client(url: str | None = None) -> redis.Redis:
+    """Return a process-wide client; connections are pooled by redis-py."""
+
+    global _client, _client_url
+    resolved = url or get_redis_url()
+    if _client is None or _client_url != resolved:
+        _client = redis.Redis.from_url(resolved, decode_responses=True)
+        _client_url = resolved
+    return _client
+
+
+def get_redis() -> redis.Redis:
+    return get_redis_client()
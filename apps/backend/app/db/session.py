@@ -1,17 +1,33 @@
 from __future__ import annotations
 
 import os
-from typing import Generator
+import threading
+from typing import Any, AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.engine import URL, Connection, Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
+from app.telemetry import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
 DEFAULT_SQLITE_URL = "sqlite+pysqlite:///./signalos.db"
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+psycopg"}
+SYNC_DRIVERS = {"sqlite": "sqlite+pysqlite", "postgresql": "postgresql+psycopg"}
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, future=True)
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
 _engine: Engine | None = None
 _engine_url: str | None = None
+_async_engine: AsyncEngine | None = None
+_async_engine_url: str | None = None
+_sync_engines: dict[str, Engine] = {}
+_sync_engines_lock = threading.Lock()
 
 
 def get_database_url() -> str:
@@ -32,12 +48,25 @@ def get_engine(url: str | None = None) -> Engine:
     resolved = url or get_database_url()
     normalized = str(make_url(resolved))
     if _engine is None or _engine_url != normalized:
-        _engine = create_engine(normalized, echo=False, future=True, pool_pre_ping=True)
+        _engine = create_engine(
+            normalized, echo=False, future=True, pool_pre_ping=True, **_pool_options(normalized)
+        )
         SessionLocal.configure(bind=_engine)
         _engine_url = str(_engine.url)
     return _engine
 
 
+def _pool_options(url: str | URL, asyncio: bool = False) -> dict[str, Any]:
+    """Use the checkout-timing pool wherever SQLAlchemy would pick a queue pool."""
+
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and (
+        asyncio or parsed.database in (None, "", ":memory:")
+    ):
+        return {}  # NullPool (aiosqlite) or SingletonThreadPool (in-memory) by default
+    return {"poolclass": InstrumentedAsyncQueuePool if asyncio else InstrumentedQueuePool}
+
+
 def get_session() -> Generator[Session, None, None]:
     get_engine()
     session: Session = SessionLocal()
@@ -45,3 +74,69 @@ def get_session() -> Generator[Session, None, None]:
         yield session
     finally:
         session.close()
+
+
+def get_session_factory() -> sessionmaker[Session]:
+    """For responses that open their own sessions, e.g. while streaming after the handler."""
+
+    get_engine()
+    return SessionLocal
+
+
+def database_key(bind: Engine | Connection) -> str:
+    """Identify the database behind ``bind``, ignoring the driver (sync or asyncio)."""
+
+    url = bind.engine.url
+    return url.set(drivername=url.get_backend_name()).render_as_string(hide_password=True)
+
+
+def sync_engine(bind: Engine | Connection) -> Engine:
+    """A sync engine for the database behind ``bind``, usable outside any event loop.
+
+    The engine behind an ``AsyncSession`` only works inside its greenlet, so components
+    that outlive one session (write-behind caches) must not keep it.
+    """
+
+    engine = bind.engine
+    if not engine.dialect.is_async:
+        return engine
+    key = database_key(engine)
+    if database_key(get_engine()) == key:
+        return get_engine()
+    with _sync_engines_lock:
+        found = _sync_engines.get(key)
+        if found is None:
+            url = engine.url
+            url = url.set(drivername=SYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+            normalized = url.render_as_string(hide_password=False)
+            found = _sync_engines[key] = create_engine(
+                normalized, future=True, pool_pre_ping=True, **_pool_options(normalized)
+            )
+    return found
+
+
+def to_async_url(url: str | URL) -> URL:
+    """Swap the sync driver for its asyncio counterpart (aiosqlite, psycopg async)."""
+
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    return parsed.set(drivername=driver) if driver else parsed
+
+
+def get_async_engine(url: str | None = None) -> AsyncEngine:
+    global _async_engine, _async_engine_url
+    resolved = to_async_url(url or get_database_url())
+    normalized = resolved.render_as_string(hide_password=False)
+    if _async_engine is None or _async_engine_url != normalized:
+        _async_engine = create_async_engine(
+            resolved, echo=False, pool_pre_ping=True, **_pool_options(resolved, asyncio=True)
+        )
+        AsyncSessionLocal.configure(bind=_async_engine)
+        _async_engine_url = normalized
+    return _async_engine
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    get_async_engine()
+    async with AsyncSessionLocal() as session:
+        yield session
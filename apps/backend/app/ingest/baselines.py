@@ -0,0 +1,350 @@
+"""Per-entity metric baselines kept up to date at ingest.
+
+Every numeric metric an event carries updates the baseline of its (entity, metric name):
+a running count, mean and sum of squared deviations (Welford) and an exponentially
+weighted mean and variance. The weight of a new value is ``max(BASELINE_ALPHA, 1/n)``,
+so the weighted statistics equal the plain mean and variance until ``1/BASELINE_ALPHA``
+values have been seen and then track drift. Entities of type ``user`` carry the
+per-user baselines.
+
+Before scoring, the pipeline compares each metric with its baseline and passes
+``<name>_z`` to ``feature_vector`` (unless the event already sends it), so
+``health_anomaly`` events can send their raw ``rhr`` and get ``rhr_z`` filled in. The
+baseline of a value is the one before that value, so an outlier does not soften its own
+z-score.
+
+Baselines are cached in memory per process and database. Updates are applied after
+commit and written back to ``baselines`` in batches (every ``BASELINE_FLUSH_SECONDS`` or
+1000 dirty keys, and at shutdown); the last writer wins when several processes ingest the
+same entity. ``python -m app.jobs.rebuild_baselines`` recomputes the table from history.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.api.schemas import EventCreate
+from app.db import Baseline
+from app.db.hooks import after_commit
+from app.db.session import database_key, sync_engine
+from app.timeutil import utc
+
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_SAMPLES = 5
+DEFAULT_CACHE_SIZE = 100_000
+DEFAULT_FLUSH_SECONDS = 5.0
+FLUSH_BATCH = 1000
+Z_SUFFIX = "_z"
+
+logger = logging.getLogger(__name__)
+
+Key = tuple[str, str, str]  # entity_type, entity_id, metric
+
+
+@dataclass
+class Stats:
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    ewm_mean: float = 0.0
+    ewm_var: float = 0.0
+    last_at: datetime | None = None
+
+    def observe(self, value: float, at: datetime, alpha: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        weight = max(alpha, 1 / self.count)
+        diff = value - self.ewm_mean
+        self.ewm_mean += weight * diff
+        self.ewm_var = (1 - weight) * (self.ewm_var + weight * diff * diff)
+        at = utc(at)
+        if self.last_at is None or at > self.last_at:
+            self.last_at = at
+
+    def deviation(self, value: float, min_samples: int) -> Deviation | None:
+        if self.count < min_samples or self.ewm_var <= 0:
+            return None
+        std = math.sqrt(self.ewm_var)
+        return Deviation((value - self.ewm_mean) / std, self.ewm_mean, std, self.count)
+
+
+@dataclass(frozen=True)
+class Deviation:
+    """How far one metric value is from its entity's baseline."""
+
+    z: float
+    mean: float
+    std: float
+    count: int
+
+    def explain(self) -> dict[str, Any]:
+        return {
+            "z": round(self.z, 4),
+            "mean": round(self.mean, 4),
+            "std": round(self.std, 4),
+            "n": self.count,
+        }
+
+
+class BaselineStore:
+    """Write-behind cache of baselines for one database."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        alpha: float = DEFAULT_ALPHA,
+        min_samples: int = DEFAULT_MIN_SAMPLES,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.engine = engine
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.maxsize = maxsize
+        self.flush_seconds = flush_seconds
+        self._clock = clock
+        self._stats: OrderedDict[Key, Stats] = OrderedDict()
+        self._dirty: set[Key] = set()
+        self._last_flush = clock()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def snapshot(self, session: Session, keys: Iterable[Key]) -> dict[Key, Stats]:
+        """Copies of the baselines for ``keys``, loading cache misses from the database."""
+
+        wanted = set(keys)
+        with self._lock:
+            found = {key: replace(self._stats[key]) for key in wanted if key in self._stats}
+        missing = wanted - found.keys()
+        if missing:
+            loaded = {key: Stats() for key in missing}
+            with session.no_autoflush:
+                for row in session.execute(
+                    select(Baseline).where(
+                        tuple_(Baseline.entity_type, Baseline.entity_id, Baseline.metric).in_(
+                            missing
+                        )
+                    )
+                ).scalars():
+                    loaded[(row.entity_type, row.entity_id, row.metric)] = _from_row(row)
+            with self._lock:
+                for key, stats in loaded.items():
+                    self._stats.setdefault(key, stats)
+                    found[key] = replace(self._stats[key])
+                self._evict()
+        return found
+
+    def apply(self, observations: Sequence[tuple[Key, float, datetime]]) -> None:
+        """Fold committed values into the cache; flush when enough is pending."""
+
+        with self._lock:
+            for key, value, at in observations:
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = Stats()
+                stats.observe(value, at, self.alpha)
+                self._stats.move_to_end(key)
+                self._dirty.add(key)
+            due = (
+                len(self._dirty) >= FLUSH_BATCH
+                or self._clock() - self._last_flush >= self.flush_seconds
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write dirty baselines to the database; return how many were written."""
+
+        with self._lock:
+            self._last_flush = self._clock()
+            pending = {key: replace(self._stats[key]) for key in self._dirty}
+            self._dirty.clear()
+        if not pending:
+            return 0
+        try:
+            with self.engine.begin() as connection:
+                write_baselines(connection, pending)
+        except SQLAlchemyError:
+            logger.warning("baseline flush failed; will retry", exc_info=True)
+            with self._lock:
+                self._dirty.update(pending.keys() & self._stats.keys())
+            return 0
+        with self._lock:
+            self._evict()
+        return len(pending)
+
+    def clear(self) -> None:
+        """Forget cached baselines, e.g. after a rebuild replaced the table."""
+
+        with self._lock:
+            self._stats.clear()
+            self._dirty.clear()
+
+    def _evict(self) -> None:
+        """Drop the least recently used clean entries beyond ``maxsize``."""
+
+        excess = len(self._stats) - self.maxsize
+        if excess <= 0:
+            return
+        for key in [key for key in self._stats if key not in self._dirty][:excess]:
+            del self._stats[key]
+
+
+def write_baselines(connection: Connection, stats: dict[Key, Stats]) -> None:
+    """Upsert ``stats`` into ``baselines``."""
+
+    now = datetime.now(timezone.utc)
+    rows = [_to_row(key, value, now) for key, value in stats.items()]
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt: postgresql.Insert | sqlite.Insert = (
+            postgresql.insert(Baseline) if dialect == "postgresql" else sqlite.insert(Baseline)
+        )
+        columns = ("count", "mean", "m2", "ewm_mean", "ewm_var", "last_at", "updated_at")
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["entity_type", "entity_id", "metric"],
+                set_={name: stmt.excluded[name] for name in columns},
+            ),
+            rows,
+        )
+        return
+    connection.execute(
+        delete(Baseline).where(
+            tuple_(Baseline.entity_type, Baseline.entity_id, Baseline.metric).in_(stats)
+        )
+    )
+    connection.execute(insert(Baseline), rows)
+
+
+def _from_row(row: Baseline) -> Stats:
+    return Stats(
+        count=row.count,
+        mean=row.mean,
+        m2=row.m2,
+        ewm_mean=row.ewm_mean,
+        ewm_var=row.ewm_var,
+        last_at=utc(row.last_at) if row.last_at is not None else None,
+    )
+
+
+def _to_row(key: Key, stats: Stats, now: datetime) -> dict[str, Any]:
+    entity_type, entity_id, metric = key
+    return {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "metric": metric,
+        "count": stats.count,
+        "mean": stats.mean,
+        "m2": stats.m2,
+        "ewm_mean": stats.ewm_mean,
+        "ewm_var": stats.ewm_var,
+        "last_at": stats.last_at,
+        "updated_at": now,
+    }
+
+
+def baselines_mode() -> str:
+    return os.getenv("BASELINES", "on").lower()
+
+
+_stores: dict[str, BaselineStore] = {}
+_registry_lock = threading.Lock()
+
+
+def get_baseline_store(session: Session) -> BaselineStore | None:
+    """Return the store for the session's database, or ``None`` when disabled."""
+
+    if baselines_mode() == "off":
+        return None
+    bind = session.get_bind()
+    key = database_key(bind)
+    with _registry_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = BaselineStore(
+                sync_engine(bind),
+                alpha=float(os.getenv("BASELINE_ALPHA", DEFAULT_ALPHA)),
+                min_samples=int(os.getenv("BASELINE_MIN_SAMPLES", DEFAULT_MIN_SAMPLES)),
+                maxsize=int(os.getenv("BASELINE_CACHE_SIZE", DEFAULT_CACHE_SIZE)),
+                flush_seconds=float(os.getenv("BASELINE_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)),
+            )
+    return store
+
+
+def flush_baselines() -> int:
+    """Write every store's pending baselines; call at shutdown."""
+
+    with _registry_lock:
+        stores = list(_stores.values())
+    return sum(store.flush() for store in stores)
+
+
+def observe_metrics(
+    session: Session, events: Sequence[EventCreate], record: bool = True
+) -> list[dict[str, Deviation]]:
+    """Deviation of each event's metrics from their baselines, keyed by metric name.
+
+    Events are compared in order, each against the baselines updated by the events
+    before it; with ``record``, the values are added to the cache once ``session`` commits.
+    """
+
+    store = get_baseline_store(session)
+    if store is None:
+        return [{} for _ in events]
+    observations = [
+        ((event.entity.type, event.entity.id, name), value, event.occurred_at)
+        for event in events
+        for name, value in _values(event)
+    ]
+    if not observations:
+        return [{} for _ in events]
+    stats = store.snapshot(session, {key for key, _, _ in observations})
+    deviations: list[dict[str, Deviation]] = []
+    for event in events:
+        found: dict[str, Deviation] = {}
+        for name, value in _values(event):
+            baseline = stats[(event.entity.type, event.entity.id, name)]
+            deviation = baseline.deviation(value, store.min_samples)
+            if deviation is not None:
+                found[name] = deviation
+            baseline.observe(value, event.occurred_at, store.alpha)
+        deviations.append(found)
+    if record:
+        # Blocking: applying may flush to the database.
+        after_commit(session, lambda: store.apply(observations), blocking=True)
+    return deviations
+
+
+def _values(event: EventCreate) -> list[tuple[str, float]]:
+    values = []
+    for metric in event.metrics:
+        if metric.name.endswith(Z_SUFFIX):
+            continue
+        try:
+            value = float(metric.value)
+        except (TypeError, ValueError):
+            continue
+        if math.isfinite(value):
+            values.append((metric.name, value))
+    return values
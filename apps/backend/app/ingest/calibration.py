@@ -0,0 +1,117 @@
+"""Per-source score calibration applied at ingest.
+
+``python -m app.jobs.fit_calibrators`` fits Platt parameters per source from
+``feedback`` and stores them as a new version in ``calibrators``. Each process keeps the
+newest version in memory as a dict keyed by source and checks for a newer one at most
+every ``CALIBRATION_RELOAD_SECONDS`` (default 60). The pipeline replaces the raw score of
+an event whose source has a calibrator with the calibrated probability before routing;
+``explain.calibration`` records the version and the raw score. Sources without a
+calibrator keep their raw score. ``CALIBRATION=off`` disables calibration.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db import Calibrator
+from app.db.session import database_key
+from app.services.calibration import calibrate
+
+DEFAULT_RELOAD_SECONDS = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CalibrationTable:
+    version: int | None = None
+    params: dict[str, tuple[float, float]] = field(default_factory=dict)
+
+    def calibrate(self, source: str, score_value: float) -> float | None:
+        """The calibrated score, or ``None`` when ``source`` has no calibrator."""
+
+        params = self.params.get(source)
+        return None if params is None else calibrate(score_value, *params)
+
+
+class CalibrationRegistry:
+    """The newest calibration version of one database."""
+
+    def __init__(
+        self,
+        reload_seconds: float = DEFAULT_RELOAD_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.reload_seconds = reload_seconds
+        self.table = CalibrationTable()
+        self._clock = clock
+        self._checked = -math.inf
+        self._lock = threading.Lock()
+
+    def current(self, session: Session) -> CalibrationTable:
+        if self._clock() - self._checked >= self.reload_seconds:
+            self.reload(session)
+        return self.table
+
+    def reload(self, session: Session) -> None:
+        with self._lock:
+            self._checked = self._clock()
+        try:
+            with session.no_autoflush:
+                version = session.execute(select(func.max(Calibrator.version))).scalar()
+                if version is None or version == self.table.version:
+                    return
+                rows = session.execute(
+                    select(Calibrator.source, Calibrator.a, Calibrator.b).where(
+                        Calibrator.version == version
+                    )
+                ).all()
+        except SQLAlchemyError:
+            logger.warning(
+                "calibration reload failed; keeping version %s", self.table.version, exc_info=True
+            )
+            return
+        self.table = CalibrationTable(version, {source: (a, b) for source, a, b in rows})
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked = -math.inf
+
+
+_registries: dict[str, CalibrationRegistry] = {}
+_registry_lock = threading.Lock()
+
+
+def calibration_mode() -> str:
+    return os.getenv("CALIBRATION", "on").lower()
+
+
+def get_calibration_registry(session: Session) -> CalibrationRegistry:
+    """Return the registry for the session's database."""
+
+    key = database_key(session.get_bind())
+    with _registry_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = CalibrationRegistry(
+                float(os.getenv("CALIBRATION_RELOAD_SECONDS", DEFAULT_RELOAD_SECONDS))
+            )
+    return registry
+
+
+def current_calibration(session: Session) -> CalibrationTable:
+    """The newest calibration version, or an empty table when calibration is off."""
+
+    if calibration_mode() == "off":
+        return CalibrationTable()
+    return get_calibration_registry(session).current(session)
@@ -0,0 +1,395 @@
+"""In-process sliding-window index of recent events used for correlation lookups.
+
+The index holds every event whose ``occurred_at`` falls inside the open window (the
+allowed lateness plus one correlation window behind the wall clock), bucketed by
+``(entity_type, entity_id)`` and by tag. A merge lookup therefore only touches the buckets
+of the incoming event's own entity and tags instead of scanning every event in the time
+range.
+
+Events older than the open window are not indexed; ``covers`` tells the pipeline when it
+has to fall back to the SQL candidate query. The API, the stream worker and the connector
+runtime ingest side by side, so with ``CORRELATION_INDEX_SYNC=redis`` (the default) each
+process publishes its committed index updates on Redis and applies everyone else's. The
+index is only used while that subscription is up: it is warmed from the database each
+time it (re)subscribes, and falls back to SQL while Redis is unreachable.
+``CORRELATION_INDEX_SYNC=off`` keeps updates local, for a single ingesting process.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID, uuid4
+
+import redis
+from pydantic_core import from_json, to_json
+from sqlalchemy import select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db import Event, EventTag
+from app.db.hooks import after_commit
+from app.db.redis import get_redis_url
+from app.db.session import database_key, sync_engine
+
+DEFAULT_WINDOW = timedelta(minutes=15)
+DEFAULT_LATENESS = timedelta(hours=1)
+SYNC_CHANNEL = "signalos:correlation"
+RECONNECT_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(eq=False)
+class IndexEntry:
+    event_id: UUID
+    source: str
+    entity_type: str
+    entity_id: str
+    occurred_ms: int
+    tags: tuple[str, ...]
+    score: float | None
+    incident_id: UUID | None
+
+    @property
+    def entity(self) -> tuple[str, str]:
+        return (self.entity_type, self.entity_id)
+
+
+def _occurred(entry: IndexEntry) -> int:
+    return entry.occurred_ms
+
+
+class CorrelationIndex:
+    """Entity and tag buckets of recent events, evicted as the wall clock advances."""
+
+    def __init__(
+        self,
+        window: timedelta = DEFAULT_WINDOW,
+        lateness: timedelta = DEFAULT_LATENESS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.window_ms = int(window.total_seconds() * 1000)
+        self.lateness_ms = int(lateness.total_seconds() * 1000)
+        self._clock = clock
+        self._by_id: dict[UUID, IndexEntry] = {}
+        self._by_entity: dict[tuple[str, str], list[IndexEntry]] = {}
+        self._by_tag: dict[str, list[IndexEntry]] = {}
+        self._expiry: list[tuple[int, int, IndexEntry]] = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self.warmed = False
+        self.synced = True  # False while updates from other processes may be missing
+        self.sync: IndexSync | None = None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    @property
+    def horizon_ms(self) -> int:
+        """Oldest ``occurred_at`` (epoch ms) for which the index is complete."""
+
+        return int(self._clock() * 1000) - self.lateness_ms - self.window_ms
+
+    def covers(self, occurred_ms: int) -> bool:
+        return self.warmed and self.synced and occurred_ms - self.window_ms >= self.horizon_ms
+
+    def candidates(
+        self, entity: tuple[str, str], tags: Iterable[str], occurred_ms: int
+    ) -> list[IndexEntry]:
+        """Return entries sharing the entity or a tag within the window, newest first."""
+
+        lo, hi = occurred_ms - self.window_ms, occurred_ms + self.window_ms
+        found: dict[UUID, IndexEntry] = {}
+        with self._lock:
+            self._evict()
+            buckets = [self._by_entity.get(entity)]
+            buckets.extend(self._by_tag.get(tag) for tag in set(tags))
+            for bucket in buckets:
+                if not bucket:
+                    continue
+                start = bisect_left(bucket, lo, key=_occurred)
+                stop = bisect_right(bucket, hi, key=_occurred)
+                for entry in bucket[start:stop]:
+                    found[entry.event_id] = entry
+        return sorted(found.values(), key=_occurred, reverse=True)
+
+    def add(self, entry: IndexEntry, replace: bool = True) -> None:
+        with self._lock:
+            if entry.occurred_ms < self.horizon_ms:
+                return
+            if not replace and entry.event_id in self._by_id:
+                return
+            previous = self._by_id.pop(entry.event_id, None)
+            if previous is not None:
+                self._unlink(previous)
+            self._by_id[entry.event_id] = entry
+            insort(self._by_entity.setdefault(entry.entity, []), entry, key=_occurred)
+            for tag in entry.tags:
+                insort(self._by_tag.setdefault(tag, []), entry, key=_occurred)
+            self._sequence += 1
+            heapq.heappush(self._expiry, (entry.occurred_ms, self._sequence, entry))
+            self._evict()
+
+    def assign(self, event_id: UUID, incident_id: UUID) -> None:
+        with self._lock:
+            entry = self._by_id.get(event_id)
+            if entry is not None:
+                entry.incident_id = incident_id
+
+    def reset(self) -> None:
+        """Drop every entry; the index has to be warmed again before it is used."""
+
+        with self._lock:
+            self.warmed = False
+            self._by_id.clear()
+            self._by_entity.clear()
+            self._by_tag.clear()
+            self._expiry.clear()
+
+    def warm(self, connection: Connection | Session) -> None:
+        """Load every event inside the open window from the database."""
+
+        since = datetime.fromtimestamp(self.horizon_ms / 1000, tz=timezone.utc)
+        rows = connection.execute(
+            select(
+                Event.id,
+                Event.source,
+                Event.entity_type,
+                Event.entity_id,
+                Event.occurred_at,
+                Event.score,
+                Event.incident_id,
+            ).where(Event.occurred_at >= since)
+        ).all()
+        tags: dict[UUID, list[str]] = {}
+        for event_id, value in connection.execute(
+            select(EventTag.event_id, EventTag.value).where(EventTag.occurred_at >= since)
+        ):
+            tags.setdefault(event_id, []).append(value)
+        for event_id, source, entity_type, entity_id, occurred_at, score, incident_id in rows:
+            self.add(
+                IndexEntry(
+                    event_id=event_id,
+                    source=source,
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    occurred_ms=to_epoch_ms(occurred_at),
+                    tags=tuple(tags.get(event_id, ())),
+                    score=score,
+                    incident_id=incident_id,
+                )
+            )
+        self.warmed = True
+
+    def _evict(self) -> None:
+        horizon = self.horizon_ms
+        while self._expiry and self._expiry[0][0] < horizon:
+            _, _, entry = heapq.heappop(self._expiry)
+            if self._by_id.get(entry.event_id) is entry:
+                del self._by_id[entry.event_id]
+                self._unlink(entry)
+
+    def _unlink(self, entry: IndexEntry) -> None:
+        keys: list[tuple[dict[Any, list[IndexEntry]], Any]] = [(self._by_entity, entry.entity)]
+        keys.extend((self._by_tag, tag) for tag in entry.tags)
+        for buckets, key in keys:
+            bucket = buckets.get(key)
+            if bucket is None:
+                continue
+            start = bisect_left(bucket, entry.occurred_ms, key=_occurred)
+            stop = bisect_right(bucket, entry.occurred_ms, key=_occurred)
+            for position in range(start, stop):
+                if bucket[position] is entry:
+                    del bucket[position]
+                    break
+            if not bucket:
+                del buckets[key]
+
+
+class IndexSync:
+    """Shares committed index updates with the other processes ingesting into a database.
+
+    Updates are published on the database's ``SYNC_CHANNEL``; a daemon thread applies the
+    other processes' updates and re-warms the index on every (re)subscription, since
+    whatever was published while it was disconnected is lost.
+    """
+
+    def __init__(
+        self, index: CorrelationIndex, engine: Engine, client: redis.Redis, channel: str
+    ) -> None:
+        self.index = index
+        self.engine = engine
+        self.client = client
+        self.channel = channel
+        self.origin = uuid4().hex
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._warned = False
+
+    def start(self) -> None:
+        self.index.synced = False
+        self._thread = threading.Thread(target=self._run, name="correlation-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def publish(
+        self, entries: Iterable[IndexEntry] = (), assign: dict[UUID, UUID] | None = None
+    ) -> None:
+        message = {
+            "origin": self.origin,
+            "add": [asdict(entry) for entry in entries],
+            "assign": list((assign or {}).items()),
+        }
+        try:
+            self.client.publish(self.channel, to_json(message))
+        except redis.RedisError:
+            logger.warning("correlation index publish failed", exc_info=True)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            pubsub = self.client.pubsub()
+            try:
+                pubsub.subscribe(self.channel)
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=RECONNECT_SECONDS)
+                    if message is None:
+                        continue
+                    if message["type"] == "subscribe":
+                        self._warm()
+                    elif message["type"] == "message":
+                        self._apply(message["data"])
+            except (redis.RedisError, SQLAlchemyError):
+                if not self._warned:  # once per outage
+                    logger.warning("correlation index sync down; using SQL", exc_info=True)
+                    self._warned = True
+            finally:
+                self.index.synced = False
+                pubsub.close()
+            self._stopped.wait(RECONNECT_SECONDS)
+
+    def _warm(self) -> None:
+        self.index.reset()
+        with self.engine.connect() as connection:
+            self.index.warm(connection)
+        self.index.synced = True
+        self._warned = False
+
+    def _apply(self, data: str | bytes) -> None:
+        message = from_json(data)
+        if message["origin"] == self.origin:
+            return
+        for item in message["add"]:
+            incident_id = item["incident_id"]
+            entry = IndexEntry(
+                event_id=UUID(item["event_id"]),
+                source=item["source"],
+                entity_type=item["entity_type"],
+                entity_id=item["entity_id"],
+                occurred_ms=item["occurred_ms"],
+                tags=tuple(item["tags"]),
+                score=item["score"],
+                incident_id=UUID(incident_id) if incident_id else None,
+            )
+            # Already loaded by a warm that read the row after this was published.
+            self.index.add(entry, replace=False)
+        for event_id, incident_id in message["assign"]:
+            self.index.assign(UUID(event_id), UUID(incident_id))
+
+
+def to_epoch_ms(dt: datetime) -> int:
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+_indexes: dict[str, CorrelationIndex] = {}
+_registry_lock = threading.Lock()
+
+
+def index_mode() -> str:
+    """``on`` (the default, warm on first use), ``eager`` (warm at API startup) or ``off``."""
+
+    return os.getenv("CORRELATION_INDEX", "on").lower()
+
+
+def sync_mode() -> str:
+    """``redis`` (the default) shares updates between processes; ``off`` keeps them local."""
+
+    return os.getenv("CORRELATION_INDEX_SYNC", "redis").lower()
+
+
+def get_correlation_index(session: Session) -> CorrelationIndex | None:
+    """Return the index for the session's database, or ``None`` when disabled."""
+
+    if index_mode() == "off":
+        return None
+    bind = session.get_bind()
+    key = database_key(bind)
+    with _registry_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = _create_index(key, sync_engine(bind))
+        if index.sync is None and not index.warmed:
+            index.warm(session)
+    return index
+
+
+def warm_correlation_index(engine: Engine) -> CorrelationIndex:
+    """Build and warm the index for ``engine`` ahead of the first ingest."""
+
+    key = database_key(engine)
+    with _registry_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = _create_index(key, engine)
+        if index.sync is None and not index.warmed:
+            with engine.connect() as connection:
+                index.warm(connection)
+    return index
+
+
+def _create_index(key: str, engine: Engine) -> CorrelationIndex:
+    index = CorrelationIndex()
+    if sync_mode() == "redis":
+        client = redis.Redis.from_url(get_redis_url(), decode_responses=True)
+        index.sync = IndexSync(index, engine, client, f"{SYNC_CHANNEL}:{key}")
+        index.sync.start()  # warms the index once subscribed
+    return index
+
+
+def stage_entries(session: Session, index: CorrelationIndex, entries: list[IndexEntry]) -> None:
+    """Add ``entries`` to the index (and publish them) once the session commits."""
+
+    def apply() -> None:
+        for entry in entries:
+            index.add(entry)
+
+    after_commit(session, apply)
+    sync = index.sync
+    if sync is not None and entries:
+        after_commit(session, lambda: sync.publish(entries), blocking=True)
+
+
+def stage_assignment(
+    session: Session, index: CorrelationIndex, event_id: UUID, incident_id: UUID
+) -> None:
+    """Record an incident assignment for an indexed event once the session commits."""
+
+    after_commit(session, lambda: index.assign(event_id, incident_id))
+    sync = index.sync
+    if sync is not None:
+        after_commit(session, lambda: sync.publish(assign={event_id: incident_id}), blocking=True)
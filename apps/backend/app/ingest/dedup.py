@@ -0,0 +1,190 @@
+"""Idempotent ingest keyed on the CES fingerprint.
+
+``events.fingerprint`` is unique, so a replayed event can never be stored twice. In front
+of that constraint sits a bounded LRU of recently committed fingerprints per database:
+a connector retry is usually answered with the stored event (one primary-key read) before
+scoring, correlation, or any candidate query runs. Fingerprints missing from the cache are
+looked up with one indexed query before the pipeline runs, so only new events are scored
+and correlated. On PostgreSQL the batch first takes a transaction-scoped advisory lock per
+fingerprint: a concurrent ingest of the same event waits for this one to commit and then
+finds the stored row. Elsewhere that race surfaces as an ``IntegrityError`` on commit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable, Mapping, Sequence
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.api.cache import invalidate_on_commit
+from app.api.live import publish_on_commit
+from app.api.schemas import EventCreate
+from app.archive.blobs import offload_payloads
+from app.db import Event
+from app.db.hooks import after_commit
+from app.db.session import database_key
+from app.ingest.digests import update_digests
+from app.ingest.pipeline import build_event_row, fingerprint_event, process_events
+from app.telemetry import stage
+
+DEFAULT_CACHE_SIZE = 100_000
+
+
+class FingerprintCache:
+    """Thread-safe LRU mapping recently committed fingerprints to event ids."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, UUID] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, fingerprint: str) -> UUID | None:
+        with self._lock:
+            event_id = self._entries.get(fingerprint)
+            if event_id is not None:
+                self._entries.move_to_end(fingerprint)
+            return event_id
+
+    def update(self, entries: Mapping[str, UUID]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            for fingerprint, event_id in entries.items():
+                self._entries[fingerprint] = event_id
+                self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, fingerprint: str) -> None:
+        with self._lock:
+            self._entries.pop(fingerprint, None)
+
+
+_caches: dict[str, FingerprintCache] = {}
+_registry_lock = threading.Lock()
+
+
+def get_fingerprint_cache(session: Session) -> FingerprintCache:
+    """Return the fingerprint cache for the session's database (``FINGERPRINT_CACHE_SIZE``)."""
+
+    key = database_key(session.get_bind())
+    with _registry_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            size = int(os.getenv("FINGERPRINT_CACHE_SIZE", DEFAULT_CACHE_SIZE))
+            cache = _caches[key] = FingerprintCache(size)
+    return cache
+
+
+def find_cached(session: Session, fingerprints: Iterable[str]) -> dict[str, Event]:
+    """Return the stored events for the ``fingerprints`` the cache knows about."""
+
+    cache = get_fingerprint_cache(session)
+    wanted = set(fingerprints)
+    found: dict[str, Event] = {}
+    for fingerprint in wanted:
+        event_id = cache.get(fingerprint)
+        if event_id is None:
+            continue
+        event = session.get(Event, event_id)
+        if event is not None and event.fingerprint == fingerprint:
+            found[fingerprint] = event
+        else:
+            cache.discard(fingerprint)
+    return found
+
+
+def find_existing(session: Session, fingerprints: Iterable[str]) -> dict[str, Event]:
+    """Return the stored events for any of ``fingerprints`` and refresh the cache."""
+
+    wanted = set(fingerprints)
+    if not wanted:
+        return {}
+    stmt = select(Event).where(Event.fingerprint.in_(wanted))
+    found = {
+        event.fingerprint: event
+        for event in session.execute(stmt).scalars()
+        if event.fingerprint is not None
+    }
+    get_fingerprint_cache(session).update({key: event.id for key, event in found.items()})
+    return found
+
+
+def remember(session: Session, entries: Mapping[str, UUID]) -> None:
+    """Add newly inserted fingerprints to the cache once the session commits."""
+
+    cache = get_fingerprint_cache(session)
+    after_commit(session, lambda: cache.update(entries))
+
+
+def claim_fingerprints(session: Session, fingerprints: Iterable[str]) -> None:
+    """Lock ``fingerprints`` until the session's transaction ends (PostgreSQL only).
+
+    Locks are taken in a fixed order, so batches that share fingerprints cannot deadlock.
+    """
+
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    keys = sorted({_lock_key(fingerprint) for fingerprint in fingerprints})
+    if keys:
+        session.execute(
+            text("SELECT pg_advisory_xact_lock(key) FROM unnest(CAST(:keys AS bigint[])) AS key"),
+            {"keys": keys},
+        )
+
+
+def _lock_key(fingerprint: str) -> int:
+    digest = hashlib.blake2b(fingerprint.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def insert_events(session: Session, events: Sequence[EventCreate]) -> list[tuple[Event, bool]]:
+    """Ingest ``events`` in one transaction, skipping any whose fingerprint is stored.
+
+    Returns ``(row, created)`` per input, in order; duplicates (including repeats within
+    ``events``) map to the stored row with ``created=False``. Duplicates are resolved
+    before the pipeline runs, so it never scores or correlates an event twice.
+    """
+
+    fingerprints = [fingerprint_event(event) for event in events]
+    existing = find_cached(session, fingerprints)
+    missing = set(fingerprints) - existing.keys()
+    claim_fingerprints(session, missing)
+    existing.update(find_existing(session, missing))
+    fresh: dict[str, EventCreate] = {}
+    for fingerprint, event in zip(fingerprints, events):
+        if fingerprint not in existing:
+            fresh.setdefault(fingerprint, event)
+    results = process_events(list(fresh.values()), session)
+    created = {
+        fingerprint: build_event_row(event, result)
+        for (fingerprint, event), result in zip(fresh.items(), results)
+    }
+    offload_payloads(session, created.values())
+    session.add_all(created.values())
+    remember(session, {fingerprint: row.id for fingerprint, row in created.items()})
+    invalidate_on_commit(session)
+    publish_on_commit(session)
+    update_digests(session, list(created.values()), results)
+    with stage("flush"):
+        session.flush()
+    with stage("commit"):
+        session.commit()
+
+    outcomes: list[tuple[Event, bool]] = []
+    for fingerprint in fingerprints:
+        if fingerprint in created:
+            existing[fingerprint] = row = created.pop(fingerprint)
+            outcomes.append((row, True))
+        else:
+            outcomes.append((existing[fingerprint], False))
+    return outcomes
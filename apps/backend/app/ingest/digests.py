@@ -0,0 +1,297 @@
+"""Digests materialized from the events routed below the push threshold.
+
+Each event the pipeline routes to ``digest`` (see ``app.ingest.storm``) is folded into
+one row per period (``day`` and ``week``, UTC) for its user, the owner of the event's
+incident or ``NO_USER``. A row keeps the event count, the top ``DIGEST_TOP_K`` events
+by score and a rollup per incident, so ``GET /digests/{period}`` reads one row instead
+of aggregating events.
+
+Folding is kept out of the ingest transaction: most events share the ``NO_USER``
+buckets, and locking those rows there would serialize all ingest. Once an ingest
+commits, its events are queued in memory per process and database, and a flush folds
+everything queued for a bucket in one short transaction of its own, every
+``DIGEST_FLUSH_SECONDS`` (default 1) or 1000 queued events, and at shutdown. A crash
+loses at most the unflushed events.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db import Digest, Event, Incident
+from app.db.hooks import after_commit
+from app.db.session import database_key, sync_engine
+from app.ingest.pipeline import PipelineResult
+from app.timeutil import utc
+
+PERIODS = ("day", "week")
+NO_USER = UUID(int=(1 << 128) - 1)  # the max UUID; the nil UUID would read back as 0 on SQLite
+DEFAULT_TOP_K = 20
+DEFAULT_FLUSH_SECONDS = 1.0
+FLUSH_BATCH = 1000
+
+logger = logging.getLogger(__name__)
+
+BucketKey = tuple[UUID, str, datetime]
+Entry = dict[str, Any]  # one event as kept in ``top_events``
+
+
+def top_k() -> int:
+    return int(os.getenv("DIGEST_TOP_K", DEFAULT_TOP_K))
+
+
+def bucket_start(period: str, at: datetime) -> datetime:
+    """Start of the UTC ``day`` or ISO ``week`` (Monday) containing ``at``."""
+
+    day = datetime.combine(utc(at).date(), datetime.min.time(), tzinfo=timezone.utc)
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+class DigestQueue:
+    """Committed digest events of one database, waiting to be folded into their rows."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.engine = engine
+        self.flush_seconds = flush_seconds
+        self._clock = clock
+        self._pending: dict[BucketKey, list[Entry]] = defaultdict(list)
+        self._size = 0
+        self._last_flush = clock()
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, buckets: dict[BucketKey, list[Entry]]) -> None:
+        """Queue committed entries; flush when enough is pending, else arm the timer."""
+
+        with self._lock:
+            for key, entries in buckets.items():
+                self._pending[key].extend(entries)
+                self._size += len(entries)
+            due = (
+                self._size >= FLUSH_BATCH or self._clock() - self._last_flush >= self.flush_seconds
+            )
+            if not due and self._timer is None:
+                # A quiet period must not leave events unflushed until the next ingest.
+                self._timer = threading.Timer(self.flush_seconds, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Fold the queued entries into their digest rows; return how many were folded."""
+
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._last_flush = self._clock()
+                pending, self._pending = self._pending, defaultdict(list)
+                size, self._size = self._size, 0
+            if not pending:
+                return 0
+            try:
+                with Session(self.engine) as session, session.begin():
+                    write_digests(session, pending)
+            except SQLAlchemyError:
+                logger.warning("digest flush failed; will retry", exc_info=True)
+                with self._lock:
+                    for key, entries in pending.items():
+                        self._pending[key][:0] = entries
+                    self._size += size
+                return 0
+            return size
+
+
+def write_digests(session: Session, buckets: dict[BucketKey, list[Entry]]) -> None:
+    """Fold ``buckets`` into their rows in the session's transaction.
+
+    Bucket rows are created if missing and locked in a fixed order, so concurrent flushes
+    serialize per bucket instead of deadlocking; the locks last only for this flush.
+    """
+
+    now = datetime.now(timezone.utc)
+    digests = _lock_buckets(session, sorted(buckets))
+    for key, entries in buckets.items():
+        _fold(digests[key], entries, now)
+
+
+_queues: dict[str, DigestQueue] = {}
+_registry_lock = threading.Lock()
+
+
+def get_digest_queue(session: Session) -> DigestQueue:
+    """Return the queue for the session's database."""
+
+    bind = session.get_bind()
+    key = database_key(bind)
+    with _registry_lock:
+        queue = _queues.get(key)
+        if queue is None:
+            queue = _queues[key] = DigestQueue(
+                sync_engine(bind),
+                flush_seconds=float(os.getenv("DIGEST_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)),
+            )
+    return queue
+
+
+def flush_digests() -> int:
+    """Fold every queue's pending entries; call at shutdown."""
+
+    with _registry_lock:
+        queues = list(_queues.values())
+    return sum(queue.flush() for queue in queues)
+
+
+def update_digests(
+    session: Session, rows: Sequence[Event], results: Sequence[PipelineResult]
+) -> None:
+    """Queue the rows routed to the digest for folding once ``session`` commits.
+
+    Call before the rows are flushed. Only the bucket of each row is resolved here; no
+    digest row is read or locked in the ingest transaction.
+    """
+
+    routed = [row for row, result in zip(rows, results) if result.delivery == "digest"]
+    if not routed:
+        return
+    with session.no_autoflush:
+        owners = _owners(session, {row.incident_id for row in routed if row.incident_id})
+    buckets: dict[BucketKey, list[Entry]] = defaultdict(list)
+    for row in routed:
+        user_id = owners.get(row.incident_id) if row.incident_id else None
+        entry = _entry(row)
+        for period in PERIODS:
+            buckets[(user_id or NO_USER, period, bucket_start(period, row.occurred_at))].append(
+                entry
+            )
+    queue = get_digest_queue(session)
+    # Blocking: adding may flush to the database.
+    after_commit(session, lambda: queue.add(buckets), blocking=True)
+
+
+def _owners(session: Session, incident_ids: set[UUID]) -> dict[UUID, UUID | None]:
+    """``user_id`` per incident, read from the session before querying the rest."""
+
+    owners = {
+        row.id: row.user_id
+        for row in (*session.new, *session.identity_map.values())
+        if isinstance(row, Incident) and row.id in incident_ids
+    }
+    missing = incident_ids - owners.keys()
+    if missing:
+        stmt = select(Incident.id, Incident.user_id).where(Incident.id.in_(missing))
+        owners.update(session.execute(stmt).tuples())
+    return owners
+
+
+def _lock_buckets(session: Session, keys: list[BucketKey]) -> dict[BucketKey, Digest]:
+    dialect = session.get_bind().dialect.name
+    rows = [
+        {
+            "id": uuid4(),
+            "user_id": user_id,
+            "period": period,
+            "bucket_start": start,
+            "event_count": 0,
+            "top_events": [],
+            "incidents": {},
+        }
+        for user_id, period, start in keys
+    ]
+    conflict = ["user_id", "period", "bucket_start"]
+    if dialect == "postgresql":
+        session.execute(
+            postgresql.insert(Digest).values(rows).on_conflict_do_nothing(index_elements=conflict)
+        )
+    elif dialect == "sqlite":
+        session.execute(
+            sqlite.insert(Digest).values(rows).on_conflict_do_nothing(index_elements=conflict)
+        )
+    stmt = (
+        select(Digest)
+        .where(tuple_(Digest.user_id, Digest.period, Digest.bucket_start).in_(keys))
+        .order_by(Digest.user_id, Digest.period, Digest.bucket_start)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    digests = {
+        (digest.user_id, digest.period, utc(digest.bucket_start)): digest
+        for digest in session.execute(stmt).scalars()
+    }
+    for key in keys:
+        if key not in digests:  # other dialects: no upsert, rely on the unique constraint
+            user_id, period, start = key
+            digests[key] = Digest(
+                user_id=user_id, period=period, bucket_start=start, top_events=[], incidents={}
+            )
+            session.add(digests[key])
+    return digests
+
+
+def _fold(digest: Digest, new_entries: Iterable[Entry], now: datetime) -> None:
+    entries = list(digest.top_events or [])
+    incidents = {key: dict(value) for key, value in (digest.incidents or {}).items()}
+    count = digest.event_count or 0
+    max_score = digest.max_score
+    for entry in new_entries:
+        count += 1
+        score_value = entry.get("score")
+        if score_value is not None and (max_score is None or score_value > max_score):
+            max_score = score_value
+        entries.append(entry)
+        if "incident_id" in entry:
+            rollup = incidents.setdefault(entry["incident_id"], {"events": 0})
+            rollup["events"] += 1
+            if score_value is not None and score_value > rollup.get("max_score", -1.0):
+                rollup["max_score"] = score_value
+            if entry["occurred_at"] > rollup.get("last_event_at", ""):
+                rollup["last_event_at"] = entry["occurred_at"]
+    digest.top_events = heapq.nlargest(
+        top_k(), entries, key=lambda entry: (entry.get("score") or 0.0, entry["id"])
+    )
+    digest.incidents = incidents
+    digest.event_count = count
+    digest.max_score = max_score
+    digest.updated_at = now
+
+
+def _entry(row: Event) -> Entry:
+    entry = {
+        "id": str(row.id),
+        "score": row.score,
+        "source": row.source,
+        "title": row.title,
+        "occurred_at": utc(row.occurred_at).isoformat(),
+        "incident_id": str(row.incident_id) if row.incident_id else None,
+    }
+    if "storm" in (row.explain or {}).get("delivery", {}):
+        entry["storm"] = True
+    return {key: value for key, value in entry.items() if value is not None}
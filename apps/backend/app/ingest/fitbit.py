@@ -0,0 +1,182 @@
+"""Fitbit export archives: stream resting heart rate and sleep CSVs out of the zip as CES.
+
+Members are read straight from the archive and parsed row by row, so memory does not
+grow with the size of the export. A member is recognised by its file name (see
+``SPECS``); other members are ignored. Each row becomes one event for the user named at
+import, with the row's time as ``occurred_at`` (timestamps without an offset are read
+as UTC) and its non-empty columns as metrics. Rows without a parseable time or any metric
+are skipped.
+
+``fitbit_csv`` runs an archive through the connector runtime, which suits small uploads;
+``python -m app.jobs.import_fitbit`` bulk-loads a full export.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import math
+import posixpath
+import zipfile
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from fnmatch import fnmatch
+from itertools import islice
+
+from app.ingest.ces import Event as CESEvent
+from app.ingest.correlation_index import to_epoch_ms
+from app.ingest.registry import Connector, Emit, register
+
+SOURCE = "fitbit"
+TIME_FORMATS = ("%m/%d/%y %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%m/%d/%Y", "%m/%d/%y")
+
+
+@dataclass(frozen=True)
+class CsvSpec:
+    """How the rows of one kind of export CSV map to events."""
+
+    patterns: tuple[str, ...]  # matched against the lower-cased file name
+    type: str
+    title: str
+    time_columns: tuple[str, ...]
+    # metric name -> the columns that may hold it, in order of preference
+    metrics: dict[str, tuple[str, ...]] = field(default_factory=dict)
+
+    def matches(self, name: str) -> bool:
+        base = posixpath.basename(name).lower()
+        return any(fnmatch(base, pattern) for pattern in self.patterns)
+
+
+SPECS = (
+    CsvSpec(
+        patterns=("sleep_score*.csv",),
+        type="sleep",
+        title="Sleep",
+        time_columns=("timestamp", "date"),
+        metrics={
+            "sleep_score": ("overall_score",),
+            "deep_sleep_minutes": ("deep_sleep_in_minutes",),
+            "restlessness": ("restlessness",),
+            "resting_hr": ("resting_heart_rate",),
+        },
+    ),
+    CsvSpec(
+        patterns=("*resting_heart_rate*.csv", "*resting heart rate*.csv"),
+        type="resting_hr",
+        title="Resting HR",
+        time_columns=("timestamp", "date", "datetime"),
+        metrics={"resting_hr": ("resting_heart_rate", "value", "beats per minute")},
+    ),
+)
+
+
+def member_spec(name: str) -> CsvSpec | None:
+    return next((spec for spec in SPECS if spec.matches(name)), None)
+
+
+def export_members(archive: zipfile.ZipFile) -> list[tuple[zipfile.ZipInfo, CsvSpec]]:
+    """The members of ``archive`` that hold importable rows, in archive order."""
+
+    found = []
+    for info in archive.infolist():
+        spec = None if info.is_dir() else member_spec(info.filename)
+        if spec is not None:
+            found.append((info, spec))
+    return found
+
+
+def member_key(info: zipfile.ZipInfo, user: str) -> str:
+    """Identifies a member's import for ``user`` across runs: user, name, CRC and size."""
+
+    return f"{user}:{info.filename}:{info.CRC:08x}:{info.file_size}"
+
+
+def read_member(
+    archive: zipfile.ZipFile,
+    info: zipfile.ZipInfo,
+    spec: CsvSpec,
+    user: str,
+    skip: int = 0,
+) -> Iterator[CESEvent | None]:
+    """One item per data row after the first ``skip``: its event, or ``None`` if skipped."""
+
+    with archive.open(info) as raw:
+        reader = csv.reader(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+        header = [column.strip().lower() for column in next(reader, [])]
+        time_index = _find(header, spec.time_columns)
+        metric_indexes = {
+            name: index
+            for name, columns in spec.metrics.items()
+            if (index := _find(header, columns)) is not None
+        }
+        if time_index is None or not metric_indexes:
+            return
+        for row in islice(reader, skip, None):
+            yield _event(spec, user, row, time_index, metric_indexes)
+
+
+def _find(header: list[str], columns: tuple[str, ...]) -> int | None:
+    return next((header.index(column) for column in columns if column in header), None)
+
+
+def _event(
+    spec: CsvSpec, user: str, row: list[str], time_index: int, metric_indexes: dict[str, int]
+) -> CESEvent | None:
+    occurred_at = parse_time(row[time_index]) if time_index < len(row) else None
+    if occurred_at is None:
+        return None
+    metrics = {}
+    for name, index in metric_indexes.items():
+        try:
+            value = float(row[index])
+        except (IndexError, ValueError):
+            continue
+        if math.isfinite(value):
+            metrics[name] = value
+    if not metrics:
+        return None
+    return CESEvent(
+        source=SOURCE,
+        occurred_at=to_epoch_ms(occurred_at),
+        entity_type="user",
+        entity_id=user,
+        type=spec.type,
+        title=f"{spec.title} {occurred_at:%Y-%m-%d %H:%M}",
+        tags=["health", SOURCE, spec.type],
+        metrics=metrics,
+    )
+
+
+def parse_time(value: str) -> datetime | None:
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        for fmt in TIME_FORMATS:
+            try:
+                parsed = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@register("fitbit_csv")
+class FitbitCsvConnector(Connector):
+    """Emit the importable rows of one export archive, then finish."""
+
+    def __init__(self, path: str, user: str) -> None:
+        self.path = path
+        self.user = user
+
+    async def run(self, emit: Emit) -> None:
+        with zipfile.ZipFile(self.path) as archive:
+            for info, spec in export_members(archive):
+                for event in read_member(archive, info, spec, self.user):
+                    if event is not None:
+                        await emit(event)
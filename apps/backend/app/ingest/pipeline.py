@@ -1,18 +1,50 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from time import perf_counter
 from typing import Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.orm import Session, load_only, selectinload
 
 from app.api.schemas import EventCreate
-from app.db import Event as EventModel, Incident
+from app.db import Event as EventModel, EventMetric, EventTag, Incident
+from app.ingest.baselines import Z_SUFFIX, Deviation, observe_metrics
+from app.ingest.calibration import CalibrationTable, current_calibration
+from app.ingest.ces import Event as CESEvent
+from app.ingest.correlation_index import (
+    CorrelationIndex,
+    IndexEntry,
+    get_correlation_index,
+    stage_assignment,
+    stage_entries,
+    to_epoch_ms,
+)
+from app.ingest.scoring_models import current_models
+from app.ingest.storm import StormTracker, get_storm_tracker, route
 from app.services.correlate import should_merge
 from app.services.features import feature_vector
-from app.services.scoring import score
+from app.services.scoring import DEFAULT_MODEL, ScoringModel
+from app.services.vectorized import ScoreBatch, apply_model, round6, score_batch
+from app.telemetry import observe_stage, record_candidates, record_decision
+
+CORRELATION_WINDOW = timedelta(minutes=15)
+MAX_CANDIDATES = 50
+VECTORIZE_MIN_BATCH = 64  # below this the per-event loop is faster than building arrays
+# Correlation never reads payloads (body, links, extras, features, explain); leave them unloaded.
+_CANDIDATE_COLUMNS = (
+    EventModel.id,
+    EventModel.source,
+    EventModel.occurred_at,
+    EventModel.entity_type,
+    EventModel.entity_id,
+    EventModel.score,
+    EventModel.incident_id,
+)
 
 
 @dataclass
@@ -23,27 +55,228 @@ class PipelineResult:
     score: float
     explain: dict[str, Any]
     incident_id: UUID | None
+    event_id: UUID = field(default_factory=uuid4)
+    delivery: str = "push"  # or "digest"; see app.ingest.storm
+    suppressed: bool = False  # held back from push by storm control
 
 
 def process_event(event: EventCreate, session: Session) -> PipelineResult:
     """Run feature extraction, scoring, and correlation for an incoming event."""
 
-    metrics = _metrics_dict(event)
+    correlator = _Correlator(session)
+    live, shadow = current_models(session)
+    result = _enrich(event, observe_metrics(session, [event])[0], live, shadow)
+    _calibrate(current_calibration(session), [event], [result])
+    if _assess(get_storm_tracker(session), event, result):
+        # Held back, but still a candidate for later events, as in the SQL candidate query.
+        correlator.stage([(event, result)])
+        return result
+    start = perf_counter()
+    if event.incident_id is not None:
+        correlator.attach(event, result)
+    else:
+        result.incident_id = correlator.merge(event, result.score, correlator.candidates(event))
+    correlator.stage([(event, result)])
+    observe_stage("correlate", perf_counter() - start)
+    return result
+
+
+def process_events(events: Sequence[EventCreate], session: Session) -> list[PipelineResult]:
+    """Run the pipeline for a batch of events using a single candidate query.
+
+    Events are correlated in order, so later items can merge with earlier items of the
+    same batch exactly as if they had been ingested one at a time.
+    """
+
+    correlator = _Correlator(session)
+    live, shadow = current_models(session)
+    results = _enrich_many(events, observe_metrics(session, events), live, shadow)
+    _calibrate(current_calibration(session), events, results)
+    tracker = get_storm_tracker(session)
+    # Events that storm control holds back are not correlated themselves, but stay
+    # candidates for the events after them.
+    held_back = [_assess(tracker, event, result) for event, result in zip(events, results)]
+    kept = [event for event, skip in zip(events, held_back) if not skip]
+    start = perf_counter()
+    pool = correlator.batch_pool([event for event in kept if event.incident_id is None])
+    correlator.preload(
+        {event.incident_id for event in kept if event.incident_id is not None}
+        | {candidate.incident_id for candidate in pool if candidate.incident_id is not None}
+    )
+    for event, result, skip in zip(events, results, held_back):
+        if not skip and event.incident_id is not None:
+            correlator.attach(event, result)
+        elif not skip:
+            result.incident_id = correlator.merge(
+                event, result.score, pool.window(event.occurred_at)
+            )
+        pool.add(_Candidate.from_result(event, result))
+    correlator.stage(list(zip(events, results)))
+    observe_stage("correlate", perf_counter() - start)
+    return results
+
+
+def _calibrate(
+    table: CalibrationTable, events: Sequence[EventCreate], results: Sequence[PipelineResult]
+) -> None:
+    """Replace raw scores with calibrated ones where the event's source has a calibrator."""
+
+    if not table.params:
+        return
+    for event, result in zip(events, results):
+        calibrated = table.calibrate(event.source, result.score)
+        if calibrated is not None:
+            raw_score = round(result.score, 6)
+            result.explain["calibration"] = {"version": table.version, "raw_score": raw_score}
+            result.score = calibrated
+
+
+def _assess(tracker: StormTracker | None, event: EventCreate, result: PipelineResult) -> bool:
+    """Route ``result`` for delivery; return whether correlation should be skipped."""
+
+    assessment = route(result.score) if tracker is None else tracker.assess(event, result.score)
+    result.delivery = assessment.route
+    result.suppressed = assessment.suppressed
+    result.explain["delivery"] = assessment.explain()
+    return assessment.skip_correlation
+
+
+def build_event_row(event: EventCreate, result: PipelineResult) -> EventModel:
+    """Build the ORM row (with tags and metrics) for an enriched event."""
+
+    row = EventModel(
+        id=result.event_id,
+        source=event.source,
+        occurred_at=event.occurred_at,
+        received_at=event.received_at,
+        entity_type=event.entity.type,
+        entity_id=event.entity.id,
+        type=event.type,
+        title=event.title,
+        body=event.body,
+        severity_raw=event.severity_raw,
+        links=[link.model_dump(mode="json", exclude_none=True) for link in event.links],
+        extras=event.extras,
+        features=result.features,
+        score=result.score,
+        explain=result.explain,
+        incident_id=result.incident_id,
+        fingerprint=fingerprint_event(event),
+    )
+    row.tag_rows = [EventTag(value=value) for value in dict.fromkeys(event.tags)]
+    row.metrics = [
+        EventMetric(name=metric.name, value=metric.value, unit=metric.unit)
+        for metric in event.metrics
+    ]
+    return row
+
+
+def fingerprint_event(event: EventCreate) -> str:
+    """Return the CES fingerprint that identifies ``event`` across connector retries."""
+
+    return CESEvent(
+        source=event.source,
+        occurred_at=to_epoch_ms(event.occurred_at),
+        entity_type=event.entity.type,
+        entity_id=event.entity.id,
+        type=event.type,
+        title=event.title,
+    ).fingerprint()
+
+
+def _enrich(
+    event: EventCreate,
+    deviations: dict[str, Deviation] | None = None,
+    live: ScoringModel = DEFAULT_MODEL,
+    shadow: ScoringModel | None = None,
+) -> PipelineResult:
+    started = perf_counter()
+    metrics = _metrics_dict(event, deviations)
     context = _build_context(event)
     feature_values = feature_vector({"type": event.type, "metrics": metrics}, context)
-    score_value = score(feature_values)
-    explanation = _explain_score(feature_values, score_value)
-    incident_id = event.incident_id or _correlate(event, score_value, session)
+    featured = perf_counter()
+    score_value = live.score(feature_values)
+    scored = perf_counter()
+    explain = live.explain(feature_values, score_value)
+    explain["model"] = live.version
+    _explain_baselines(explain, deviations)
+    explained = perf_counter()
+    if shadow is not None:
+        shadow_score = round(shadow.score(feature_values), 6)
+        explain["shadow"] = {"model": shadow.version, "score": shadow_score}
+        observe_stage("shadow", perf_counter() - explained)
+    observe_stage("features", featured - started)
+    observe_stage("score", scored - featured)
+    observe_stage("explain", explained - scored)
     return PipelineResult(
         features=feature_values,
         score=score_value,
-        explain=explanation,
-        incident_id=incident_id,
+        explain=explain,
+        incident_id=event.incident_id,
+    )
+
+
+def score_events(
+    events: Sequence[EventCreate],
+    deviations: Sequence[dict[str, Deviation]] | None = None,
+    model: ScoringModel = DEFAULT_MODEL,
+) -> ScoreBatch:
+    """Columnar features, scores and explain contributions for ``events``."""
+
+    per_event = deviations if deviations is not None else [{}] * len(events)
+    return score_batch(
+        [event.type for event in events],
+        [_metrics_dict(event, found) for event, found in zip(events, per_event)],
+        [_build_context(event) for event in events],
+        model,
     )
 
 
-def _metrics_dict(event: EventCreate) -> dict[str, float]:
+def _enrich_many(
+    events: Sequence[EventCreate],
+    deviations: Sequence[dict[str, Deviation]] | None = None,
+    live: ScoringModel = DEFAULT_MODEL,
+    shadow: ScoringModel | None = None,
+) -> list[PipelineResult]:
+    deviations = deviations if deviations is not None else [{} for _ in events]
+    if len(events) < VECTORIZE_MIN_BATCH:
+        return [
+            _enrich(event, found, live, shadow) for event, found in zip(events, deviations)
+        ]
+    start = perf_counter()
+    batch = score_events(events, deviations, live)
+    results = [
+        PipelineResult(
+            features=features,
+            score=score_value,
+            explain=explain,
+            incident_id=event.incident_id,
+        )
+        for event, features, score_value, explain in zip(
+            events, batch.feature_dicts(), batch.scores.tolist(), batch.explains()
+        )
+    ]
+    for result, found in zip(results, deviations):
+        result.explain["model"] = live.version
+        _explain_baselines(result.explain, found)
+    observe_stage("score_batch", perf_counter() - start)
+    if shadow is not None:
+        start = perf_counter()
+        _, shadow_scores = apply_model(shadow, batch.features)
+        for result, shadow_score in zip(results, round6(shadow_scores).tolist()):
+            result.explain["shadow"] = {"model": shadow.version, "score": shadow_score}
+        observe_stage("shadow", perf_counter() - start)
+    return results
+
+
+def _metrics_dict(
+    event: EventCreate, deviations: dict[str, Deviation] | None = None
+) -> dict[str, float]:
+    """Event metrics plus ``<name>_z`` from the baselines, unless the event sends it."""
+
     metrics: dict[str, float] = {}
+    for name, deviation in (deviations or {}).items():
+        metrics[name + Z_SUFFIX] = deviation.z
     for metric in event.metrics:
         try:
             metrics[metric.name] = float(metric.value)
@@ -83,79 +316,260 @@ def _as_bool(value: Any, default: bool) -> bool:
     return default
 
 
-def _explain_score(features: dict[str, float], score_value: float) -> dict[str, Any]:
-    impact = max(
-        features.get("impact_finance", 0.0),
-        features.get("impact_health", 0.0),
-        features.get("impact_news", 0.0),
-    )
-    factors = {
-        "impact": impact,
-        "actionability": features.get("actionability", 0.5),
-        "urgency": features.get("urgency", 0.2),
-        "personal_relevance": features.get("personal_relevance", 0.5),
-    }
-    weights = {
-        "impact": 0.4,
-        "actionability": 0.25,
-        "urgency": 0.2,
-        "personal_relevance": 0.15,
-    }
-    contributions = {name: round(value * weights[name], 6) for name, value in factors.items()}
-    top_factor = max(contributions.items(), key=lambda item: item[1])[0] if contributions else None
-    return {
-        "contributions": contributions,
-        "top_factor": top_factor,
-        "score": round(score_value, 6),
-    }
+def _explain_baselines(explain: dict[str, Any], deviations: dict[str, Deviation] | None) -> None:
+    if deviations:
+        explain["baselines"] = {name: found.explain() for name, found in deviations.items()}
 
 
-def _correlate(event: EventCreate, score_value: float, session: Session) -> UUID | None:
-    lookback_start = event.occurred_at - timedelta(minutes=15)
-    lookahead_end = event.occurred_at + timedelta(minutes=15)
-    new_view = _event_view(event)
-    stmt = (
-        select(EventModel)
-        .options(selectinload(EventModel.tag_rows))
-        .where(EventModel.occurred_at >= lookback_start)
-        .where(EventModel.occurred_at <= lookahead_end)
-        .order_by(EventModel.occurred_at.desc())
-        .limit(50)
-    )
-    candidates = session.execute(stmt).unique().scalars().all()
-    for candidate in candidates:
-        candidate_view = _event_view(candidate)
-        if should_merge(candidate_view, new_view):
+class _Correlator:
+    """Correlation state for one pipeline run: candidate source, incidents, index staging."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.index: CorrelationIndex | None = get_correlation_index(session)
+        self.incidents: dict[UUID, Incident] = {}
+
+    def candidates(self, event: EventCreate) -> list[_Candidate]:
+        occurred_ms = to_epoch_ms(event.occurred_at)
+        if self.index is not None and self.index.covers(occurred_ms):
+            entries = self.index.candidates(
+                (event.entity.type, event.entity.id), event.tags, occurred_ms
+            )
+            record_candidates("index", len(entries))
+            return [_Candidate.from_entry(entry) for entry in entries]
+        rows = self._query([event], limit=MAX_CANDIDATES)
+        record_candidates("sql", len(rows))
+        return [_Candidate.from_row(row) for row in rows]
+
+    def batch_pool(self, events: Sequence[EventCreate]) -> _CandidatePool:
+        if not events:
+            return _CandidatePool([])
+        if self.index is not None and all(
+            self.index.covers(to_epoch_ms(event.occurred_at)) for event in events
+        ):
+            entries: dict[UUID, IndexEntry] = {}
+            for event in events:
+                for entry in self.index.candidates(
+                    (event.entity.type, event.entity.id), event.tags, to_epoch_ms(event.occurred_at)
+                ):
+                    entries[entry.event_id] = entry
+            record_candidates("batch", len(entries))
+            return _CandidatePool(_Candidate.from_entry(entry) for entry in entries.values())
+        rows = self._query(events)
+        record_candidates("batch", len(rows))
+        return _CandidatePool(_Candidate.from_row(row) for row in rows)
+
+    def _query(self, events: Sequence[EventCreate], limit: int | None = None) -> list[EventModel]:
+        """Select stored events that ``should_merge`` with any of ``events``.
+
+        Matches on the same entity (served by ``ix_events_entity_window``) or a shared tag
+        within the window, and drops events attached to incidents that are no longer open.
+        """
+
+        entities = {(event.entity.type, event.entity.id) for event in events}
+        tags = {tag for event in events for tag in event.tags}
+        since = min(e.occurred_at for e in events) - CORRELATION_WINDOW
+        until = max(e.occurred_at for e in events) + CORRELATION_WINDOW
+        matches = [tuple_(EventModel.entity_type, EventModel.entity_id).in_(entities)]
+        if tags:
+            # The window on the tag rows' own occurred_at lets Postgres prune their partitions.
+            tagged = select(EventTag.event_id).where(
+                EventTag.value.in_(tags), EventTag.occurred_at.between(since, until)
+            )
+            matches.append(EventModel.id.in_(tagged))
+        stmt = (
+            select(EventModel, Incident)
+            .outerjoin(Incident, Incident.id == EventModel.incident_id)
+            .options(load_only(*_CANDIDATE_COLUMNS), selectinload(EventModel.tag_rows))
+            .where(EventModel.occurred_at >= since)
+            .where(EventModel.occurred_at <= until)
+            .where(or_(*matches))
+            .where(or_(EventModel.incident_id.is_(None), Incident.status == "open"))
+            .order_by(EventModel.occurred_at.desc())
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        rows = []
+        for row, incident in self.session.execute(stmt).unique():
+            if incident is not None:
+                self.incidents.setdefault(incident.id, incident)
+            rows.append(row)
+        return rows
+
+    def preload(self, ids: set[UUID]) -> None:
+        missing = ids - self.incidents.keys()
+        if missing:
+            stmt = select(Incident).where(Incident.id.in_(missing))
+            for incident in self.session.execute(stmt).scalars():
+                self.incidents[incident.id] = incident
+
+    def incident(self, incident_id: UUID) -> Incident | None:
+        if incident_id not in self.incidents:
+            incident = self.session.get(Incident, incident_id)
+            if incident is None:
+                return None
+            self.incidents[incident_id] = incident
+        return self.incidents[incident_id]
+
+    def attach(self, event: EventCreate, result: PipelineResult) -> None:
+        incident = self.incident(event.incident_id) if event.incident_id is not None else None
+        if incident is not None:
+            _update_incident(incident, result.score, event.occurred_at, event.source, event.tags)
+        record_decision("attached")
+
+    def merge(
+        self, event: EventCreate, score_value: float, candidates: Iterable[_Candidate]
+    ) -> UUID | None:
+        new_view = _event_view(event)
+        for candidate in candidates:
+            if not should_merge(candidate.view, new_view):
+                continue
             if candidate.incident_id is not None:
-                incident = session.get(Incident, candidate.incident_id)
+                incident = self.incident(candidate.incident_id)
                 if incident is None or incident.status != "open":
                     continue
-                _update_incident(incident, score_value, event.occurred_at)
+                _update_incident(incident, score_value, event.occurred_at, event.source, event.tags)
+                record_decision("merged")
                 return incident.id
-            incident = Incident(status="open")
-            session.add(incident)
-            session.flush()
-            candidate.incident_id = incident.id
-            _update_incident(incident, candidate.score, candidate.occurred_at)
-            _update_incident(incident, score_value, event.occurred_at)
+            incident = Incident(id=uuid4(), status="open")
+            self.session.add(incident)
+            self.incidents[incident.id] = incident
+            self._assign(candidate, incident.id)
+            _update_incident(
+                incident, candidate.score, candidate.occurred_at, candidate.source, candidate.tags
+            )
+            _update_incident(incident, score_value, event.occurred_at, event.source, event.tags)
+            record_decision("new_incident")
             return incident.id
-    return None
+        record_decision("no_match")
+        return None
+
+    def stage(self, items: list[tuple[EventCreate, PipelineResult]]) -> None:
+        if self.index is None:
+            return
+        entries = [
+            IndexEntry(
+                event_id=result.event_id,
+                source=event.source,
+                entity_type=event.entity.type,
+                entity_id=event.entity.id,
+                occurred_ms=to_epoch_ms(event.occurred_at),
+                tags=tuple(dict.fromkeys(event.tags)),
+                score=result.score,
+                incident_id=result.incident_id,
+            )
+            for event, result in items
+        ]
+        stage_entries(self.session, self.index, entries)
+
+    def _assign(self, candidate: _Candidate, incident_id: UUID) -> None:
+        candidate.incident_id = incident_id
+        if candidate.result is not None:
+            candidate.result.incident_id = incident_id
+            return
+        row = candidate.row or self.session.get(
+            EventModel, candidate.event_id, options=[load_only(*_CANDIDATE_COLUMNS)]
+        )
+        if row is not None:
+            row.incident_id = incident_id
+        if self.index is not None:
+            stage_assignment(self.session, self.index, candidate.event_id, incident_id)
+
+
+@dataclass
+class _Candidate:
+    """A stored event, an indexed event, or an earlier event of the same batch."""
+
+    event_id: UUID
+    occurred_at: datetime
+    view: dict[str, Any]
+    score: float | None
+    incident_id: UUID | None
+    source: str
+    tags: Sequence[str]
+    row: EventModel | None = None
+    result: PipelineResult | None = None
+
+    @classmethod
+    def from_row(cls, row: EventModel) -> _Candidate:
+        view = _event_view(row)
+        return cls(
+            row.id, _to_utc(row.occurred_at), view, row.score, row.incident_id, row.source,
+            view["tags"], row=row,
+        )
+
+    @classmethod
+    def from_entry(cls, entry: IndexEntry) -> _Candidate:
+        view = {
+            "entity_type": entry.entity_type,
+            "entity_id": entry.entity_id,
+            "occurred_at": entry.occurred_ms,
+            "tags": entry.tags,
+        }
+        occurred_at = datetime.fromtimestamp(entry.occurred_ms / 1000, tz=timezone.utc)
+        return cls(
+            entry.event_id, occurred_at, view, entry.score, entry.incident_id, entry.source,
+            entry.tags,
+        )
+
+    @classmethod
+    def from_result(cls, event: EventCreate, result: PipelineResult) -> _Candidate:
+        return cls(
+            result.event_id, _to_utc(event.occurred_at), _event_view(event), result.score,
+            result.incident_id, event.source, event.tags, result=result,
+        )
+
+
+class _CandidatePool:
+    """Candidates kept sorted by time so each event's window is a bisect away."""
+
+    def __init__(self, candidates: Iterable[_Candidate]) -> None:
+        self._items = sorted(candidates, key=_occurred)
+
+    def __iter__(self) -> Iterator[_Candidate]:
+        return iter(self._items)
+
+    def add(self, candidate: _Candidate) -> None:
+        insort(self._items, candidate, key=_occurred)
+
+    def window(self, occurred_at: datetime) -> list[_Candidate]:
+        """Return the candidates within the correlation window, newest first."""
+
+        center = _to_utc(occurred_at)
+        lo = bisect_left(self._items, center - CORRELATION_WINDOW, key=_occurred)
+        hi = bisect_right(self._items, center + CORRELATION_WINDOW, key=_occurred)
+        return self._items[lo:hi][::-1]
+
+
+def _occurred(candidate: _Candidate) -> datetime:
+    return candidate.occurred_at
 
 
 def _event_view(event: EventCreate | EventModel) -> dict[str, Any]:
     if isinstance(event, EventCreate):
-        occurred_at = event.occurred_at
         tags = event.tags
-        entity_id = event.entity.id
+        entity_type, entity_id = event.entity.type, event.entity.id
     else:
-        occurred_at = event.occurred_at
         tags = [tag.value for tag in event.tag_rows]
-        entity_id = event.entity_id
-    occurred_ms = int(occurred_at.timestamp() * 1000)
-    return {"entity_id": entity_id, "occurred_at": occurred_ms, "tags": tags}
+        entity_type, entity_id = event.entity_type, event.entity_id
+    occurred_ms = to_epoch_ms(event.occurred_at)
+    return {
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "occurred_at": occurred_ms,
+        "tags": tags,
+    }
+
 
+def _update_incident(
+    incident: Incident,
+    score_value: float | None,
+    occurred_at: datetime,
+    source: str,
+    tags: Iterable[str],
+) -> None:
+    """Fold one more event into the incident's score, timeline, and rollup counters."""
 
-def _update_incident(incident: Incident, score_value: float | None, occurred_at: datetime) -> None:
     if score_value is not None:
         if incident.score is None or score_value > incident.score:
             incident.score = score_value
@@ -163,6 +577,16 @@ def _update_incident(incident: Incident, score_value: float | None, occurred_at:
     last_event = incident.last_event_at
     if last_event is None or normalized_occurred > _to_utc(last_event):
         incident.last_event_at = normalized_occurred
+    first_event = incident.first_event_at
+    if first_event is None or normalized_occurred < _to_utc(first_event):
+        incident.first_event_at = normalized_occurred
+    incident.event_count = (incident.event_count or 0) + 1
+    if source not in (incident.sources or []):
+        incident.sources = sorted([*(incident.sources or []), source])
+    tag_counts = dict(incident.tag_counts or {})
+    for tag in dict.fromkeys(tags):
+        tag_counts[tag] = tag_counts.get(tag, 0) + 1
+    incident.tag_counts = tag_counts
 
 
 def _to_utc(dt: datetime) -> datetime:
@@ -0,0 +1,74 @@
+"""Connector registry: named factories for the sources that produce CES events.
+
+A connector is a ``Connector`` subclass whose ``run`` coroutine produces
+``app.ingest.ces.Event`` objects and hands each one to ``emit``. ``emit`` waits while the
+connector's queue is full, so a connector that reads faster than the pipeline can store
+is slowed down instead of buffering without bound. ``run`` may return (a finite import)
+or run until it is cancelled (a poller or a websocket).
+
+    @register("rss")
+    class RSSConnector(Connector):
+        def __init__(self, url: str) -> None: ...
+
+        async def run(self, emit: Emit) -> None:
+            async for item in poll(self.url):
+                await emit(to_ces(item))
+
+``app.ingest.runtime`` builds the registered connectors by name and runs them.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from app.ingest.ces import Event as CESEvent
+
+Emit = Callable[[CESEvent], Awaitable[None]]
+ConnectorFactory = Callable[..., "Connector"]
+
+_connectors: dict[str, ConnectorFactory] = {}
+
+
+class Connector:
+    """One source of CES events; subclasses implement ``run``."""
+
+    name = ""
+
+    async def run(self, emit: Emit) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release sockets or files; called once after ``run`` ends, however it ends."""
+
+
+def register(name: str) -> Callable[[ConnectorFactory], ConnectorFactory]:
+    """Register a connector class or factory under ``name``; names are unique."""
+
+    def decorator(factory: ConnectorFactory) -> ConnectorFactory:
+        if name in _connectors and _connectors[name] is not factory:
+            raise ValueError(f"connector {name} is already registered")
+        _connectors[name] = factory
+        return factory
+
+    return decorator
+
+
+def unregister(name: str) -> None:
+    _connectors.pop(name, None)
+
+
+def registered() -> list[str]:
+    return sorted(_connectors)
+
+
+def create_connector(name: str, **options: Any) -> Connector:
+    """Build the connector registered as ``name``; ``KeyError`` if there is none."""
+
+    try:
+        factory = _connectors[name]
+    except KeyError:
+        raise KeyError(f"unknown connector {name}; registered: {registered()}") from None
+    connector = factory(**options)
+    connector.name = name
+    return connector
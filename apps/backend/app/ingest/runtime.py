@@ -0,0 +1,356 @@
+"""Run registered connectors on one asyncio loop and micro-batch their events into ingest.
+
+    python -m app.ingest.runtime rss coinbase_ws --config connectors.json
+
+Every connector runs as its own task and emits into a bounded queue (``queue_size``,
+default 1000); ``emit`` waits while the queue is full, which is the backpressure. One
+batcher task per connector drains its queue into batches of up to ``batch_size`` events,
+waiting at most ``max_wait`` seconds for a batch to fill, and stores each batch with
+``insert_events`` in a worker thread so the loop keeps reading while it commits. A batch
+that fails is retried event by event; an event that still fails is logged and dropped.
+
+A connector whose ``run`` raises is restarted after a delay that doubles from 1 s up to
+60 s and resets once the connector emits again. A connector whose ``run`` returns is
+finished when its queue is empty. ``stop`` cancels the connectors and stores what they
+had already queued.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import signal
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from time import perf_counter, time
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.api.schemas import EntityRef, EventCreate, EventLink, EventMetricPayload
+from app.db.session import SessionLocal, get_engine
+from app.ingest.baselines import flush_baselines
+from app.ingest.ces import Event as CESEvent
+from app.ingest.dedup import insert_events
+from app.ingest.digests import flush_digests
+from app.ingest.registry import Connector, create_connector
+from app.telemetry import (
+    queue_depth,
+    record_connector,
+    record_connector_lag,
+    record_ingest,
+    record_restart,
+)
+
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_MAX_WAIT = 0.25
+RESTART_SECONDS = 1.0
+MAX_RESTART_SECONDS = 60.0
+BUILTIN_CONNECTORS = ("app.ingest.fitbit",)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+logger = logging.getLogger(__name__)
+
+
+def to_event_create(event: CESEvent, received_at: datetime) -> EventCreate:
+    """The ingest payload for a CES event; ``ValidationError`` if it is malformed."""
+
+    return EventCreate(
+        source=event.source,
+        occurred_at=EPOCH + timedelta(milliseconds=event.occurred_at),
+        received_at=received_at,
+        entity=EntityRef(type=event.entity_type, id=event.entity_id),
+        type=event.type,
+        title=event.title,
+        body=event.body or None,
+        severity_raw=event.severity_raw,
+        tags=list(event.tags),
+        metrics=[
+            EventMetricPayload(name=name, value=value) for name, value in event.metrics.items()
+        ],
+        links=[EventLink.model_validate({"href": href}) for href in event.links],
+        extras=dict(event.extras),
+    )
+
+
+@dataclass
+class ConnectorStatus:
+    name: str
+    state: str = "pending"  # running, backoff, finished, stopped
+    emitted: int = 0
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    failed: int = 0
+    restarts: int = 0
+    last_error: str | None = None
+
+
+class _Slot:
+    """A connector with its queue, its two tasks and its counters."""
+
+    def __init__(self, connector: Connector, queue_size: int) -> None:
+        self.connector = connector
+        self.queue: asyncio.Queue[CESEvent] = asyncio.Queue(queue_size)
+        self.status = ConnectorStatus(connector.name)
+        self.depth = queue_depth(connector.name)
+        self.producer: asyncio.Task[None] | None = None
+        self.batcher: asyncio.Task[None] | None = None
+
+    async def emit(self, event: CESEvent) -> None:
+        await self.queue.put(event)
+        self.status.emitted += 1
+        self.depth.set(self.queue.qsize())
+
+
+class ConnectorRuntime:
+    """Connectors sharing one event loop, each feeding the pipeline through its own queue."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.queue_size = queue_size
+        self._clock = clock
+        self._slots: dict[str, _Slot] = {}
+        self._started = False
+
+    def add(self, connector: Connector) -> None:
+        """Run ``connector``; starts it at once when the runtime is already started."""
+
+        if connector.name in self._slots:
+            raise ValueError(f"connector {connector.name} is already running")
+        slot = self._slots[connector.name] = _Slot(connector, self.queue_size)
+        if self._started:
+            self._launch(slot)
+
+    async def start(self) -> None:
+        self._started = True
+        for slot in self._slots.values():
+            if slot.producer is None:
+                self._launch(slot)
+
+    async def wait(self) -> None:
+        """Return once every connector has returned and its queue is drained."""
+
+        producers = [slot.producer for slot in self._slots.values() if slot.producer]
+        if producers:
+            await asyncio.wait(producers)
+        for slot in self._slots.values():
+            await slot.queue.join()
+
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Cancel the connectors, store what they queued (up to ``timeout``), then exit."""
+
+        slots = [slot for slot in self._slots.values() if slot.producer]
+        producers = [slot.producer for slot in slots if slot.producer]
+        for producer in producers:
+            producer.cancel()
+        if producers:
+            await asyncio.wait(producers)
+        try:
+            await asyncio.wait_for(asyncio.gather(*(slot.queue.join() for slot in slots)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "dropping %d queued connector events",
+                sum(slot.queue.qsize() for slot in slots),
+            )
+        batchers = [slot.batcher for slot in slots if slot.batcher]
+        for batcher in batchers:
+            batcher.cancel()
+        if batchers:
+            await asyncio.wait(batchers)
+        for slot in slots:
+            if slot.status.state != "finished":
+                slot.status.state = "stopped"
+        self._started = False
+
+    def status(self) -> list[ConnectorStatus]:
+        return [slot.status for slot in self._slots.values()]
+
+    def _launch(self, slot: _Slot) -> None:
+        name = slot.connector.name
+        slot.producer = asyncio.create_task(self._produce(slot), name=f"connector-{name}")
+        slot.batcher = asyncio.create_task(self._drain(slot), name=f"connector-{name}-batcher")
+
+    async def _produce(self, slot: _Slot) -> None:
+        delay = RESTART_SECONDS
+        while True:
+            slot.status.state = "running"
+            emitted = slot.status.emitted
+            try:
+                await slot.connector.run(slot.emit)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.exception("connector %s failed; restarting", slot.connector.name)
+                slot.status.last_error = repr(exc)
+            else:
+                slot.status.state = "finished"
+                return
+            finally:
+                await self._close(slot.connector)
+            if slot.status.emitted > emitted:
+                delay = RESTART_SECONDS
+            slot.status.state = "backoff"
+            slot.status.restarts += 1
+            record_restart(slot.connector.name)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RESTART_SECONDS)
+
+    @staticmethod
+    async def _close(connector: Connector) -> None:
+        try:
+            await connector.close()
+        except Exception:
+            logger.exception("connector %s did not close cleanly", connector.name)
+
+    async def _drain(self, slot: _Slot) -> None:
+        loop = asyncio.get_running_loop()
+        queue = slot.queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.batch_size:
+                if not queue.empty():
+                    batch.append(queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            slot.depth.set(queue.qsize())
+            try:
+                await asyncio.to_thread(self._ingest, slot, batch)
+            except Exception:
+                logger.exception("connector %s lost a batch of %d", slot.connector.name, len(batch))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _ingest(self, slot: _Slot, batch: Sequence[CESEvent]) -> None:
+        name = slot.connector.name
+        received_at = datetime.now(timezone.utc)
+        events: list[EventCreate] = []
+        for item in batch:
+            try:
+                events.append(to_event_create(item, received_at))
+            except ValidationError:
+                logger.warning("connector %s emitted an invalid event", name, exc_info=True)
+                slot.status.invalid += 1
+                record_connector(name, "invalid", 1)
+        if not events:
+            return
+        try:
+            self._store(slot, events)
+        except Exception:
+            logger.exception(
+                "batch of %d from %s failed; retrying events one by one", len(events), name
+            )
+            for event in events:
+                try:
+                    self._store(slot, [event])
+                except Exception:
+                    logger.exception("event from %s failed", name)
+                    slot.status.failed += 1
+                    record_connector(name, "failed", 1)
+
+    def _store(self, slot: _Slot, events: Sequence[EventCreate]) -> None:
+        name = slot.connector.name
+        start = perf_counter()
+        with self.session_factory() as session:
+            outcomes = insert_events(session, events)
+        created = sum(was_created for _, was_created in outcomes)
+        duplicates = len(outcomes) - created
+        record_ingest("connector", perf_counter() - start, created, duplicates)
+        slot.status.created += created
+        slot.status.duplicates += duplicates
+        record_connector(name, "created", created)
+        record_connector(name, "duplicate", duplicates)
+        now = self._clock()
+        record_connector_lag(
+            name,
+            (
+                max(now - event.occurred_at.timestamp(), 0.0)
+                for event, (_, was_created) in zip(events, outcomes)
+                if was_created
+            ),
+        )
+
+
+async def serve(runtime: ConnectorRuntime) -> None:
+    """Run until every connector has finished or the process receives SIGINT/SIGTERM."""
+
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    await runtime.start()
+    finished = asyncio.create_task(runtime.wait())
+    stopping = asyncio.create_task(stop.wait())
+    await asyncio.wait({finished, stopping}, return_when=asyncio.FIRST_COMPLETED)
+    stopping.cancel()
+    finished.cancel()
+    await runtime.stop()
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Run connectors straight into the pipeline.")
+    parser.add_argument("connectors", nargs="*", help="registered connector names")
+    parser.add_argument("--config", help="JSON file mapping connector names to their options")
+    parser.add_argument(
+        "--import",
+        dest="modules",
+        action="append",
+        default=[],
+        help="module that registers connectors (repeatable)",
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-wait-ms", type=int, default=int(DEFAULT_MAX_WAIT * 1000))
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    for module in (*BUILTIN_CONNECTORS, *args.modules):
+        importlib.import_module(module)
+    options: dict[str, dict] = {}
+    if args.config:
+        with open(args.config, encoding="utf-8") as handle:
+            options = json.load(handle)
+    names = list(dict.fromkeys([*args.connectors, *options]))
+    if not names:
+        parser.error("no connectors given")
+
+    get_engine()
+    runtime = ConnectorRuntime(
+        SessionLocal,
+        batch_size=args.batch_size,
+        max_wait=args.max_wait_ms / 1000,
+        queue_size=args.queue_size,
+    )
+    for name in names:
+        runtime.add(create_connector(name, **options.get(name, {})))
+    try:
+        asyncio.run(serve(runtime))
+    finally:
+        flush_baselines()
+        flush_digests()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Registry of versioned scoring models, hot-reloaded from ``scoring_models``.
+
+At most one stored version is ``live`` and scores events; without one the builtin model
+does. At most one is ``shadow``: it scores every event from the same features as the
+live model, and its score is recorded in ``explain.shadow`` without affecting routing.
+That costs one extra weighted sum per event (one matrix product per vectorized batch).
+
+Each process keeps the compiled live and shadow models per database and re-reads the
+two statuses at most every ``SCORING_RELOAD_SECONDS`` (default 10), so promoting a
+version reaches every worker without a restart. Definitions are immutable, so a version
+is compiled once.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.db import ModelVersion
+from app.db.session import database_key
+from app.services.scoring import DEFAULT_MODEL, ScoringModel
+
+DEFAULT_RELOAD_SECONDS = 10.0
+ROLES = ("live", "shadow")
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """The live and shadow models of one database."""
+
+    def __init__(
+        self,
+        reload_seconds: float = DEFAULT_RELOAD_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.reload_seconds = reload_seconds
+        self.live: ScoringModel = DEFAULT_MODEL
+        self.shadow: ScoringModel | None = None
+        self._clock = clock
+        self._checked = -math.inf
+        self._compiled: dict[str, ScoringModel] = {}
+        self._lock = threading.Lock()
+
+    def current(self, session: Session) -> tuple[ScoringModel, ScoringModel | None]:
+        """The live and shadow models, reloading them when the last check is stale."""
+
+        if self._clock() - self._checked >= self.reload_seconds:
+            self.reload(session)
+        return self.live, self.shadow
+
+    def reload(self, session: Session) -> None:
+        with self._lock:
+            self._checked = self._clock()
+        try:
+            with session.no_autoflush:
+                rows = session.execute(
+                    select(ModelVersion.version, ModelVersion.status, ModelVersion.definition)
+                    .where(ModelVersion.status.in_(ROLES))
+                    .order_by(ModelVersion.updated_at)
+                ).all()
+        except SQLAlchemyError:
+            logger.warning("scoring model reload failed; keeping current models", exc_info=True)
+            return
+        found: dict[str, ScoringModel] = {}
+        for version, status, definition in rows:
+            model = self._compiled.get(version)
+            if model is None:
+                try:
+                    model = self._compiled[version] = ScoringModel.compile(version, definition)
+                except ValueError:
+                    logger.warning("scoring model %s does not compile", version, exc_info=True)
+                    continue
+            found[status] = model  # the most recently promoted wins
+        with self._lock:
+            self.live = found.get("live", DEFAULT_MODEL)
+            self.shadow = found.get("shadow")
+
+    def invalidate(self) -> None:
+        """Reload on the next ``current`` call."""
+
+        with self._lock:
+            self._checked = -math.inf
+
+
+_registries: dict[str, ModelRegistry] = {}
+_registry_lock = threading.Lock()
+
+
+def get_model_registry(session: Session) -> ModelRegistry:
+    """Return the registry for the session's database."""
+
+    key = database_key(session.get_bind())
+    with _registry_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = ModelRegistry(
+                float(os.getenv("SCORING_RELOAD_SECONDS", DEFAULT_RELOAD_SECONDS))
+            )
+    return registry
+
+
+def current_models(session: Session) -> tuple[ScoringModel, ScoringModel | None]:
+    return get_model_registry(session).current(session)
+
+
+def register_model(session: Session, version: str, definition: dict[str, Any]) -> ModelVersion:
+    """Store a new version as ``inactive``; ``ValueError`` if it does not compile.
+
+    Re-registering a version with the same definition returns the stored row; a
+    different definition raises ``ValueError``.
+    """
+
+    model = ScoringModel.compile(version, definition)
+    stored = session.get(ModelVersion, version)
+    if stored is not None:
+        if stored.definition != model.definition():
+            raise ValueError(f"version {version} already exists with another definition")
+        return stored
+    now = datetime.now(timezone.utc)
+    row = ModelVersion(
+        version=version,
+        definition=model.definition(),
+        status="inactive",
+        created_at=now,
+        updated_at=now,
+    )
+    session.add(row)
+    session.commit()
+    return row
+
+
+def set_status(session: Session, version: str, status: str) -> ModelVersion | None:
+    """Make ``version`` live, shadow or inactive; the previous holder becomes inactive."""
+
+    row = session.get(ModelVersion, version, with_for_update=True)
+    if row is None:
+        return None
+    now = datetime.now(timezone.utc)
+    if status in ROLES:
+        session.execute(
+            update(ModelVersion)
+            .where(ModelVersion.status == status, ModelVersion.version != version)
+            .values(status="inactive", updated_at=now)
+        )
+    row.status = status
+    row.updated_at = now
+    session.commit()
+    get_model_registry(session).invalidate()
+    return row
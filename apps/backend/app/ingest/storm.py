@@ -0,0 +1,179 @@
+"""Storm control: raise the delivery threshold while event volume spikes.
+
+``StormTracker`` keeps two exponentially weighted arrival rates per source and per
+entity: a short one (``SHORT_TAU``, about the last minute) and a baseline
+(``BASELINE_TAU``, about the last hour). A key is storming while its short rate is at
+least ``STORM_MIN_RATE`` events/min and ``STORM_MULTIPLIER`` times its baseline. During
+a storm the push threshold (``PUSH_THRESHOLD``) rises with the size of the spike, and
+events scoring below it skip correlation and go to the digest instead of being pushed.
+Every decision is recorded in the event's ``explain["delivery"]``.
+
+Rates are measured on the ingest clock, per process and per database, so each API
+process or stream consumer protects itself. ``STORM_CONTROL=off`` disables tracking;
+events are then routed on the base threshold alone.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.api.schemas import EventCreate
+from app.db.session import database_key
+
+SHORT_TAU = 60.0
+BASELINE_TAU = 3600.0
+DEFAULT_PUSH_THRESHOLD = 0.6
+DEFAULT_MIN_RATE = 30.0  # events per minute
+DEFAULT_MULTIPLIER = 4.0
+THRESHOLD_STEP = 0.1  # per doubling of the rate over the storm trigger
+MAX_THRESHOLD = 0.95
+IDLE_SECONDS = 2 * BASELINE_TAU  # keys idle this long are forgotten
+SWEEP_EVERY = 10_000
+
+
+@dataclass
+class _Rate:
+    short: float
+    baseline: float
+    first_seen: float
+    updated: float
+
+
+@dataclass
+class Assessment:
+    """Where one event goes and why."""
+
+    route: str  # "push" or "digest"
+    threshold: float
+    storm_key: str | None = None
+    rate: float | None = None  # events per minute on ``storm_key``
+    skip_correlation: bool = False
+
+    @property
+    def suppressed(self) -> bool:
+        return self.storm_key is not None and self.route == "digest"
+
+    def explain(self) -> dict[str, Any]:
+        explain: dict[str, Any] = {"route": self.route, "threshold": round(self.threshold, 4)}
+        if self.storm_key is not None:
+            explain["storm"] = {"key": self.storm_key, "rate_per_min": round(self.rate or 0.0, 2)}
+        if self.skip_correlation:
+            explain["correlation"] = "skipped"
+        return explain
+
+
+def push_threshold() -> float:
+    return float(os.getenv("PUSH_THRESHOLD", DEFAULT_PUSH_THRESHOLD))
+
+
+def route(score_value: float) -> Assessment:
+    """Route on the base threshold alone, without rate tracking."""
+
+    threshold = push_threshold()
+    return Assessment("push" if score_value >= threshold else "digest", threshold)
+
+
+class StormTracker:
+    """Per-source and per-entity arrival rates with storm assessment."""
+
+    def __init__(
+        self,
+        min_rate: float = DEFAULT_MIN_RATE,
+        multiplier: float = DEFAULT_MULTIPLIER,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_rate = min_rate
+        self.multiplier = multiplier
+        self._clock = clock
+        self._rates: dict[str, _Rate] = {}
+        self._updates = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rates)
+
+    def assess(self, event: EventCreate, score_value: float) -> Assessment:
+        """Count ``event`` and decide its delivery route."""
+
+        keys = (f"source:{event.source}", f"entity:{event.entity.type}:{event.entity.id}")
+        now = self._clock()
+        storm_key, storm_rate, ratio = None, None, 0.0
+        with self._lock:
+            for key in keys:
+                short, baseline = self._observe(key, now)
+                trigger = max(self.min_rate, self.multiplier * baseline)
+                if short >= trigger and short / trigger > ratio:
+                    storm_key, storm_rate, ratio = key, short, short / trigger
+            self._updates += 1
+            if self._updates % SWEEP_EVERY == 0:
+                self._sweep(now)
+
+        assessment = route(score_value)
+        if storm_key is None:
+            return assessment
+        threshold = min(
+            MAX_THRESHOLD, assessment.threshold + THRESHOLD_STEP * (1 + math.log2(ratio))
+        )
+        pushed = score_value >= threshold
+        return Assessment(
+            route="push" if pushed else "digest",
+            threshold=threshold,
+            storm_key=storm_key,
+            rate=storm_rate,
+            skip_correlation=not pushed and event.incident_id is None,
+        )
+
+    def _observe(self, key: str, now: float) -> tuple[float, float]:
+        """Add one arrival to ``key``; return its short and baseline rates per minute."""
+
+        rate = self._rates.get(key)
+        if rate is None:
+            rate = self._rates[key] = _Rate(0.0, 0.0, now, now)
+        elapsed = max(now - rate.updated, 0.0)
+        rate.short = rate.short * math.exp(-elapsed / SHORT_TAU) + 1 / SHORT_TAU
+        rate.baseline = rate.baseline * math.exp(-elapsed / BASELINE_TAU) + 1 / BASELINE_TAU
+        rate.updated = now
+        # A new key's averages start from zero, so scale them up while they are young. The
+        # baseline is scaled as if it had a quarter of its tau, so a burst from a new key
+        # still counts as a spike; a busy source may look stormy for a few minutes.
+        age = now - rate.first_seen
+        short = rate.short / -math.expm1(-max(age, SHORT_TAU) / SHORT_TAU)
+        baseline = rate.baseline / -math.expm1(-max(age, BASELINE_TAU / 4) / BASELINE_TAU)
+        return short * 60, baseline * 60
+
+    def _sweep(self, now: float) -> None:
+        idle = [key for key, rate in self._rates.items() if now - rate.updated > IDLE_SECONDS]
+        for key in idle:
+            del self._rates[key]
+
+
+def storm_mode() -> str:
+    return os.getenv("STORM_CONTROL", "on").lower()
+
+
+_trackers: dict[str, StormTracker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_storm_tracker(session: Session) -> StormTracker | None:
+    """Return the tracker for the session's database, or ``None`` when disabled."""
+
+    if storm_mode() == "off":
+        return None
+    key = database_key(session.get_bind())
+    with _registry_lock:
+        tracker = _trackers.get(key)
+        if tracker is None:
+            tracker = _trackers[key] = StormTracker(
+                min_rate=float(os.getenv("STORM_MIN_RATE", DEFAULT_MIN_RATE)),
+                multiplier=float(os.getenv("STORM_MULTIPLIER", DEFAULT_MULTIPLIER)),
+            )
+    return tracker
@@ -0,0 +1,166 @@
+"""Durable ingest queue on a Redis stream, drained by pipeline consumer groups.
+
+``POST /events/async`` appends validated events to ``STREAM_KEY``. Consumers in
+``CONSUMER_GROUP`` read them in batches, run them through the batch pipeline, and
+acknowledge (then delete) each entry only after its transaction commits. Entries left
+pending by a crashed consumer are reclaimed after ``min_idle_ms``; an entry delivered more
+than ``max_retries`` times, or one that cannot be parsed, moves to ``DEAD_LETTER_KEY``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, cast
+
+import redis
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.api.schemas import EventCreate
+from app.ingest.dedup import insert_events
+from app.ingest.pipeline import fingerprint_event
+from app.telemetry import record_ingest
+
+STREAM_KEY = "signalos:ingest"
+DEAD_LETTER_KEY = "signalos:ingest:dead"
+CONSUMER_GROUP = "pipeline"
+
+logger = logging.getLogger(__name__)
+
+Message = tuple[str, dict[str, Any]]
+
+
+def enqueue_event(client: redis.Redis, event: EventCreate) -> tuple[str, str]:
+    """Append ``event`` to the ingest stream; return its fingerprint and stream id."""
+
+    fingerprint = fingerprint_event(event)
+    message_id = client.xadd(
+        STREAM_KEY, {"event": event.model_dump_json(), "fingerprint": fingerprint}
+    )
+    return fingerprint, cast(str, message_id)
+
+
+def ensure_group(client: redis.Redis) -> None:
+    try:
+        client.xgroup_create(STREAM_KEY, CONSUMER_GROUP, id="0", mkstream=True)
+    except redis.ResponseError as exc:
+        if "BUSYGROUP" not in str(exc):
+            raise
+
+
+@dataclass
+class StreamConsumer:
+    """One member of the pipeline consumer group."""
+
+    client: redis.Redis
+    session_factory: Callable[[], Session]
+    name: str
+    batch_size: int = 100
+    block_ms: int = 1000
+    max_retries: int = 5
+    min_idle_ms: int = 60_000
+
+    def run(self, stop: threading.Event) -> None:
+        ensure_group(self.client)
+        while not stop.is_set():
+            try:
+                self.poll()
+            except redis.ConnectionError:
+                logger.exception("consumer %s lost its redis connection", self.name)
+                stop.wait(1.0)
+
+    def poll(self) -> int:
+        """Process one batch of reclaimed and new entries; return how many were handled."""
+
+        messages = self._reclaim()
+        if len(messages) < self.batch_size:
+            messages += self._read(self.batch_size - len(messages))
+        if messages:
+            self._handle(messages)
+        return len(messages)
+
+    def _read(self, count: int) -> list[Message]:
+        response = cast(
+            list[tuple[str, list[Message]]],
+            self.client.xreadgroup(
+                CONSUMER_GROUP, self.name, {STREAM_KEY: ">"}, count=count, block=self.block_ms
+            ),
+        )
+        return list(response[0][1]) if response else []
+
+    def _reclaim(self) -> list[Message]:
+        _, claimed, *_ = cast(
+            list[Any],
+            self.client.xautoclaim(
+                STREAM_KEY,
+                CONSUMER_GROUP,
+                self.name,
+                min_idle_time=self.min_idle_ms,
+                start_id="0-0",
+                count=self.batch_size,
+            ),
+        )
+        claimed = [(message_id, fields) for message_id, fields in claimed if fields]
+        if not claimed:
+            return []
+        pending = cast(
+            list[dict[str, Any]],
+            self.client.xpending_range(
+                STREAM_KEY,
+                CONSUMER_GROUP,
+                min=claimed[0][0],
+                max=claimed[-1][0],
+                count=len(claimed),
+            ),
+        )
+        deliveries = {entry["message_id"]: entry["times_delivered"] for entry in pending}
+        retry: list[Message] = []
+        for message_id, fields in claimed:
+            if deliveries.get(message_id, 0) > self.max_retries:
+                self._dead_letter(message_id, fields, "max retries exceeded")
+            else:
+                retry.append((message_id, fields))
+        return retry
+
+    def _handle(self, messages: Sequence[Message]) -> None:
+        parsed: list[tuple[str, EventCreate]] = []
+        for message_id, fields in messages:
+            try:
+                parsed.append((message_id, EventCreate.model_validate_json(fields["event"])))
+            except (KeyError, ValidationError) as exc:
+                self._dead_letter(message_id, fields, str(exc))
+        if not parsed:
+            return
+        try:
+            self._ingest(parsed)
+        except Exception:
+            logger.exception("batch of %d failed; retrying entries one by one", len(parsed))
+            for item in parsed:
+                try:
+                    self._ingest([item])
+                except Exception:
+                    # Left pending: reclaimed after min_idle_ms, dead-lettered after max_retries.
+                    logger.exception("entry %s failed", item[0])
+
+    def _ingest(self, items: Sequence[tuple[str, EventCreate]]) -> None:
+        start = perf_counter()
+        with self.session_factory() as session:
+            outcomes = insert_events(session, [event for _, event in items])
+        created = sum(was_created for _, was_created in outcomes)
+        record_ingest("stream", perf_counter() - start, created, len(outcomes) - created)
+        self._ack([message_id for message_id, _ in items])
+
+    def _dead_letter(self, message_id: str, fields: dict[str, Any], error: str) -> None:
+        entry: dict[Any, Any] = {**fields, "error": error, "source_id": message_id}
+        self.client.xadd(DEAD_LETTER_KEY, entry)
+        self._ack([message_id])
+
+    def _ack(self, message_ids: list[str]) -> None:
+        pipe = self.client.pipeline()
+        pipe.xack(STREAM_KEY, CONSUMER_GROUP, *message_ids)
+        pipe.xdel(STREAM_KEY, *message_ids)
+        pipe.execute()
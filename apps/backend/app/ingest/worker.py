@@ -0,0 +1,66 @@
+"""Run a pool of pipeline consumers draining the Redis ingest stream.
+
+    python -m app.ingest.worker --consumers 4 --batch-size 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+from collections.abc import Sequence
+
+from app.db.redis import get_redis_client
+from app.db.session import SessionLocal, get_engine
+from app.ingest.baselines import flush_baselines
+from app.ingest.digests import flush_digests
+from app.ingest.stream import StreamConsumer, ensure_group
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Drain the ingest stream into the pipeline.")
+    parser.add_argument("--consumers", type=int, default=4)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--block-ms", type=int, default=1000)
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--min-idle-ms", type=int, default=60_000)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    get_engine()
+    client = get_redis_client()
+    ensure_group(client)
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    threads = [
+        threading.Thread(
+            target=StreamConsumer(
+                client=client,
+                session_factory=SessionLocal,
+                name=f"{prefix}-{n}",
+                batch_size=args.batch_size,
+                block_ms=args.block_ms,
+                max_retries=args.max_retries,
+                min_idle_ms=args.min_idle_ms,
+            ).run,
+            args=(stop,),
+            name=f"ingest-consumer-{n}",
+        )
+        for n in range(args.consumers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    flush_baselines()
+    flush_digests()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Archive old events to object storage as Parquet and delete them from the hot tables.
+
+Each run moves every event older than ``--older-than-days`` (``ARCHIVE_AFTER_DAYS``,
+default 90), with its tags and metrics, into one segment per UTC day and source; see
+``app.archive.store`` for where segments are written. ``GET /events`` keeps serving the
+archived rows.
+
+    python -m app.jobs.archive_events [--older-than-days 90] [--batch-size 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+
+from app.archive.archiver import DEFAULT_BATCH_SIZE, archive_events
+from app.db.session import SessionLocal, get_engine
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Archive old events to object storage.")
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=int(os.getenv("ARCHIVE_AFTER_DAYS", DEFAULT_ARCHIVE_AFTER_DAYS)),
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+    get_engine()
+    with SessionLocal() as session:
+        result = archive_events(session, cutoff, batch_size=args.batch_size)
+    print(f"archived {result.events} event(s) into {result.segments} segment(s)")
+
+
+if __name__ == "__main__":
+    main()
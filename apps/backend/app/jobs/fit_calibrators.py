@@ -0,0 +1,86 @@
+"""Fit per-source Platt calibrators from feedback and store them as a new version.
+
+Reads every ``feedback`` row (source, raw score, outcome) in one query and fits one
+sigmoid per source at once (``app.services.calibration.fit_platt``). ``useful`` and
+``took_action`` count as positive. Sources with fewer than ``--min-samples`` labeled
+events are left out and keep their raw scores. Ingest picks up the new version within
+``CALIBRATION_RELOAD_SECONDS``.
+
+    python -m app.jobs.fit_calibrators [--min-samples 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.db import Calibrator, Feedback
+from app.db.session import SessionLocal, get_engine
+from app.ingest.calibration import get_calibration_registry
+from app.services.calibration import fit_platt
+
+POSITIVE_OUTCOMES = ("useful", "took_action")
+DEFAULT_MIN_SAMPLES = 50
+
+
+def fit_calibrators(session: Session, min_samples: int = DEFAULT_MIN_SAMPLES) -> int | None:
+    """Fit and store a new calibration version; return it, or ``None`` if nothing fit."""
+
+    rows = session.execute(
+        select(Feedback.source, Feedback.score, Feedback.outcome).where(
+            Feedback.score.is_not(None)
+        )
+    ).all()
+    if not rows:
+        return None
+    sources, scores, outcomes = zip(*rows)
+    names, groups = np.unique(np.array(sources), return_inverse=True)
+    labels = np.isin(np.array(outcomes), POSITIVE_OUTCOMES)
+    fit = fit_platt(groups, np.asarray(scores, dtype=float), labels)
+    keep = np.flatnonzero(fit.samples >= min_samples)
+    if not len(keep):
+        return None
+
+    latest = session.execute(select(func.max(Calibrator.version))).scalar()
+    version = (latest or 0) + 1
+    now = datetime.now(timezone.utc)
+    session.execute(
+        insert(Calibrator),
+        [
+            {
+                "version": version,
+                "source": str(names[index]),
+                "a": float(fit.a[index]),
+                "b": float(fit.b[index]),
+                "samples": int(fit.samples[index]),
+                "positives": int(fit.positives[index]),
+                "created_at": now,
+            }
+            for index in keep.tolist()
+        ],
+    )
+    session.commit()
+    get_calibration_registry(session).invalidate()
+    return version
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Fit per-source score calibrators.")
+    parser.add_argument("--min-samples", type=int, default=DEFAULT_MIN_SAMPLES)
+    args = parser.parse_args(argv)
+    get_engine()
+    with SessionLocal() as session:
+        version = fit_calibrators(session, min_samples=args.min_samples)
+    if version is None:
+        print("no source has enough feedback; nothing fitted")
+    else:
+        print(f"stored calibration version {version}")
+
+
+if __name__ == "__main__":
+    main()
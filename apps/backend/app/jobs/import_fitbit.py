@@ -0,0 +1,286 @@
+"""Bulk-import a Fitbit export archive, bypassing per-event ingest.
+
+    python -m app.jobs.import_fitbit export.zip --user user-123 [--chunk-size 5000]
+
+Rows are streamed out of the archive (see ``app.ingest.fitbit``) and loaded in chunks of
+``--chunk-size`` rows, one transaction per chunk. Each chunk is scored with the live model
+in one vectorized pass (``score_events``), calibrated, and written with its metrics and
+tags. On Postgres the chunk is copied into a temporary table with ``COPY`` and moved into
+``events`` with ``INSERT … ON CONFLICT DO NOTHING``, and its metrics and tags are copied
+straight into their tables. Other databases get Core inserts of the rows whose
+fingerprint is not stored yet. Either way a row imported before is skipped.
+
+Every chunk's transaction also advances the member's row count for the user in
+``import_checkpoints``, so an interrupted import resumes after its last committed chunk
+and a member finished for the same user is not read again. Memory use is bounded by one
+chunk.
+
+Imported events skip correlation, storm control, digests, baselines and the push feed;
+cached listings catch up within ``RESPONSE_CACHE_TTL``. Pass ``--rebuild-baselines`` (or
+run ``app.jobs.rebuild_baselines``) so later events are scored against the history.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import uuid
+import zipfile
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from app.api.schemas import EventCreate
+from app.db import Event, EventMetric, EventTag, ImportCheckpoint
+from app.db.session import SessionLocal, get_engine
+from app.ingest.baselines import DEFAULT_ALPHA
+from app.ingest.calibration import current_calibration
+from app.ingest.ces import Event as CESEvent
+from app.ingest.fitbit import export_members, member_key, read_member
+from app.ingest.pipeline import fingerprint_event, score_events
+from app.ingest.runtime import to_event_create
+from app.ingest.scoring_models import current_models
+from app.jobs.rebuild_baselines import rebuild_baselines
+
+IMPORTER = "fitbit"
+DEFAULT_CHUNK_SIZE = 5_000
+LOOKUP_BATCH = 1_000
+EVENT_COLUMNS = (
+    "id",
+    "source",
+    "occurred_at",
+    "received_at",
+    "entity_type",
+    "entity_id",
+    "type",
+    "title",
+    "body",
+    "severity_raw",
+    "links",
+    "extras",
+    "features",
+    "score",
+    "explain",
+    "incident_id",
+    "fingerprint",
+)
+JSON_COLUMNS = {"links", "extras", "features", "explain"}
+METRIC_COLUMNS = ("event_id", "occurred_at", "name", "value", "unit")
+TAG_COLUMNS = ("event_id", "occurred_at", "value")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ImportStats:
+    members: int = 0
+    rows: int = 0
+    created: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+
+
+def import_export(
+    session: Session, path: str, user: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> ImportStats:
+    """Import every importable member of the archive at ``path`` for ``user``."""
+
+    stats = ImportStats()
+    with zipfile.ZipFile(path) as archive:
+        for info, spec in export_members(archive):
+            checkpoint = _checkpoint(session, member_key(info, user))
+            if checkpoint.done:
+                continue
+            stats.members += 1
+            items = read_member(archive, info, spec, user, skip=checkpoint.rows)
+            while chunk := list(islice(items, chunk_size)):
+                events = [event for event in chunk if event is not None]
+                created = load_chunk(session, events) if events else 0
+                stats.rows += len(chunk)
+                stats.created += created
+                stats.duplicates += len(events) - created
+                stats.skipped += len(chunk) - len(events)
+                checkpoint.rows += len(chunk)
+                checkpoint.updated_at = datetime.now(timezone.utc)
+                session.commit()
+                logger.info("%s: %d row(s) imported", info.filename, checkpoint.rows)
+            checkpoint.done = True
+            checkpoint.updated_at = datetime.now(timezone.utc)
+            session.commit()
+    return stats
+
+
+def load_chunk(session: Session, events: Sequence[CESEvent]) -> int:
+    """Score and store ``events`` in the session's transaction; return how many were new."""
+
+    received_at = datetime.now(timezone.utc)
+    unique: dict[str, EventCreate] = {}
+    for event in events:
+        payload = to_event_create(event, received_at)
+        unique.setdefault(fingerprint_event(payload), payload)
+    fingerprints = list(unique)
+    payloads = list(unique.values())
+    live, _ = current_models(session)
+    calibration = current_calibration(session)
+    batch = score_events(payloads, model=live)
+
+    rows: list[dict[str, Any]] = []
+    metrics: list[dict[str, Any]] = []
+    tags: list[dict[str, Any]] = []
+    for fingerprint, payload, features, score_value, explain in zip(
+        fingerprints, payloads, batch.feature_dicts(), batch.scores.tolist(), batch.explains()
+    ):
+        explain["model"] = live.version
+        calibrated = calibration.calibrate(payload.source, score_value)
+        if calibrated is not None:
+            raw_score = round(score_value, 6)
+            explain["calibration"] = {"version": calibration.version, "raw_score": raw_score}
+            score_value = calibrated
+        event_id = uuid.uuid4()
+        occurred_at = payload.occurred_at
+        rows.append(
+            {
+                "id": event_id,
+                "source": payload.source,
+                "occurred_at": occurred_at,
+                "received_at": received_at,
+                "entity_type": payload.entity.type,
+                "entity_id": payload.entity.id,
+                "type": payload.type,
+                "title": payload.title,
+                "body": payload.body,
+                "severity_raw": payload.severity_raw,
+                "links": [],
+                "extras": payload.extras,
+                "features": features,
+                "score": score_value,
+                "explain": explain,
+                "incident_id": None,
+                "fingerprint": fingerprint,
+            }
+        )
+        metrics.extend(
+            {
+                "event_id": event_id,
+                "occurred_at": occurred_at,
+                "name": metric.name,
+                "value": metric.value,
+                "unit": metric.unit,
+            }
+            for metric in payload.metrics
+        )
+        tags.extend(
+            {"event_id": event_id, "occurred_at": occurred_at, "value": value}
+            for value in dict.fromkeys(payload.tags)
+        )
+
+    if session.get_bind().dialect.name == "postgresql":
+        created = _copy_events(session, rows)
+        _copy(session, "event_metrics", METRIC_COLUMNS, _keep(metrics, created))
+        _copy(session, "event_tags", TAG_COLUMNS, _keep(tags, created))
+    else:
+        created = _insert_events(session, rows)
+        if metrics := _keep(metrics, created):
+            session.execute(insert(EventMetric), metrics)
+        if tags := _keep(tags, created):
+            session.execute(insert(EventTag), tags)
+    return len(created)
+
+
+def _keep(rows: list[dict[str, Any]], created: set[uuid.UUID]) -> list[dict[str, Any]]:
+    return [row for row in rows if row["event_id"] in created]
+
+
+def _copy_events(session: Session, rows: list[dict[str, Any]]) -> set[uuid.UUID]:
+    columns = ", ".join(EVENT_COLUMNS)
+    session.execute(
+        text(
+            "CREATE TEMP TABLE IF NOT EXISTS import_events"
+            " (LIKE events INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+    )
+    _copy(session, "import_events", EVENT_COLUMNS, rows)
+    inserted = session.execute(
+        text(
+            f"INSERT INTO events ({columns}) SELECT {columns} FROM import_events"
+            " ON CONFLICT DO NOTHING RETURNING id"
+        )
+    ).scalars()
+    return {uuid.UUID(str(event_id)) for event_id in inserted}
+
+
+def _copy(
+    session: Session, table: str, columns: Sequence[str], rows: list[dict[str, Any]]
+) -> None:
+    if not rows:
+        return
+    connection = session.connection().connection.driver_connection
+    assert connection is not None  # checked out by session.connection()
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    with connection.cursor() as cursor, cursor.copy(statement) as copy:
+        for row in rows:
+            copy.write_row(
+                [json.dumps(row[c]) if c in JSON_COLUMNS else row[c] for c in columns]
+            )
+
+
+def _insert_events(session: Session, rows: list[dict[str, Any]]) -> set[uuid.UUID]:
+    fingerprints = [row["fingerprint"] for row in rows]
+    stored: set[str | None] = set()
+    for offset in range(0, len(fingerprints), LOOKUP_BATCH):
+        stored.update(
+            session.execute(
+                select(Event.fingerprint).where(
+                    Event.fingerprint.in_(fingerprints[offset : offset + LOOKUP_BATCH])
+                )
+            ).scalars()
+        )
+    fresh = [row for row in rows if row["fingerprint"] not in stored]
+    if fresh:
+        session.execute(insert(Event), fresh)
+    return {row["id"] for row in fresh}
+
+
+def _checkpoint(session: Session, key: str) -> ImportCheckpoint:
+    checkpoint = session.execute(
+        select(ImportCheckpoint).where(
+            ImportCheckpoint.importer == IMPORTER, ImportCheckpoint.key == key
+        )
+    ).scalar_one_or_none()
+    if checkpoint is None:
+        checkpoint = ImportCheckpoint(
+            importer=IMPORTER, key=key, rows=0, done=False, updated_at=datetime.now(timezone.utc)
+        )
+        session.add(checkpoint)
+        session.flush()
+    return checkpoint
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk-import a Fitbit export archive.")
+    parser.add_argument("archive", help="export .zip")
+    parser.add_argument("--user", required=True, help="entity id of the user the export is for")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--rebuild-baselines", action="store_true")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    get_engine()
+    with SessionLocal() as session:
+        stats = import_export(session, args.archive, args.user, args.chunk_size)
+        if args.rebuild_baselines:
+            rebuild_baselines(session, float(os.getenv("BASELINE_ALPHA", DEFAULT_ALPHA)))
+    print(
+        f"imported {stats.created} event(s) from {stats.members} member(s);"
+        f" {stats.duplicates} duplicate(s), {stats.skipped} row(s) skipped"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Create upcoming event partitions and enforce event retention.
+
+On Postgres, partitions are created ``--ahead`` intervals into the future, and retention
+drops every partition that ends before the cutoff, which is a catalog change rather than
+a row-by-row delete. Retention is therefore partition-granular: events younger than the
+cutoff are never removed, and older ones can outlive it by up to one interval. Rows in
+the ``*_default`` partitions are deleted individually. SQLite has no partitions, so
+retention there deletes old events in batches.
+
+    python -m app.jobs.partitions [--ahead 4] [--retain-days 90]
+
+Dropped events still count towards their incidents until ``reconcile_incidents`` runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.engine import Engine
+
+from app.db import Event, EventMetric, EventTag
+from app.db.partitions import PARTITIONS_AHEAD, drop_partitions_before, ensure_partitions
+from app.db.session import get_engine
+
+
+def apply_retention(engine: Engine, cutoff: datetime, batch_size: int = 5_000) -> int:
+    """Remove events that occurred before ``cutoff``; return dropped partitions or rows."""
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            dropped = drop_partitions_before(connection, cutoff)
+            # ``ON DELETE CASCADE`` takes the default partitions of the child tables along.
+            connection.execute(
+                text("DELETE FROM events_default WHERE occurred_at < :cutoff"), {"cutoff": cutoff}
+            )
+        return len(dropped)
+
+    deleted = 0
+    while True:
+        with engine.begin() as connection:
+            ids = list(
+                connection.execute(
+                    select(Event.id).where(Event.occurred_at < cutoff).limit(batch_size)
+                ).scalars()
+            )
+            if not ids:
+                return deleted
+            # SQLite only cascades with ``PRAGMA foreign_keys``; remove the children explicitly.
+            connection.execute(delete(EventTag).where(EventTag.event_id.in_(ids)))
+            connection.execute(delete(EventMetric).where(EventMetric.event_id.in_(ids)))
+            connection.execute(delete(Event).where(Event.id.in_(ids)))
+        deleted += len(ids)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Maintain event partitions and retention.")
+    parser.add_argument("--ahead", type=int, default=PARTITIONS_AHEAD, help="future partitions")
+    parser.add_argument("--retain-days", type=int, help="drop events older than this")
+    args = parser.parse_args(argv)
+    engine = get_engine()
+    created = ensure_partitions(engine, ahead=args.ahead)
+    print(f"created {len(created)} partition(s)")
+    if args.retain_days is not None:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=args.retain_days)
+        removed = apply_retention(engine, cutoff)
+        unit = "partition(s)" if engine.dialect.name == "postgresql" else "event(s)"
+        print(f"removed {removed} {unit} older than {cutoff:%Y-%m-%d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Recompute every metric baseline from the stored event metrics.
+
+Reads ``event_metrics`` with their events' entity once, in ``occurred_at`` order, and
+computes the statistics ingest maintains incrementally (see ``app.ingest.baselines``) for
+all keys at once with numpy, then replaces the ``baselines`` table in one transaction.
+Use it after a bulk import, after changing ``BASELINE_ALPHA``, or to repair baselines
+written by several processes. Archived events are not included.
+
+    python -m app.jobs.rebuild_baselines [--alpha 0.05]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from collections.abc import Sequence
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.db import Baseline, Event, EventMetric
+from app.db.session import SessionLocal, get_engine
+from app.ingest.baselines import (
+    DEFAULT_ALPHA,
+    FLUSH_BATCH,
+    Key,
+    Stats,
+    Z_SUFFIX,
+    get_baseline_store,
+    write_baselines,
+)
+from app.timeutil import utc
+
+
+def compute_baselines(
+    keys: Sequence[Key], values: np.ndarray, occurred_at: Sequence[datetime], alpha: float
+) -> dict[Key, Stats]:
+    """Baselines for observations already sorted by ``occurred_at`` within each key.
+
+    The exponentially weighted statistics use the closed form of the ingest recursion:
+    value ``i`` of ``n`` gets weight ``a_i * prod(1 - a_j for j in i+1..n)`` with
+    ``a_j = max(alpha, 1/j)``; the weights sum to one.
+    """
+
+    if not keys:
+        return {}
+    labels = np.array(["\x1f".join(key) for key in keys])
+    _, first, group = np.unique(labels, return_index=True, return_inverse=True)
+    order = np.argsort(group, kind="stable")  # keeps the time order within each key
+    group, values = group[order], values[order]
+    counts = np.bincount(group)
+    starts = np.concatenate((np.zeros(1, dtype=counts.dtype), np.cumsum(counts)[:-1]))
+    position = np.arange(len(group)) - starts[group] + 1  # 1-based within the key
+
+    mean = np.bincount(group, weights=values) / counts
+    m2 = np.bincount(group, weights=(values - mean[group]) ** 2)
+
+    steps = np.arange(1, counts.max() + 1, dtype=float)
+    rates = np.maximum(alpha, 1 / steps)
+    # log of prod(1 - a_j for j in 2..k); a_1 = 1, so the product starts at j = 2.
+    survival = np.concatenate(([0.0], np.cumsum(np.log1p(-rates[1:]))))
+    weights = rates[position - 1] * np.exp(survival[counts[group] - 1] - survival[position - 1])
+    ewm_mean = np.bincount(group, weights=weights * values)
+    ewm_var = np.bincount(group, weights=weights * (values - ewm_mean[group]) ** 2)
+
+    last = order[starts + counts - 1].tolist()
+    return {
+        keys[first[index]]: Stats(
+            count=int(counts[index]),
+            mean=float(mean[index]),
+            m2=float(m2[index]),
+            ewm_mean=float(ewm_mean[index]),
+            ewm_var=float(ewm_var[index]),
+            last_at=utc(occurred_at[last[index]]),
+        )
+        for index in range(len(counts))
+    }
+
+
+def rebuild_baselines(session: Session, alpha: float = DEFAULT_ALPHA) -> int:
+    """Replace ``baselines`` with values recomputed from history; return the key count."""
+
+    stmt = (
+        select(
+            Event.entity_type,
+            Event.entity_id,
+            EventMetric.name,
+            EventMetric.value,
+            Event.occurred_at,
+        )
+        .join(Event, Event.id == EventMetric.event_id)
+        .where(~EventMetric.name.endswith(Z_SUFFIX, autoescape=True))
+        .order_by(Event.occurred_at, Event.id)
+    )
+    keys: list[Key] = []
+    values: list[float] = []
+    occurred_at: list[datetime] = []
+    for entity_type, entity_id, name, value, at in session.execute(
+        stmt.execution_options(yield_per=10_000)
+    ):
+        keys.append((entity_type, entity_id, name))
+        values.append(value)
+        occurred_at.append(at)
+    stats = compute_baselines(keys, np.asarray(values, dtype=float), occurred_at, alpha)
+
+    connection = session.connection()
+    connection.execute(delete(Baseline))
+    items = list(stats.items())
+    for start in range(0, len(items), FLUSH_BATCH):
+        write_baselines(connection, dict(items[start : start + FLUSH_BATCH]))
+    session.commit()
+    store = get_baseline_store(session)
+    if store is not None:
+        store.clear()
+    return len(stats)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Recompute metric baselines from history.")
+    parser.add_argument(
+        "--alpha", type=float, default=float(os.getenv("BASELINE_ALPHA", DEFAULT_ALPHA))
+    )
+    args = parser.parse_args(argv)
+    get_engine()
+    with SessionLocal() as session:
+        rebuilt = rebuild_baselines(session, alpha=args.alpha)
+    print(f"rebuilt {rebuilt} baseline(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Repair drift in the denormalized incident counters.
+
+Ingest keeps ``event_count``, ``first_event_at``, ``last_event_at``, ``sources`` and
+``tag_counts`` up to date incrementally; this job recomputes them from ``events`` plus
+the archived segments that may hold the incident's older events, and fixes any incident
+whose stored values disagree (manual edits, deleted events, crashes between writes).
+Only segments whose time range overlaps an incident's events are read.
+
+    python -m app.jobs.reconcile_incidents [--batch-size 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+import pyarrow.compute as pc
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.archive.segments import decode_segment
+from app.archive.store import ObjectStore, get_object_store
+from app.db import ArchiveSegment, Event, EventTag, Incident
+from app.db.session import SessionLocal, get_engine
+
+
+def reconcile_incident_counters(
+    session: Session, incident_ids: Sequence[UUID], store: ObjectStore | None = None
+) -> int:
+    """Recompute counters for ``incident_ids``; return how many incidents were repaired."""
+
+    if not incident_ids:
+        return 0
+    expected: dict[UUID, dict[str, Any]] = {
+        incident_id: {
+            "event_count": 0,
+            "first_event_at": None,
+            "last_event_at": None,
+            "sources": [],
+            "tag_counts": {},
+        }
+        for incident_id in incident_ids
+    }
+    for incident_id, count, first, last in session.execute(
+        select(
+            Event.incident_id,
+            func.count(Event.id),
+            func.min(Event.occurred_at),
+            func.max(Event.occurred_at),
+        )
+        .where(Event.incident_id.in_(incident_ids))
+        .group_by(Event.incident_id)
+    ):
+        expected[incident_id].update(event_count=count, first_event_at=first, last_event_at=last)
+    for incident_id, source in session.execute(
+        select(Event.incident_id, Event.source)
+        .where(Event.incident_id.in_(incident_ids))
+        .group_by(Event.incident_id, Event.source)
+        .order_by(Event.source)
+    ):
+        expected[incident_id]["sources"].append(source)
+    for incident_id, tag, count in session.execute(
+        select(Event.incident_id, EventTag.value, func.count(EventTag.id))
+        .join(EventTag, EventTag.event_id == Event.id)
+        .where(Event.incident_id.in_(incident_ids))
+        .group_by(Event.incident_id, EventTag.value)
+    ):
+        expected[incident_id]["tag_counts"][tag] = count
+
+    incidents = list(
+        session.execute(select(Incident).where(Incident.id.in_(incident_ids))).scalars()
+    )
+    _add_archived(session, store or get_object_store(), incidents, expected)
+
+    repaired = 0
+    for incident in incidents:
+        values = expected[incident.id]
+        if values["last_event_at"] is None:
+            # Incidents created without events keep their manually set timeline.
+            values["last_event_at"] = incident.last_event_at
+        drifted = False
+        for name, value in values.items():
+            current = getattr(incident, name)
+            if isinstance(value, datetime) and isinstance(current, datetime):
+                same = _to_utc(value) == _to_utc(current)
+            else:
+                same = value == current
+            if not same:
+                setattr(incident, name, value)
+                drifted = True
+        repaired += drifted
+    return repaired
+
+
+def _add_archived(
+    session: Session,
+    store: ObjectStore,
+    incidents: list[Incident],
+    expected: dict[UUID, dict[str, Any]],
+) -> None:
+    """Fold the incidents' archived events into ``expected``.
+
+    An incident's archived events occurred before its oldest hot event, so only segments
+    overlapping the span from its stored ``first_event_at`` to that event are read.
+    """
+
+    windows: dict[UUID, tuple[datetime, datetime]] = {}
+    for incident in incidents:
+        bounds = [
+            _to_utc(value)
+            for value in (
+                incident.first_event_at,
+                incident.last_event_at,
+                expected[incident.id]["first_event_at"],
+            )
+            if value is not None
+        ]
+        if bounds:
+            windows[incident.id] = (min(bounds), max(bounds))
+    if not windows:
+        return
+    lower = min(start for start, _ in windows.values())
+    upper = max(end for _, end in windows.values())
+    segments = session.execute(
+        select(ArchiveSegment)
+        .where(ArchiveSegment.max_occurred_at >= lower, ArchiveSegment.min_occurred_at <= upper)
+        .order_by(ArchiveSegment.min_occurred_at)
+    ).scalars()
+    for segment in segments:
+        start, end = _to_utc(segment.min_occurred_at), _to_utc(segment.max_occurred_at)
+        ids = [
+            str(incident_id)
+            for incident_id, (first, last) in windows.items()
+            if start <= last and end >= first
+        ]
+        if not ids:
+            continue
+        where = pc.field("incident_id").isin(ids)
+        for record in decode_segment(store.get(segment.key), where):
+            values = expected[record["incident_id"]]
+            occurred_at = _to_utc(record["occurred_at"])
+            values["event_count"] += 1
+            first, last = values["first_event_at"], values["last_event_at"]
+            if first is None or occurred_at < _to_utc(first):
+                values["first_event_at"] = occurred_at
+            if last is None or occurred_at > _to_utc(last):
+                values["last_event_at"] = occurred_at
+            if record["source"] not in values["sources"]:
+                values["sources"] = sorted([*values["sources"], record["source"]])
+            for tag in dict.fromkeys(record["tags"]):
+                values["tag_counts"][tag] = values["tag_counts"].get(tag, 0) + 1
+
+
+def reconcile_all(session: Session, batch_size: int = 500) -> int:
+    """Walk every incident in id order, committing after each batch."""
+
+    repaired = 0
+    after: UUID | None = None
+    while True:
+        stmt = select(Incident.id).order_by(Incident.id).limit(batch_size)
+        if after is not None:
+            stmt = stmt.where(Incident.id > after)
+        ids = list(session.execute(stmt).scalars())
+        if not ids:
+            return repaired
+        repaired += reconcile_incident_counters(session, ids)
+        session.commit()
+        after = ids[-1]
+
+
+def _to_utc(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Repair denormalized incident counters.")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args(argv)
+    get_engine()
+    with SessionLocal() as session:
+        repaired = reconcile_all(session, batch_size=args.batch_size)
+    print(f"repaired {repaired} incident(s)")
+
+
+if __name__ == "__main__":
+    main()
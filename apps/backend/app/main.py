@@ -1,12 +1,39 @@
 """FastAPI application entry point."""
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.live import hub
+from app.api.routes import digests, events, health, incidents, metrics, scoring
+from app.db.partitions import ensure_partitions
+from app.db.session import get_engine
+from app.ingest.baselines import flush_baselines
+from app.ingest.correlation_index import index_mode, warm_correlation_index
+from app.ingest.digests import flush_digests
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    ensure_partitions(get_engine())
+    if index_mode() == "eager":
+        warm_correlation_index(get_engine())
+    await hub.start()
+    try:
+        yield
+    finally:
+        await hub.stop()
+        await run_in_threadpool(flush_baselines)
+        await run_in_threadpool(flush_digests)
 
-from app.api.routes import events, health, incidents, scoring
 
-app = FastAPI(title="signal-os API", version="0.1.0")
+app = FastAPI(title="signal-os API", version="0.1.0", lifespan=lifespan)
 
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(scoring.router, prefix="/scoring", tags=["scoring"])
 app.include_router(events.router, prefix="/events", tags=["events"])
 app.include_router(incidents.router, prefix="/incidents", tags=["incidents"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+app.include_router(digests.router, prefix="/digests", tags=["digests"])
@@ -0,0 +1,103 @@
+"""Platt scaling: map raw scores to probabilities with ``1 / (1 + exp(a * score + b))``.
+
+``fit_platt`` fits one sigmoid per group (source) for all groups at once with NumPy. It
+runs Newton's method on every group in lockstep, halving each group's step until its
+loss decreases. Labels are smoothed as in Platt (1999), so a source whose feedback is
+all positive or all negative still gets finite parameters.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+MAX_ITERATIONS = 100
+MAX_HALVINGS = 30
+TOLERANCE = 1e-10
+RIDGE = 1e-12
+
+
+@dataclass(frozen=True)
+class PlattFit:
+    a: np.ndarray
+    b: np.ndarray
+    samples: np.ndarray
+    positives: np.ndarray
+
+
+def calibrate(score_value: float, a: float, b: float) -> float:
+    z = a * score_value + b
+    if z >= 0:
+        return math.exp(-z) / (1.0 + math.exp(-z))
+    return 1.0 / (1.0 + math.exp(z))
+
+
+def fit_platt(groups: np.ndarray, scores: np.ndarray, labels: np.ndarray) -> PlattFit:
+    """Fit ``a`` and ``b`` per group; ``groups`` are integers ``0..k-1``."""
+
+    k = int(groups.max()) + 1 if len(groups) else 0
+    samples = np.bincount(groups, minlength=k)
+    positives = np.bincount(groups, weights=labels.astype(float), minlength=k)
+    negatives = samples - positives
+    high = (positives + 1) / (positives + 2)
+    low = 1 / (negatives + 2)
+    targets = np.where(labels, high[groups], low[groups])
+
+    a = np.zeros(k)
+    b = np.log((negatives + 1) / (positives + 1))
+    loss = _loss(groups, scores, targets, a, b, k)
+    for _ in range(MAX_ITERATIONS):
+        p = _sigmoid(a[groups] * scores + b[groups])
+        residual = targets - p
+        weight = p * (1 - p)
+        grad_a = np.bincount(groups, weights=residual * scores, minlength=k)
+        grad_b = np.bincount(groups, weights=residual, minlength=k)
+        h_aa = np.bincount(groups, weights=weight * scores * scores, minlength=k) + RIDGE
+        h_ab = np.bincount(groups, weights=weight * scores, minlength=k)
+        h_bb = np.bincount(groups, weights=weight, minlength=k) + RIDGE
+        det = h_aa * h_bb - h_ab * h_ab
+        step_a = (h_bb * grad_a - h_ab * grad_b) / det
+        step_b = (h_aa * grad_b - h_ab * grad_a) / det
+
+        size = np.ones(k)
+        pending = np.ones(k, dtype=bool)
+        new_a, new_b, new_loss = a.copy(), b.copy(), loss.copy()
+        for _ in range(MAX_HALVINGS):
+            trial_a = np.where(pending, a - size * step_a, new_a)
+            trial_b = np.where(pending, b - size * step_b, new_b)
+            trial_loss = _loss(groups, scores, targets, trial_a, trial_b, k)
+            improved = pending & (trial_loss <= loss)
+            new_a[improved], new_b[improved] = trial_a[improved], trial_b[improved]
+            new_loss[improved] = trial_loss[improved]
+            pending &= ~improved
+            if not pending.any():
+                break
+            size[pending] /= 2
+        converged = np.abs(loss - new_loss) <= TOLERANCE * np.maximum(1.0, np.abs(loss))
+        a, b, loss = new_a, new_b, new_loss
+        if converged.all():
+            break
+    return PlattFit(a=a, b=b, samples=samples, positives=positives.astype(int))
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    """``1 / (1 + exp(z))`` without overflow."""
+
+    return np.exp(-np.logaddexp(0.0, z))
+
+
+def _loss(
+    groups: np.ndarray,
+    scores: np.ndarray,
+    targets: np.ndarray,
+    a: np.ndarray,
+    b: np.ndarray,
+    k: int,
+) -> np.ndarray:
+    """Cross-entropy per group between ``targets`` and the fitted probabilities."""
+
+    z = a[groups] * scores + b[groups]
+    # -t*log(p) - (1-t)*log(1-p) with p = 1/(1+e^z): log(1+e^z) - (1-t)*z
+    return np.bincount(groups, weights=np.logaddexp(0.0, z) - (1 - targets) * z, minlength=k)
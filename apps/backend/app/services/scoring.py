@@ -1,9 +1,132 @@
-from typing import Dict
-
-def score(f: Dict[str, float]) -> float:
-    impact = max(f.get("impact_finance", 0.0), f.get("impact_health", 0.0), f.get("impact_news", 0.0))
-    actionability = f.get("actionability", 0.5)
-    urgency = f.get("urgency", 0.2)
-    relevance = f.get("personal_relevance", 0.5)
-    s = 0.4 * impact + 0.25 * actionability + 0.2 * urgency + 0.15 * relevance
-    return max(0.0, min(1.0, s))
+"""Scoring models: the weighted sum of explain factors that turns features into a score.
+
+A model definition names, per factor, the features it takes the maximum of, the value
+used when none is present, and an optional cap, plus the factor weights. ``compile``
+validates a definition once and precomputes the weight vector; the builtin model
+(``DEFAULT_MODEL``) is the v1 heuristic. Versions stored in the registry are loaded by
+``app.ingest.scoring_models``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+FACTORS = ("impact", "actionability", "urgency", "personal_relevance")
+# Every feature ``feature_vector`` can emit.
+FEATURES = (
+    "impact_finance",
+    "impact_health",
+    "impact_news",
+    "urgency",
+    "actionability",
+    "personal_relevance",
+)
+
+DEFAULT_DEFINITION: dict[str, Any] = {
+    "weights": {"impact": 0.4, "actionability": 0.25, "urgency": 0.2, "personal_relevance": 0.15},
+    "factors": {
+        "impact": {
+            "features": ["impact_finance", "impact_health", "impact_news"],
+            "default": 0.0,
+        },
+        "actionability": {"features": ["actionability"], "default": 0.5},
+        "urgency": {"features": ["urgency"], "default": 0.2},
+        "personal_relevance": {"features": ["personal_relevance"], "default": 0.5},
+    },
+}
+
+
+@dataclass(frozen=True)
+class ScoringModel:
+    """A compiled model; factors are listed in ``FACTORS`` order."""
+
+    version: str
+    weights: tuple[float, ...]
+    features: tuple[tuple[str, ...], ...]
+    defaults: tuple[float, ...]
+    caps: tuple[float | None, ...]
+    weight_vector: np.ndarray = field(repr=False, compare=False)
+
+    @classmethod
+    def compile(cls, version: str, definition: Mapping[str, Any]) -> ScoringModel:
+        """Validate ``definition``; factors it leaves out keep the builtin definition.
+
+        Raises ``ValueError`` for unknown factors or features and non-numeric values.
+        """
+
+        weights = definition.get("weights") or {}
+        factors = definition.get("factors") or {}
+        caps = definition.get("caps") or {}
+        unknown = (set(weights) | set(factors) | set(caps)) - set(FACTORS)
+        if unknown:
+            raise ValueError(f"unknown factors: {', '.join(sorted(unknown))}")
+        if set(weights) != set(FACTORS):
+            raise ValueError(f"weights must cover every factor: {', '.join(FACTORS)}")
+        specs = [factors.get(name) or DEFAULT_DEFINITION["factors"][name] for name in FACTORS]
+        for spec in specs:
+            if not spec.get("features") or set(spec["features"]) - set(FEATURES):
+                raise ValueError(f"factor features must be among: {', '.join(FEATURES)}")
+        try:
+            weight_values = tuple(float(weights[name]) for name in FACTORS)
+            defaults = tuple(float(spec.get("default", 0.0)) for spec in specs)
+            cap_values = tuple(
+                None if caps.get(name) is None else float(caps[name]) for name in FACTORS
+            )
+        except (TypeError, ValueError) as exc:
+            raise ValueError("weights, defaults and caps must be numbers") from exc
+        return cls(
+            version=version,
+            weights=weight_values,
+            features=tuple(tuple(spec["features"]) for spec in specs),
+            defaults=defaults,
+            caps=cap_values,
+            weight_vector=np.array(weight_values),
+        )
+
+    def definition(self) -> dict[str, Any]:
+        return {
+            "weights": dict(zip(FACTORS, self.weights)),
+            "factors": {
+                name: {"features": list(features), "default": default}
+                for name, features, default in zip(FACTORS, self.features, self.defaults)
+            },
+            "caps": {name: cap for name, cap in zip(FACTORS, self.caps) if cap is not None},
+        }
+
+    def factors(self, f: Mapping[str, float]) -> list[float]:
+        values = []
+        for features, default, cap in zip(self.features, self.defaults, self.caps):
+            value = max(f.get(name, default) for name in features)
+            values.append(value if cap is None else min(cap, value))
+        return values
+
+    def score(self, f: Mapping[str, float]) -> float:
+        s = 0.0
+        for weight, value in zip(self.weights, self.factors(f)):
+            s = s + weight * value
+        return max(0.0, min(1.0, s))
+
+    def explain(self, f: Mapping[str, float], score_value: float) -> dict[str, Any]:
+        """Factor contributions and the top factor, as stored in ``explain``."""
+
+        contributions = {
+            name: round(value * weight, 6)
+            for name, value, weight in zip(FACTORS, self.factors(f), self.weights)
+        }
+        top_factor = max(contributions.items(), key=lambda item: item[1])[0]
+        return {
+            "contributions": contributions,
+            "top_factor": top_factor,
+            "score": round(score_value, 6),
+        }
+
+
+DEFAULT_MODEL = ScoringModel.compile("builtin-v1", DEFAULT_DEFINITION)
+
+
+def score(f: Mapping[str, float], model: ScoringModel = DEFAULT_MODEL) -> float:
+    return model.score(f)
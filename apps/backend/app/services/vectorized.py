@@ -0,0 +1,161 @@
+"""Columnar counterpart of ``feature_vector`` + ``score`` for many events at once.
+
+Inputs are gathered into float64 columns once, each event type fills its feature columns
+through a boolean mask, and the score is accumulated from the weight vector term by term
+in the scalar formula's order, so every value is bit-for-bit what the per-event path
+returns.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+from app.services.scoring import DEFAULT_MODEL, FACTORS, FEATURES, ScoringModel
+
+# Keys ``feature_vector`` emits per type, in its insertion order.
+_KEYS_BY_TYPE = {
+    "price_move": ("impact_finance", "urgency", "actionability", "personal_relevance"),
+    "health_anomaly": ("impact_health", "urgency", "actionability", "personal_relevance"),
+    "news": ("impact_news", "actionability", "urgency", "personal_relevance"),
+}
+_DEFAULT_KEYS = ("personal_relevance",)
+_COLUMN = {name: position for position, name in enumerate(FEATURES)}
+
+
+@dataclass
+class ScoreBatch:
+    """Features (``nan`` where the scalar dict has no key), scores and factor contributions."""
+
+    types: list[str | None]
+    features: np.ndarray
+    scores: np.ndarray
+    contributions: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def feature_dicts(self) -> Iterator[dict[str, float]]:
+        for row, event_type in zip(self.features.tolist(), self.types):
+            keys = _KEYS_BY_TYPE.get(event_type, _DEFAULT_KEYS)  # type: ignore[arg-type]
+            yield {key: row[_COLUMN[key]] for key in keys}
+
+    def explains(self) -> Iterator[dict[str, Any]]:
+        """Yield the same ``explain`` payload the scalar pipeline stores per event."""
+
+        contributions = round6(self.contributions)
+        top = [FACTORS[position] for position in contributions.argmax(axis=1).tolist()]
+        for row, top_factor, score_value in zip(
+            contributions.tolist(), top, round6(self.scores).tolist()
+        ):
+            yield {
+                "contributions": dict(zip(FACTORS, row)),
+                "top_factor": top_factor,
+                "score": score_value,
+            }
+
+
+def score_batch(
+    types: Sequence[str | None],
+    metrics: Sequence[Mapping[str, Any]],
+    contexts: Sequence[Mapping[str, Any]],
+    model: ScoringModel = DEFAULT_MODEL,
+) -> ScoreBatch:
+    """Compute features, scores and contributions for ``len(types)`` events."""
+
+    n = len(types)
+    kinds = np.array(types, dtype=object)
+    features = np.full((n, len(FEATURES)), np.nan)
+
+    def metric(name: str, default: float) -> np.ndarray:
+        return np.fromiter((float(m.get(name, default)) for m in metrics), float, n)
+
+    def flag(rows: Sequence[Mapping[str, Any]], name: str, default: bool) -> np.ndarray:
+        return np.fromiter((bool(row.get(name, default)) for row in rows), bool, n)
+
+    price = kinds == "price_move"
+    if price.any():
+        pct = metric("pct_change", 0.0)
+        fast = np.where(_has(metrics, "pct_change_5m"), metric("pct_change_5m", 0.0), pct)
+        exposure = np.fromiter(
+            (float(c.get("portfolio_exposure", 0.0)) for c in contexts), float, n
+        )
+        features[price, _COLUMN["impact_finance"]] = np.minimum(1.0, np.abs(pct) * exposure)[price]
+        features[price, _COLUMN["urgency"]] = np.minimum(1.0, np.abs(fast))[price]
+        features[price, _COLUMN["actionability"]] = np.where(
+            flag(contexts, "market_open", True), 1.0, 0.3
+        )[price]
+
+    health = kinds == "health_anomaly"
+    if health.any():
+        z = metric("rhr_z", 0.0)
+        persistent = np.trunc(metric("days_persistent", 0.0)) >= 3
+        features[health, _COLUMN["impact_health"]] = np.minimum(1.0, np.abs(z) / 3.0)[health]
+        features[health, _COLUMN["urgency"]] = np.where(persistent, 0.4, 0.2)[health]
+        features[health, _COLUMN["actionability"]] = 0.6
+
+    news = kinds == "news"
+    if news.any():
+        impact = metric("credibility", 0.3) * metric("topic_relevance", 0.3)
+        features[news, _COLUMN["impact_news"]] = impact[news]
+        features[news, _COLUMN["actionability"]] = np.where(
+            flag(metrics, "has_action", False), 0.5, 0.2
+        )[news]
+        features[news, _COLUMN["urgency"]] = metric("velocity", 0.2)[news]
+
+    features[:, _COLUMN["personal_relevance"]] = np.fromiter(
+        (float(c.get("personal_relevance", 0.5)) for c in contexts), float, n
+    )
+
+    contributions, scores = apply_model(model, features)
+    return ScoreBatch(list(types), features, scores, contributions)
+
+
+def apply_model(model: ScoringModel, features: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Factor contributions and clipped scores of ``model`` for a feature matrix."""
+
+    factors = np.column_stack(
+        [
+            _fill(features[:, [_COLUMN[name] for name in names]], default).max(axis=1)
+            for names, default in zip(model.features, model.defaults)
+        ]
+    )
+    for column, cap in enumerate(model.caps):
+        if cap is not None:
+            factors[:, column] = np.minimum(cap, factors[:, column])
+    contributions = factors * model.weight_vector
+    total = np.zeros(len(features))
+    for column in range(len(FACTORS)):
+        # Summed left to right, like the scalar formula; a dot product could round differently.
+        total = total + contributions[:, column]
+    return contributions, np.clip(total, 0.0, 1.0)
+
+
+def round6(values: np.ndarray) -> np.ndarray:
+    """``round(value, 6)`` elementwise, with Python's correctly rounded result.
+
+    ``rint(x * 1e6) / 1e6`` agrees with ``round`` unless the scaling error can move ``x``
+    across a rounding boundary, so values that land close to a half (or too large to scale
+    exactly) are rounded one at a time.
+    """
+
+    scaled = values * 1e6
+    rounded = np.rint(scaled) / 1e6
+    with np.errstate(invalid="ignore"):
+        ambiguous = (np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6) | (
+            np.abs(scaled) >= 2.0**52
+        )
+    for position in zip(*np.nonzero(ambiguous)):
+        rounded[position] = round(float(values[position]), 6)
+    return rounded
+
+
+def _has(rows: Sequence[Mapping[str, Any]], name: str) -> np.ndarray:
+    return np.fromiter((name in row for row in rows), bool, len(rows))
+
+
+def _fill(column: np.ndarray, default: float) -> np.ndarray:
+    return np.where(np.isnan(column), default, column)
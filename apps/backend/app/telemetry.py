@@ -0,0 +1,192 @@
+"""Prometheus metrics for the ingest pipeline and the database pool.
+
+Metric children are resolved once at import so the hot path only pays for a
+``perf_counter`` pair and a histogram observe. With ``PROMETHEUS_MULTIPROC_DIR`` set (it
+must exist and be emptied before the workers start), every uvicorn worker writes its
+samples to that directory and ``/metrics`` aggregates them, so any worker can answer a
+scrape.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.multiprocess import MultiProcessCollector
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry, QueuePool
+
+STAGES = ("features", "score", "explain", "score_batch", "shadow", "correlate", "flush", "commit")
+STAGE_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0
+)
+LAG_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0, 86400.0)
+
+PIPELINE_STAGE_SECONDS = Histogram(
+    "signalos_pipeline_stage_seconds",
+    "Time spent in each ingest pipeline stage.",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+INGEST_SECONDS = Histogram(
+    "signalos_ingest_seconds",
+    "End-to-end ingest time per request or stream batch.",
+    ["path"],
+    buckets=STAGE_BUCKETS,
+)
+INGESTED_EVENTS = Counter(
+    "signalos_ingested_events_total", "Events offered for ingest.", ["path", "outcome"]
+)
+CORRELATION_CANDIDATES = Histogram(
+    "signalos_correlation_candidates",
+    "Candidate events considered per correlation lookup.",
+    ["source"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250, 1000),
+)
+CORRELATION_DECISIONS = Counter(
+    "signalos_correlation_decisions_total",
+    "Correlation outcome per event (merged, new_incident, no_match, attached).",
+    ["outcome"],
+)
+INCIDENTS_CREATED = Counter("signalos_incidents_created_total", "Incidents opened by correlation.")
+RESPONSE_CACHE = Counter(
+    "signalos_response_cache_total",
+    "Listing cache lookups by route and outcome (hit, miss, bypass, error).",
+    ["route", "outcome"],
+)
+LIVE_MESSAGES = Counter(
+    "signalos_live_messages_total",
+    "Push feed messages by outcome (delivered, dropped, error).",
+    ["outcome"],
+)
+CONNECTOR_EVENTS = Counter(
+    "signalos_connector_events_total",
+    "Events emitted by each connector, by outcome (created, duplicate, invalid, failed).",
+    ["connector", "outcome"],
+)
+CONNECTOR_LAG_SECONDS = Histogram(
+    "signalos_connector_lag_seconds",
+    "Time from an event's occurred_at to the commit that stored it, per connector.",
+    ["connector"],
+    buckets=LAG_BUCKETS,
+)
+CONNECTOR_QUEUE_DEPTH = Gauge(
+    "signalos_connector_queue_depth",
+    "Events waiting in each connector's queue.",
+    ["connector"],
+    multiprocess_mode="livesum",
+)
+CONNECTOR_RESTARTS = Counter(
+    "signalos_connector_restarts_total",
+    "Connector runs that raised and were restarted.",
+    ["connector"],
+)
+POOL_CHECKOUT_SECONDS = Histogram(
+    "signalos_db_pool_checkout_seconds",
+    "Time spent waiting for a pooled database connection.",
+    buckets=(0.00001, 0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+_stages = {name: PIPELINE_STAGE_SECONDS.labels(stage=name) for name in STAGES}
+_decisions = {
+    outcome: CORRELATION_DECISIONS.labels(outcome=outcome)
+    for outcome in ("merged", "new_incident", "no_match", "attached")
+}
+_candidates = {
+    source: CORRELATION_CANDIDATES.labels(source=source) for source in ("index", "sql", "batch")
+}
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stages[name].observe(time.perf_counter() - start)
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    _stages[name].observe(seconds)
+
+
+def record_candidates(source: str, count: int) -> None:
+    _candidates[source].observe(count)
+
+
+def record_ingest(path: str, seconds: float, created: int, duplicates: int) -> None:
+    INGEST_SECONDS.labels(path=path).observe(seconds)
+    if created:
+        INGESTED_EVENTS.labels(path=path, outcome="created").inc(created)
+    if duplicates:
+        INGESTED_EVENTS.labels(path=path, outcome="duplicate").inc(duplicates)
+
+
+def record_decision(outcome: str) -> None:
+    _decisions[outcome].inc()
+    if outcome == "new_incident":
+        INCIDENTS_CREATED.inc()
+
+
+def record_cache(route: str, outcome: str) -> None:
+    RESPONSE_CACHE.labels(route=route, outcome=outcome).inc()
+
+
+def record_live(outcome: str) -> None:
+    LIVE_MESSAGES.labels(outcome=outcome).inc()
+
+
+def record_connector(connector: str, outcome: str, count: int) -> None:
+    if count:
+        CONNECTOR_EVENTS.labels(connector=connector, outcome=outcome).inc(count)
+
+
+def record_connector_lag(connector: str, lags: Iterable[float]) -> None:
+    child = CONNECTOR_LAG_SECONDS.labels(connector=connector)
+    for lag in lags:
+        child.observe(lag)
+
+
+def record_restart(connector: str) -> None:
+    CONNECTOR_RESTARTS.labels(connector=connector).inc()
+
+
+def queue_depth(connector: str) -> Gauge:
+    return CONNECTOR_QUEUE_DEPTH.labels(connector=connector)
+
+
+class _TimedCheckout:
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    """``QueuePool`` that records how long each checkout waited."""
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """``AsyncAdaptedQueuePool`` that records how long each checkout waited."""
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Serialize every metric, merged across worker processes when multiprocess is on."""
+
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
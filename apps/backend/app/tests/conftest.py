@@ -1,17 +1,26 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
+from collections.abc import AsyncIterator, Iterator
 
+import fakeredis
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
 
 from app.db import Base
-from app.db.session import get_session
+from app.db.redis import get_redis
+from app.db.session import get_async_session, get_session, get_session_factory
 from app.main import app
 
 
+@pytest.fixture(autouse=True)
+def _local_correlation_index(monkeypatch) -> None:
+    monkeypatch.setenv("CORRELATION_INDEX_SYNC", "off")  # tests ingest from one process
+
+
 @pytest.fixture()
 def api_client(tmp_path) -> Iterator[tuple[TestClient, sessionmaker[Session]]]:
     db_path = tmp_path / "api.sqlite"
@@ -20,6 +29,8 @@ def api_client(tmp_path) -> Iterator[tuple[TestClient, sessionmaker[Session]]]:
     )
     Base.metadata.create_all(engine)
     factory: sessionmaker[Session] = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async_factory = async_sessionmaker(bind=async_engine, expire_on_commit=False)
 
     def override_get_session() -> Iterator[Session]:
         session = factory()
@@ -28,10 +39,28 @@ def api_client(tmp_path) -> Iterator[tuple[TestClient, sessionmaker[Session]]]:
         finally:
             session.close()
 
+    async def override_get_async_session() -> AsyncIterator[AsyncSession]:
+        async with async_factory() as session:
+            yield session
+
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_async_session] = override_get_async_session
+    app.dependency_overrides[get_session_factory] = lambda: factory
     try:
         with TestClient(app) as client:
             yield client, factory
     finally:
         app.dependency_overrides.pop(get_session, None)
+        app.dependency_overrides.pop(get_async_session, None)
+        app.dependency_overrides.pop(get_session_factory, None)
         engine.dispose()
+
+
+@pytest.fixture()
+def redis_client(api_client) -> Iterator[fakeredis.FakeRedis]:
+    client = fakeredis.FakeRedis(decode_responses=True)
+    app.dependency_overrides[get_redis] = lambda: client
+    try:
+        yield client
+    finally:
+        app.dependency_overrides.pop(get_redis, None)
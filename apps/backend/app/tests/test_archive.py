@@ -0,0 +1,165 @@
+import gzip
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.api.export import export_lines
+from app.api.projection import EVENT_FIELDS, projected_columns
+from app.api.routes import events as events_routes
+from app.archive import store as archive_store
+from app.archive.archiver import archive_events
+from app.archive.query import EventFilters
+from app.db import ArchiveSegment, Event, EventTag
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+@pytest.fixture()
+def archive_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path / "archive"))
+    return tmp_path / "archive"
+
+
+def _post(client, days_ago: float, index: int, source: str = "rss", tags=("news",)) -> dict:
+    occurred_at = NOW - timedelta(days=days_ago)
+    response = client.post(
+        "/events/",
+        json={
+            "source": source,
+            "occurred_at": occurred_at.isoformat(),
+            "received_at": occurred_at.isoformat(),
+            "entity": {"type": "topic", "id": f"t-{index}"},
+            "type": "news",
+            "title": f"Headline {index}",
+            "tags": list(tags),
+            "metrics": [{"name": "credibility", "value": 0.5 + index / 100}],
+            "extras": {"raw": index},
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _walk(client, params: dict) -> list[dict]:
+    items, cursor = [], None
+    while True:
+        query = {**params, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/events/", params=query).json()
+        items.extend(page["items"])
+        cursor = page.get("next_cursor")
+        if cursor is None:
+            return items
+
+
+def test_archived_events_stay_listed(api_client, archive_dir) -> None:
+    client, factory = api_client
+    for index, days_ago in enumerate((200, 150, 150, 120, 5, 1)):
+        _post(client, days_ago, index, source="fitbit" if index == 2 else "rss")
+    before = client.get("/events/", params={"limit": 100}).json()["items"]
+
+    with factory() as session:
+        result = archive_events(session, NOW - timedelta(days=90))
+        assert (result.events, result.segments) == (4, 4)
+        assert session.execute(select(func.count(Event.id))).scalar() == 2
+        assert session.execute(select(func.count(EventTag.id))).scalar() == 2
+        keys = session.execute(select(ArchiveSegment.key)).scalars().all()
+    assert all((archive_dir / key).is_file() for key in keys)
+    assert any("/source=fitbit/" in key and key.startswith("events/date=") for key in keys)
+
+    after = client.get("/events/", params={"limit": 100}).json()["items"]
+    assert [item["id"] for item in after] == [item["id"] for item in before]
+    assert after[-1]["metrics"] == before[-1]["metrics"]
+    assert after[-1]["extras"] == {"raw": 0}
+    assert [item["id"] for item in _walk(client, {"limit": 2})] == [item["id"] for item in before]
+
+    old = {"occurred_before": (NOW - timedelta(days=100)).isoformat(), "include_total": "true"}
+    page = client.get("/events/", params={**old, "source": "rss"}).json()
+    assert page["total"] == 3
+    assert [item["title"] for item in page["items"]] == ["Headline 3", "Headline 1", "Headline 0"]
+    assert client.get("/events/", params={"include_total": "true"}).json()["total"] == 6
+    last = client.get("/events/", params={"offset": 5, "limit": 1}).json()["items"]
+    assert last[0]["title"] == "Headline 0"
+
+
+def test_recent_pages_do_not_read_the_archive(api_client, archive_dir, monkeypatch) -> None:
+    client, factory = api_client
+    for index, days_ago in enumerate((200, 3, 2, 1)):
+        _post(client, days_ago, index)
+    with factory() as session:
+        archive_events(session, NOW - timedelta(days=90))
+
+    def refuse(self, key: str) -> bytes:
+        raise AssertionError(f"read {key}")
+
+    async def no_lookup(*args, **kwargs):
+        raise AssertionError("queried archive_segments")
+
+    monkeypatch.setattr(archive_store.LocalObjectStore, "get", refuse)
+    monkeypatch.setattr(events_routes, "find_segments", no_lookup)
+    page = client.get("/events/", params={"limit": 2}).json()
+    assert [item["title"] for item in page["items"]] == ["Headline 3", "Headline 2"]
+    assert page["next_cursor"]
+    recent = {"occurred_after": (NOW - timedelta(days=10)).isoformat(), "include_total": "true"}
+    assert client.get("/events/", params=recent).json()["total"] == 3
+
+
+def test_exact_totals_count_whole_segments_from_metadata(api_client, archive_dir, monkeypatch):
+    client, factory = api_client
+    for index, days_ago in enumerate((200, 150, 150, 120, 5, 1)):
+        _post(client, days_ago, index, tags=("news", "even" if index % 2 == 0 else "odd"))
+    with factory() as session:
+        archive_events(session, NOW - timedelta(days=90))
+    read: list[str] = []
+    get = archive_store.LocalObjectStore.get
+
+    def recording(self, key: str) -> bytes:
+        read.append(key)
+        return get(self, key)
+
+    monkeypatch.setattr(archive_store.LocalObjectStore, "get", recording)
+    page = client.get("/events/", params={"limit": 1, "include_total": "true"}).json()
+    assert (page["total"], read) == (6, [])
+    tagged = client.get("/events/", params={"limit": 1, "include_total": "true", "tag": "even"})
+    assert tagged.json()["total"] == 3  # read from the segments the tag filter cuts through
+
+
+def test_sparse_fields_cover_archived_events(api_client, archive_dir) -> None:
+    client, factory = api_client
+    for index, days_ago in enumerate((200, 120, 1)):
+        _post(client, days_ago, index)
+    full = client.get("/events/").json()["items"]
+    with factory() as session:
+        archive_events(session, NOW - timedelta(days=90))
+
+    params = {"fields": "title,tags,metrics,extras", "limit": 2}
+    items = _walk(client, params)
+    assert items == [
+        {key: item[key] for key in ("title", "tags", "metrics", "extras")} for item in full
+    ]
+
+
+def test_export_streams_archived_and_hot_events_oldest_first(api_client, archive_dir) -> None:
+    client, factory = api_client
+    for index, days_ago in enumerate((200, 150, 150, 120, 5, 1)):
+        _post(client, days_ago, index, tags=("news", "even" if index % 2 == 0 else "odd"))
+    with factory() as session:
+        archive_events(session, NOW - timedelta(days=90))
+    listed = client.get("/events/", params={"limit": 100}).json()["items"]
+
+    response = client.get("/events/export")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert exported == listed[::-1]
+
+    response = client.get("/events/export", params={"gzip": "true", "tag": "even"})
+    assert response.headers["content-type"] == "application/gzip"
+    lines = gzip.decompress(response.content).decode().splitlines()
+    titles = [json.loads(line)["title"] for line in lines]
+    assert titles == ["Headline 0", "Headline 2", "Headline 4"]
+
+    stmt = select(*projected_columns(EVENT_FIELDS)).order_by(Event.occurred_at, Event.id)
+    chunks = list(export_lines(factory, stmt, EventFilters(source="nowhere"), chunk_size=1))
+    assert len(chunks) == 2 and all(chunk.count(b"\n") == 1 for chunk in chunks)
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import select
+
+from app.db import Baseline
+from app.ingest.baselines import Stats, flush_baselines
+from app.jobs.rebuild_baselines import compute_baselines, rebuild_baselines
+
+BASE_TIME = datetime(2025, 10, 1, 7, tzinfo=timezone.utc)
+
+
+def _reading(day: int, rhr: float, user: str = "user-1") -> dict:
+    occurred_at = (BASE_TIME + timedelta(days=day)).isoformat()
+    return {
+        "source": "fitbit",
+        "occurred_at": occurred_at,
+        "received_at": occurred_at,
+        "entity": {"type": "user", "id": user},
+        "type": "health_anomaly",
+        "title": f"Resting HR day {day}",
+        "tags": ["health"],
+        "metrics": [{"name": "rhr", "value": rhr, "unit": "bpm"}],
+    }
+
+
+def _health(client, day: int, rhr: float, user: str = "user-1") -> dict:
+    response = client.post("/events/", json=_reading(day, rhr, user))
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_weighted_statistics_start_as_the_plain_mean_and_variance() -> None:
+    values = [60.0, 62.0, 59.0, 61.0]
+    stats = Stats()
+    for value in values:
+        stats.observe(value, BASE_TIME, alpha=0.1)
+    assert stats.count == 4
+    assert stats.mean == pytest.approx(np.mean(values))
+    assert stats.m2 / stats.count == pytest.approx(np.var(values))
+    assert (stats.ewm_mean, stats.ewm_var) == pytest.approx((np.mean(values), np.var(values)))
+
+
+def test_vectorized_rebuild_matches_the_incremental_updates() -> None:
+    rng = np.random.default_rng(7)
+    keys = [("user", f"user-{rng.integers(3)}", "rhr") for _ in range(200)]
+    values = rng.normal(60, 4, size=len(keys))
+    stamps = [BASE_TIME + timedelta(hours=index) for index in range(len(keys))]
+    expected: dict = {}
+    for key, value, at in zip(keys, values.tolist(), stamps):
+        expected.setdefault(key, Stats()).observe(value, at, alpha=0.05)
+
+    rebuilt = compute_baselines(keys, values, stamps, alpha=0.05)
+    assert rebuilt.keys() == expected.keys()
+    for key, stats in expected.items():
+        other = rebuilt[key]
+        assert other.count == stats.count and other.last_at == stats.last_at
+        for name in ("mean", "m2", "ewm_mean", "ewm_var"):
+            assert getattr(other, name) == pytest.approx(getattr(stats, name), rel=1e-9)
+
+
+def test_ingest_fills_z_scores_from_the_baseline(api_client, monkeypatch) -> None:
+    monkeypatch.setenv("BASELINE_FLUSH_SECONDS", "0")
+    client, factory = api_client
+    readings = [60.0, 62.0, 61.0, 59.0, 60.0, 61.0]
+    first = [_health(client, day, rhr) for day, rhr in enumerate(readings)]
+    assert all("baselines" not in item["explain"] for item in first[:5])
+    assert first[5]["explain"]["baselines"]["rhr"]["n"] == 5
+
+    spike = _health(client, 6, 75.0)
+    deviation = spike["explain"]["baselines"]["rhr"]
+    assert deviation["z"] > 5 and deviation["n"] == 6
+    assert spike["features"]["impact_health"] == 1.0
+    assert "baselines" not in _health(client, 0, 60.0, user="user-2")["explain"]
+
+    stmt = select(Baseline).where(Baseline.entity_id == "user-1")
+    with factory() as session:
+        stored = session.execute(stmt).scalar_one()
+        assert stored.count == 7
+        ingested = (stored.mean, stored.m2, stored.ewm_mean, stored.ewm_var)
+        assert rebuild_baselines(session) == 2
+        rebuilt = session.execute(stmt.execution_options(populate_existing=True)).scalar_one()
+        assert (rebuilt.mean, rebuilt.m2, rebuilt.ewm_mean, rebuilt.ewm_var) == pytest.approx(
+            ingested
+        )
+
+
+def test_baselines_flush_after_async_and_batch_ingest(api_client, monkeypatch) -> None:
+    monkeypatch.setenv("BASELINE_FLUSH_SECONDS", "3600")
+    client, factory = api_client
+    _health(client, 0, 60.0)  # the async route creates the store
+    occurred_at = (BASE_TIME + timedelta(days=1)).isoformat()
+    response = client.post(
+        "/events/batch",
+        json=[
+            {
+                "source": "fitbit",
+                "occurred_at": occurred_at,
+                "received_at": occurred_at,
+                "entity": {"type": "user", "id": user},
+                "type": "health_anomaly",
+                "title": "Resting HR day 1",
+                "metrics": [{"name": "rhr", "value": 61.0}],
+            }
+            for user in ("user-1", "user-2")
+        ],
+    )
+    assert response.status_code == 200
+
+    assert flush_baselines() == 2
+    with factory() as session:
+        counts = dict(session.execute(select(Baseline.entity_id, Baseline.count)).all())
+    assert counts == {"user-1": 2, "user-2": 1}
+
+
+def test_scoring_batch_reads_baselines_without_updating_them(api_client) -> None:
+    client, _ = api_client
+    for day, rhr in enumerate([60.0, 62.0, 61.0, 59.0, 60.0, 61.0]):
+        _health(client, day, rhr)
+
+    first = client.post("/scoring/batch", json=[_reading(6, 75.0)]).json()
+    again = client.post("/scoring/batch", json=[_reading(6, 75.0)]).json()
+    assert first["scores"] == again["scores"]
+    assert first["features"]["impact_health"] == [1.0]
+    assert _health(client, 6, 75.0)["score"] == first["scores"][0]
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.db import Calibrator, Feedback
+from app.jobs.fit_calibrators import fit_calibrators
+from app.services.calibration import calibrate, fit_platt
+
+BASE_TIME = datetime(2025, 10, 10, 9, tzinfo=timezone.utc)
+
+
+def _payload(minutes: int, source: str, pct: float) -> dict:
+    occurred_at = (BASE_TIME + timedelta(minutes=minutes)).isoformat()
+    return {
+        "source": source,
+        "occurred_at": occurred_at,
+        "received_at": occurred_at,
+        "entity": {"type": "portfolio", "id": f"acct-{minutes}"},
+        "type": "price_move",
+        "title": f"{source} move {minutes}",
+        "tags": [f"tag-{minutes}"],
+        "metrics": [{"name": "pct_change", "value": pct}],
+    }
+
+
+def _post(client, minutes: int, source: str, pct: float) -> dict:
+    response = client.post("/events/", json=_payload(minutes, source, pct))
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_fit_platt_recovers_per_source_sigmoids() -> None:
+    rng = np.random.default_rng(5)
+    groups = rng.integers(0, 3, size=30_000)
+    scores = rng.uniform(0, 1, size=len(groups))
+    true_a, true_b = np.array([-8.0, -3.0, -12.0]), np.array([4.0, 1.0, 3.0])
+    probability = 1 / (1 + np.exp(true_a[groups] * scores + true_b[groups]))
+    labels = rng.uniform(size=len(groups)) < probability
+
+    fit = fit_platt(groups, scores, labels)
+    assert fit.samples.sum() == len(groups)
+    assert fit.a == pytest.approx(true_a, rel=0.1)
+    assert fit.b == pytest.approx(true_b, rel=0.15, abs=0.2)
+    one_sided = fit_platt(np.zeros(10, dtype=int), np.linspace(0, 1, 10), np.ones(10, dtype=bool))
+    assert np.isfinite(one_sided.a).all() and np.isfinite(one_sided.b).all()
+    assert calibrate(0.5, -8.0, 4.0) == 0.5
+    assert calibrate(1e6, 1.0, 0.0) == 0.0
+
+
+def test_feedback_fits_calibrators_applied_at_ingest(api_client) -> None:
+    client, factory = api_client
+    events = [_post(client, minute, "alpaca", pct=minute / 10) for minute in range(12)]
+    for event in events:
+        outcome = "useful" if event["score"] > 0.6 else "not_useful"
+        response = client.post(f"/events/{event['id']}/feedback", json={"outcome": outcome})
+        assert response.status_code == 200
+        assert response.json()["source"] == "alpaca"
+    replaced = client.post(f"/events/{events[0]['id']}/feedback", json={"outcome": "took_action"})
+    assert replaced.json()["outcome"] == "took_action"
+    assert client.post(f"/events/{uuid4()}/feedback", json={"outcome": "useful"}).status_code == 404
+    _post(client, 20, "rss", pct=0.5)  # a source without enough feedback
+
+    with factory() as session:
+        assert session.query(Feedback).count() == 12
+        assert fit_calibrators(session, min_samples=20) is None
+        assert fit_calibrators(session, min_samples=5) == 1
+        calibrator = session.query(Calibrator).one()
+        assert (calibrator.source, calibrator.samples, calibrator.version) == ("alpaca", 12, 1)
+
+    calibrated = _post(client, 30, "alpaca", pct=0.7)
+    raw_score = calibrated["explain"]["calibration"]["raw_score"]
+    assert calibrated["explain"]["calibration"]["version"] == 1
+    assert raw_score == calibrated["explain"]["score"]
+    assert calibrated["score"] == pytest.approx(calibrate(raw_score, calibrator.a, calibrator.b))
+    assert "calibration" not in _post(client, 31, "rss", pct=0.7)["explain"]
+
+    payloads = [_payload(30, "alpaca", pct=0.7), _payload(31, "rss", pct=0.7)]
+    scored = client.post("/scoring/batch", json=payloads).json()
+    assert scored["calibration"] == 1
+    assert scored["scores"][0] == pytest.approx(calibrated["score"])
+    assert scored["raw_scores"][0] == pytest.approx(raw_score)
+    assert scored["scores"][1] == scored["raw_scores"][1]
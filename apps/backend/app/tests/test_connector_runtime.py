@@ -0,0 +1,202 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import func, select
+
+from app.db import Event
+from app.ingest import dedup, runtime
+from app.ingest.ces import Event as CESEvent
+from app.ingest.registry import Connector, create_connector, register, registered, unregister
+from app.ingest.runtime import ConnectorRuntime, to_event_create
+
+BASE_MS = int(datetime(2025, 10, 6, 9, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _ces(n: int, source: str = "feed", links: list[str] | None = None) -> CESEvent:
+    return CESEvent(
+        source=source,
+        occurred_at=BASE_MS + n * 60_000,
+        entity_type="asset",
+        entity_id=f"A{n}",
+        type="price_move",
+        title=f"A{n} moved",
+        tags=[f"t{n}"],
+        metrics={"price": float(n)},
+        links=links or [],
+    )
+
+
+class ListConnector(Connector):
+    def __init__(self, events: list[CESEvent], fail_after: int | None = None) -> None:
+        self.events = events
+        self.fail_after = fail_after
+        self.runs = 0
+        self.closed = 0
+        self.depths: list[int] = []
+
+    async def run(self, emit) -> None:
+        self.runs += 1
+        while self.events:
+            if len(self.events) == self.fail_after:
+                self.fail_after = None
+                raise ConnectionError("feed dropped")
+            await emit(self.events.pop(0))
+
+    async def close(self) -> None:
+        self.closed += 1
+
+
+def _count_events(session_factory) -> int:
+    with session_factory() as session:
+        return session.execute(select(func.count(Event.id))).scalar_one()
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _run(connector_runtime: ConnectorRuntime) -> None:
+    async def scenario() -> None:
+        await connector_runtime.start()
+        await asyncio.wait_for(connector_runtime.wait(), 10)
+        await connector_runtime.stop()
+
+    asyncio.run(scenario())
+
+
+def test_registry_builds_connectors_by_name() -> None:
+    register("test_list")(ListConnector)
+    try:
+        assert "test_list" in registered()
+        connector = create_connector("test_list", events=[_ces(1)])
+        assert isinstance(connector, ListConnector) and connector.name == "test_list"
+        with pytest.raises(ValueError):
+            register("test_list")(Connector)
+    finally:
+        unregister("test_list")
+    with pytest.raises(KeyError):
+        create_connector("test_list")
+
+
+def test_ces_events_convert_to_the_ingest_payload() -> None:
+    received_at = datetime(2025, 10, 6, 10, tzinfo=timezone.utc)
+    payload = to_event_create(_ces(3, links=["https://example.com/a"]), received_at)
+
+    assert payload.occurred_at == datetime(2025, 10, 6, 9, 3, tzinfo=timezone.utc)
+    assert payload.entity.id == "A3" and payload.body is None
+    assert [(metric.name, metric.value) for metric in payload.metrics] == [("price", 3.0)]
+    assert str(payload.links[0].href) == "https://example.com/a"
+    assert dedup.fingerprint_event(payload) == _ces(3).fingerprint()
+
+
+def test_runtime_micro_batches_connector_events(api_client, monkeypatch) -> None:
+    _, session_factory = api_client
+    batches: list[int] = []
+
+    def recording_insert(session, events):
+        batches.append(len(events))
+        return dedup.insert_events(session, events)
+
+    monkeypatch.setattr(runtime, "insert_events", recording_insert)
+    before = _sample("signalos_connector_lag_seconds_count", connector="batched")
+    connector = ListConnector([_ces(n) for n in range(25)])
+    connector.name = "batched"
+    connector_runtime = ConnectorRuntime(session_factory, batch_size=10, max_wait=0.05)
+    connector_runtime.add(connector)
+    _run(connector_runtime)
+
+    assert _count_events(session_factory) == 25
+    assert max(batches) <= 10 and sum(batches) == 25 and len(batches) < 25
+    [status] = connector_runtime.status()
+    assert (status.state, status.emitted, status.created, status.duplicates) == (
+        "finished",
+        25,
+        25,
+        0,
+    )
+    assert _sample("signalos_connector_lag_seconds_count", connector="batched") == before + 25
+    assert connector.closed == 1
+
+    replay = ConnectorRuntime(session_factory, batch_size=10, max_wait=0.05)
+    connector = ListConnector([_ces(n) for n in range(25)])
+    connector.name = "batched"
+    replay.add(connector)
+    _run(replay)
+    assert replay.status()[0].duplicates == 25
+    assert _count_events(session_factory) == 25
+
+
+def test_full_queue_blocks_the_connector(api_client, monkeypatch) -> None:
+    _, session_factory = api_client
+
+    def slow_insert(session, events):
+        time.sleep(0.02)
+        return dedup.insert_events(session, events)
+
+    monkeypatch.setattr(runtime, "insert_events", slow_insert)
+    connector_runtime = ConnectorRuntime(session_factory, batch_size=2, max_wait=0, queue_size=2)
+
+    class Probe(ListConnector):
+        async def run(self, emit) -> None:
+            for event in self.events:
+                await emit(event)
+                self.depths.append(slot.queue.qsize())
+
+    connector = Probe([_ces(n) for n in range(12)])
+    connector.name = "probe"
+    connector_runtime.add(connector)
+    slot = connector_runtime._slots["probe"]
+    _run(connector_runtime)
+
+    assert max(connector.depths) <= 2
+    assert _count_events(session_factory) == 12
+
+
+def test_failed_connector_restarts_and_invalid_events_are_dropped(
+    api_client, monkeypatch
+) -> None:
+    _, session_factory = api_client
+    monkeypatch.setattr(runtime, "RESTART_SECONDS", 0.0)
+    events = [_ces(0), _ces(1, links=["not a url"]), _ces(2), _ces(3)]
+    connector = ListConnector(events, fail_after=2)  # raises with two events left
+    connector.name = "flaky"
+    connector_runtime = ConnectorRuntime(session_factory, batch_size=10, max_wait=0.01)
+    connector_runtime.add(connector)
+    _run(connector_runtime)
+
+    [status] = connector_runtime.status()
+    assert (status.state, status.restarts, status.invalid, status.created) == ("finished", 1, 1, 3)
+    assert status.last_error is not None and "feed dropped" in status.last_error
+    assert connector.runs == 2 and connector.closed == 2
+    assert _count_events(session_factory) == 3
+
+
+def test_stop_stores_queued_events_of_running_connectors(api_client) -> None:
+    _, session_factory = api_client
+
+    class Endless(Connector):
+        async def run(self, emit) -> None:
+            n = 0
+            while True:
+                await emit(_ces(n, source="endless"))
+                n += 1
+                if n % 5 == 0:
+                    await asyncio.sleep(0.01)
+
+    connector = Endless()
+    connector.name = "endless"
+    connector_runtime = ConnectorRuntime(session_factory, batch_size=50, max_wait=0.01)
+    connector_runtime.add(connector)
+
+    async def scenario() -> None:
+        await connector_runtime.start()
+        await asyncio.sleep(0.1)
+        await connector_runtime.stop()
+
+    asyncio.run(scenario())
+    [status] = connector_runtime.status()
+    assert status.state == "stopped" and status.emitted > 0
+    assert status.created == status.emitted == _count_events(session_factory)
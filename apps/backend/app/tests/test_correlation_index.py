@@ -0,0 +1,166 @@
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+import fakeredis
+from sqlalchemy import create_engine
+
+from app.api.schemas import EventCreate
+from app.db import Base, Event
+from app.ingest.correlation_index import (
+    CorrelationIndex,
+    IndexEntry,
+    IndexSync,
+    get_correlation_index,
+)
+from app.ingest.pipeline import build_event_row, process_event
+
+MINUTE_MS = 60 * 1000
+
+
+class FakeClock:
+    def __init__(self, now_ms: int) -> None:
+        self.now_ms = now_ms
+
+    def __call__(self) -> float:
+        return self.now_ms / 1000
+
+
+def _entry(entity_id: str, occurred_ms: int, tags: tuple[str, ...] = ()) -> IndexEntry:
+    return IndexEntry(uuid.uuid4(), "coinbase", "asset", entity_id, occurred_ms, tags, 0.5, None)
+
+
+def _index(clock: FakeClock) -> CorrelationIndex:
+    index = CorrelationIndex(lateness=timedelta(minutes=30), clock=clock)
+    index.warmed = True
+    return index
+
+
+def test_candidates_match_entity_or_tag_within_window() -> None:
+    now = 10_000 * MINUTE_MS
+    index = _index(FakeClock(now))
+    same_entity = _entry("ETH", now - 10 * MINUTE_MS)
+    shared_tag = _entry("BTC", now - 5 * MINUTE_MS, ("crypto",))
+    index.add(same_entity)
+    index.add(shared_tag)
+    index.add(_entry("ETH", now - 20 * MINUTE_MS))
+    index.add(_entry("SOL", now, ("defi",)))
+
+    found = index.candidates(("asset", "ETH"), ["crypto"], now)
+    assert [entry.event_id for entry in found] == [shared_tag.event_id, same_entity.event_id]
+
+
+def test_entries_are_evicted_as_the_clock_advances() -> None:
+    clock = FakeClock(10_000 * MINUTE_MS)
+    index = _index(clock)
+    old = _entry("ETH", clock.now_ms - 40 * MINUTE_MS, ("crypto",))
+    index.add(old)
+    assert len(index) == 1
+    assert index.covers(clock.now_ms)
+    assert not index.covers(clock.now_ms - 31 * MINUTE_MS)
+
+    clock.now_ms += 10 * MINUTE_MS
+    assert index.candidates(("asset", "ETH"), ["crypto"], old.occurred_ms) == []
+    assert len(index) == 0
+
+    index.add(_entry("ETH", clock.now_ms - 50 * MINUTE_MS))
+    assert len(index) == 0
+
+
+def _payload(occurred_at: datetime, entity_id: str, tags: list[str]) -> dict:
+    return {
+        "source": "coinbase",
+        "occurred_at": occurred_at.isoformat(),
+        "received_at": occurred_at.isoformat(),
+        "entity": {"type": "asset", "id": entity_id},
+        "type": "price_move",
+        "title": f"{entity_id} moved",
+        "tags": tags,
+    }
+
+
+def test_pipeline_uses_index_and_drops_rolled_back_events(api_client, monkeypatch) -> None:
+    monkeypatch.setenv("CORRELATION_INDEX", "on")
+    client, session_factory = api_client
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    with session_factory() as session:
+        index = get_correlation_index(session)
+        assert index is not None and index.warmed
+        discarded = EventCreate.model_validate(_payload(now, "ETH", ["crypto"]))
+        session.add(build_event_row(discarded, process_event(discarded, session)))
+        session.rollback()
+    assert len(index) == 0
+
+    first = client.post("/events/", json=_payload(now - timedelta(minutes=3), "ETH", [])).json()
+    assert len(index) == 1
+    unrelated = client.post("/events/", json=_payload(now, "SOL", ["defi"])).json()
+    second = client.post("/events/", json=_payload(now, "ETH", [])).json()
+    third = client.post("/events/", json=_payload(now, "BTC", ["defi"])).json()
+
+    assert second["incident_id"] is not None
+    assert third["incident_id"] is not None and third["incident_id"] != second["incident_id"]
+    with session_factory() as session:
+        stored = session.get(Event, uuid.UUID(first["id"]))
+        assert stored is not None and str(stored.incident_id) == second["incident_id"]
+        stored = session.get(Event, uuid.UUID(unrelated["id"]))
+        assert stored is not None and str(stored.incident_id) == third["incident_id"]
+    latest = index.candidates(("asset", "ETH"), [], int(now.timestamp() * 1000))[0]
+    assert str(latest.incident_id) == second["incident_id"]
+
+
+def test_index_falls_back_to_sql_until_synced(api_client, monkeypatch) -> None:
+    client, session_factory = api_client
+    monkeypatch.delenv("CORRELATION_INDEX", raising=False)
+    monkeypatch.setenv("CORRELATION_INDEX_SYNC", "redis")
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:1/0")  # nothing listens there
+    now = datetime.now(timezone.utc)
+    with session_factory() as session:
+        index = get_correlation_index(session)
+    assert index is not None and index.sync is not None
+    try:
+        assert not index.covers(int(now.timestamp() * 1000))
+        client.post("/events/", json=_payload(now - timedelta(minutes=1), "ETH", []))
+        assert client.post("/events/", json=_payload(now, "ETH", [])).json()["incident_id"]
+    finally:
+        index.sync.stop()
+
+
+def test_sync_applies_updates_from_other_processes(tmp_path) -> None:
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'sync.sqlite'}", future=True)
+    Base.metadata.create_all(engine)
+    server = fakeredis.FakeServer()
+    first, second = CorrelationIndex(), CorrelationIndex()
+    syncs = []
+    for index in (first, second):
+        client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        sync = index.sync = IndexSync(index, engine, client, "test-channel")
+        sync.start()
+        syncs.append(sync)
+    try:
+        _wait_for(lambda: all(index.warmed and index.synced for index in (first, second)))
+        now = int(time.time() * 1000)
+        entry = _entry("ETH", now, ("crypto",))
+        first.add(entry)
+        syncs[0].publish([entry])
+        _wait_for(lambda: len(second) == 1)
+
+        incident_id = uuid.uuid4()
+        first.assign(entry.event_id, incident_id)
+        syncs[0].publish(assign={entry.event_id: incident_id})
+        _wait_for(
+            lambda: second.candidates(("asset", "ETH"), [], now)[0].incident_id == incident_id
+        )
+        assert second.covers(now) and len(first) == 1
+    finally:
+        for sync in syncs:
+            sync.stop()
+        engine.dispose()
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
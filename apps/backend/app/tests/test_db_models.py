@@ -1,16 +1,19 @@
 from __future__ import annotations
 
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import pytest
 from alembic import command
 from alembic.config import Config
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 
+from app.api.schemas import EventCreate
 from app.db.models import Event, EventMetric, EventTag, Incident
+from app.db.session import to_async_url
+from app.ingest.pipeline import fingerprint_event
 
 
 def _alembic_config(db_url: str) -> Config:
@@ -78,6 +81,8 @@ def test_event_crud_round_trip(migrated_engine):
         assert stored.incident_id == incident_id
         assert {tag.value for tag in stored.tag_rows} == {"health", "fitbit"}
         assert stored.metrics[0].name == "resting_hr"
+        assert {tag.occurred_at for tag in stored.tag_rows} == {stored.occurred_at}
+        assert stored.metrics[0].occurred_at == stored.occurred_at
         stored.score = 0.9
         stored.links = stored.links + [{"href": "https://example.com/details", "rel": "details"}]
         session.commit()
@@ -105,3 +110,150 @@ def test_migration_downgrade_clears_schema(tmp_path, monkeypatch):
         assert "incidents" not in tables
     finally:
         engine.dispose()
+
+
+def test_incident_counters_migration_backfills(tmp_path, monkeypatch):
+    db_url = f"sqlite+pysqlite:///{tmp_path/'backfill.db'}"
+    cfg = _alembic_config(db_url)
+    monkeypatch.setenv("DATABASE_URL", db_url)
+    command.upgrade(cfg, "20251018_000002")
+
+    incident_id = uuid.uuid4()
+    first = datetime(2025, 9, 20, 12, tzinfo=timezone.utc)
+    engine = create_engine(db_url, future=True)
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                text("INSERT INTO incidents (id, status) VALUES (:id, 'open')"),
+                {"id": incident_id.hex},
+            )
+            rows = ((0, "alpaca", ["finance"]), (5, "rss", ["finance", "news"]))
+            for offset, source, tags in rows:
+                event_id = uuid.uuid4()
+                connection.execute(
+                    text(
+                        "INSERT INTO events (id, source, occurred_at, received_at, entity_type,"
+                        " entity_id, type, title, links, extras, features, explain, incident_id)"
+                        " VALUES (:id, :source, :at, :at, 'portfolio', 'acct', 'news', 't',"
+                        " '[]', '{}', '{}', '{}', :incident)"
+                    ),
+                    {
+                        "id": event_id.hex,
+                        "source": source,
+                        "at": first + timedelta(minutes=offset),
+                        "incident": incident_id.hex,
+                    },
+                )
+                for tag in tags:
+                    connection.execute(
+                        text("INSERT INTO event_tags (event_id, value) VALUES (:id, :tag)"),
+                        {"id": event_id.hex, "tag": tag},
+                    )
+
+        command.upgrade(cfg, "head")
+        with sessionmaker(bind=engine, future=True)() as session:
+            incident = session.get(Incident, incident_id)
+            assert incident is not None
+            assert incident.event_count == 2
+            assert incident.first_event_at.replace(tzinfo=timezone.utc) == first
+            assert incident.sources == ["alpaca", "rss"]
+            assert incident.tag_counts == {"finance": 2, "news": 1}
+    finally:
+        engine.dispose()
+
+
+def test_fingerprint_migration_keeps_first_copy(tmp_path, monkeypatch):
+    db_url = f"sqlite+pysqlite:///{tmp_path/'fingerprints.db'}"
+    cfg = _alembic_config(db_url)
+    monkeypatch.setenv("DATABASE_URL", db_url)
+    command.upgrade(cfg, "20251018_000003")
+
+    occurred_at = datetime(2025, 9, 20, 12, tzinfo=timezone.utc)
+    ids = [uuid.uuid4() for _ in range(3)]
+    engine = create_engine(db_url, future=True)
+    try:
+        with engine.begin() as connection:
+            for event_id, delay, title in zip(ids, (5, 1, 1), ("t", "t", "other")):
+                connection.execute(
+                    text(
+                        "INSERT INTO events (id, source, occurred_at, received_at, entity_type,"
+                        " entity_id, type, title, links, extras, features, explain)"
+                        " VALUES (:id, 'rss', :at, :received, 'topic', 'ai', 'news', :title,"
+                        " '[]', '{}', '{}', '{}')"
+                    ),
+                    {
+                        "id": event_id.hex,
+                        "at": occurred_at,
+                        "received": occurred_at + timedelta(seconds=delay),
+                        "title": title,
+                    },
+                )
+
+        command.upgrade(cfg, "head")
+        expected = fingerprint_event(
+            EventCreate(
+                source="rss",
+                occurred_at=occurred_at,
+                received_at=occurred_at,
+                entity={"type": "topic", "id": "ai"},
+                type="news",
+                title="t",
+            )
+        )
+        with sessionmaker(bind=engine, future=True)() as session:
+            stored = [session.get(Event, event_id).fingerprint for event_id in ids]
+        assert stored[0] is None
+        assert stored[1] == expected
+        assert stored[2] is not None and stored[2] != expected
+    finally:
+        engine.dispose()
+
+
+def test_partition_migration_copies_occurred_at_to_children(tmp_path, monkeypatch):
+    db_url = f"sqlite+pysqlite:///{tmp_path/'partitions.db'}"
+    cfg = _alembic_config(db_url)
+    monkeypatch.setenv("DATABASE_URL", db_url)
+    command.upgrade(cfg, "20251018_000004")
+
+    occurred_at = datetime(2025, 9, 20, 12, tzinfo=timezone.utc)
+    event_id = uuid.uuid4()
+    engine = create_engine(db_url, future=True)
+    try:
+        with engine.begin() as connection:
+            connection.execute(
+                text(
+                    "INSERT INTO events (id, source, occurred_at, received_at, entity_type,"
+                    " entity_id, type, title, links, extras, features, explain)"
+                    " VALUES (:id, 'fitbit', :at, :at, 'user', 'u1', 'health_anomaly', 't',"
+                    " '[]', '{}', '{}', '{}')"
+                ),
+                {"id": event_id.hex, "at": occurred_at},
+            )
+            connection.execute(
+                text("INSERT INTO event_tags (event_id, value) VALUES (:id, 'health')"),
+                {"id": event_id.hex},
+            )
+            connection.execute(
+                text(
+                    "INSERT INTO event_metrics (event_id, name, value)"
+                    " VALUES (:id, 'rhr_z', 2.5)"
+                ),
+                {"id": event_id.hex},
+            )
+
+        command.upgrade(cfg, "head")
+        columns = {c["name"]: c for c in inspect(engine).get_columns("event_tags")}
+        assert columns["occurred_at"]["nullable"] is False
+        with sessionmaker(bind=engine, future=True)() as session:
+            stored = session.get(Event, event_id)
+            assert stored.tag_rows[0].occurred_at == stored.occurred_at
+            assert stored.metrics[0].occurred_at == stored.occurred_at
+    finally:
+        engine.dispose()
+
+
+def test_async_url_swaps_driver():
+    async_url = to_async_url("sqlite+pysqlite:///./signalos.db")
+    assert str(async_url) == "sqlite+aiosqlite:///./signalos.db"
+    assert to_async_url("postgresql://u:p@db/signalos").drivername == "postgresql+psycopg"
+    assert to_async_url("postgresql+psycopg://u:p@db/signalos").drivername == "postgresql+psycopg"
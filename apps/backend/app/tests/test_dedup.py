@@ -0,0 +1,83 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.db import Event, Incident
+from app.ingest import dedup
+from app.ingest.dedup import FingerprintCache
+
+
+def _payload(occurred_at: datetime, entity_id: str, **overrides) -> dict:
+    payload = {
+        "source": "coinbase",
+        "occurred_at": occurred_at.isoformat(),
+        "received_at": occurred_at.isoformat(),
+        "entity": {"type": "asset", "id": entity_id},
+        "type": "price_move",
+        "title": f"{entity_id} moved",
+        "tags": ["crypto"],
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_cache_evicts_least_recently_used() -> None:
+    cache = FingerprintCache(maxsize=2)
+    first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    cache.update({"a": first, "b": second})
+    assert cache.get("a") == first
+    cache.update({"c": third})
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (first, None, third)
+
+
+def test_replayed_event_returns_stored_event(api_client, monkeypatch) -> None:
+    client, session_factory = api_client
+    occurred_at = datetime(2025, 10, 2, 9, tzinfo=timezone.utc)
+    client.post("/events/", json=_payload(occurred_at - timedelta(minutes=2), "ETH"))
+    created = client.post("/events/", json=_payload(occurred_at, "ETH"))
+    assert created.status_code == 201
+
+    replay = client.post(
+        "/events/", json=_payload(occurred_at, "ETH", received_at="2025-10-02T09:05:00Z")
+    )
+    assert replay.status_code == 200
+    assert replay.json()["id"] == created.json()["id"]
+
+    dedup._caches.clear()  # another process, or evicted: found before the pipeline runs
+    processed: list[int] = []
+    process_events = dedup.process_events
+
+    def recording(events, session):
+        processed.append(len(events))
+        return process_events(events, session)
+
+    monkeypatch.setattr(dedup, "process_events", recording)
+    again = client.post("/events/", json=_payload(occurred_at, "ETH"))
+    assert again.status_code == 200
+    assert again.json()["id"] == created.json()["id"]
+    assert processed == [0]
+
+    with session_factory() as session:
+        assert session.scalar(select(func.count()).select_from(Event)) == 2
+        incident = session.scalars(select(Incident)).one()
+        assert incident.event_count == 2
+
+
+def test_batch_reports_duplicates(api_client) -> None:
+    client, _ = api_client
+    occurred_at = datetime(2025, 10, 2, 9, tzinfo=timezone.utc)
+    stored = client.post("/events/", json=_payload(occurred_at, "BTC")).json()
+
+    data = client.post(
+        "/events/batch",
+        json=[
+            _payload(occurred_at, "BTC"),
+            _payload(occurred_at, "SOL"),
+            _payload(occurred_at, "SOL"),
+        ],
+    ).json()
+    assert (data["created"], data["duplicates"], data["failed"]) == (1, 2, 0)
+    assert [item["status"] for item in data["items"]] == ["duplicate", "created", "duplicate"]
+    assert data["items"][0]["event"]["id"] == stored["id"]
+    assert data["items"][2]["event"]["id"] == data["items"][1]["event"]["id"]
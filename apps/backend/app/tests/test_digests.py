@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.db import Digest, Incident
+from app.ingest.digests import bucket_start, flush_digests
+
+BASE_TIME = datetime(2025, 10, 8, 9, tzinfo=timezone.utc)  # a Wednesday
+
+
+def _post(client, minutes: int, entity: str = "acct-1", **extra) -> dict:
+    occurred_at = (BASE_TIME + timedelta(minutes=minutes)).isoformat()
+    payload = {
+        "source": "alpaca",
+        "occurred_at": occurred_at,
+        "received_at": occurred_at,
+        "entity": {"type": "portfolio", "id": entity},
+        "type": "price_move",
+        "title": f"Move {minutes}",
+        "tags": ["finance"],
+    }
+    response = client.post("/events/", json={**payload, **extra})
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_bucket_start_uses_utc_days_and_monday_weeks() -> None:
+    late = datetime(2025, 10, 8, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    assert bucket_start("day", late) == datetime(2025, 10, 9, tzinfo=timezone.utc)
+    assert bucket_start("week", late) == datetime(2025, 10, 6, tzinfo=timezone.utc)
+
+
+def test_digests_fold_events_routed_below_the_push_threshold(api_client, monkeypatch) -> None:
+    monkeypatch.setenv("STORM_CONTROL", "off")
+    monkeypatch.setenv("DIGEST_TOP_K", "2")
+    monkeypatch.setenv("DIGEST_FLUSH_SECONDS", "60")
+    client, factory = api_client
+    items = [_post(client, minutes) for minutes in range(3)]
+    items.append(_post(client, 24 * 60, entity="acct-2"))
+    assert all(item["explain"]["delivery"]["route"] == "digest" for item in items)
+    with factory() as session:
+        assert session.query(Digest).count() == 0
+    assert flush_digests() == 8  # two periods per event, folded after the ingest commits
+
+    day = client.get("/digests/day", params={"at": BASE_TIME.isoformat()}).json()
+    assert day["bucket_start"].startswith("2025-10-08T00:00:00")
+    assert day["event_count"] == 3
+    ranked = sorted(items[:3], key=lambda item: (item["score"], item["id"]), reverse=True)
+    assert [event["id"] for event in day["top_events"]] == [item["id"] for item in ranked[:2]]
+    assert day["max_score"] == ranked[0]["score"]
+    incident_id = items[1]["incident_id"]
+    assert day["incidents"][incident_id]["events"] == 2
+
+    week = client.get("/digests/week", params={"at": BASE_TIME.isoformat()}).json()
+    assert week["bucket_start"].startswith("2025-10-06T00:00:00")
+    assert week["event_count"] == 4 and len(week["top_events"]) == 2
+
+    with factory() as session:
+        assert session.query(Digest).count() == 3
+
+
+def test_digests_are_bucketed_by_incident_owner(api_client, monkeypatch) -> None:
+    monkeypatch.setenv("STORM_CONTROL", "off")
+    client, factory = api_client
+    user_id = uuid4()
+    with factory() as session:
+        incident = Incident(id=uuid4(), status="open", user_id=user_id)
+        session.add(incident)
+        session.commit()
+        incident_id = incident.id
+    _post(client, 0, incident_id=str(incident_id))
+    _post(client, 1, entity="feed-1", source="rss", tags=["news"])
+    flush_digests()
+
+    at = BASE_TIME.isoformat()
+    owned = client.get("/digests/day", params={"at": at, "user_id": str(user_id)}).json()
+    assert owned["event_count"] == 1
+    assert owned["top_events"][0]["incident_id"] == str(incident_id)
+    assert client.get("/digests/day", params={"at": at}).json()["event_count"] == 1
+
+    empty = client.get("/digests/day", params={"at": "2025-10-01T12:00:00Z"})
+    assert empty.status_code == 200
+    assert empty.json()["event_count"] == 0 and empty.json()["top_events"] == []
+    assert client.get("/digests/month").status_code == 422
@@ -69,9 +69,9 @@ def test_events_and_incidents_flow(api_client) -> None:
     assert first_event["entity"]["id"] == "user-123"
 
     for params, expected_total, expected_entity in (
-        ({"limit": 1}, 2, "acct-9"),
-        ({"source": "fitbit"}, 1, "user-123"),
-        ({"tag": "portfolio"}, 1, "acct-9"),
+        ({"limit": 1, "include_total": "true"}, 2, "acct-9"),
+        ({"source": "fitbit", "include_total": "true"}, 1, "user-123"),
+        ({"tag": "portfolio", "include_total": "true"}, 1, "acct-9"),
     ):
         payload = client.get("/events/", params=params).json()
         assert payload["total"] == expected_total
@@ -109,9 +109,9 @@ def test_events_and_incidents_flow(api_client) -> None:
     post_event(follow_up)
 
     for params, total, incident, count in (
-        ({"limit": 1}, 2, None, None),
-        ({"status": "open"}, 1, str(open_incident_id), 1),
-        ({"user_id": str(user_id)}, 1, str(open_incident_id), None),
+        ({"limit": 1, "include_total": "true"}, 2, None, None),
+        ({"status": "open", "include_total": "true"}, 1, str(open_incident_id), 1),
+        ({"user_id": str(user_id), "include_total": "true"}, 1, str(open_incident_id), None),
     ):
         data = client.get("/incidents/", params=params).json()
         assert data["total"] == total
@@ -203,7 +203,8 @@ def test_list_events_filters_by_entity_incident_and_time(api_client) -> None:
     )
 
     entity_response = client.get(
-        "/events/", params={"entity_type": "user", "entity_id": "user-123"}
+        "/events/",
+        params={"entity_type": "user", "entity_id": "user-123", "include_total": "true"},
     ).json()
     assert entity_response["total"] == 2
     assert [item["id"] for item in entity_response["items"]] == [
@@ -212,7 +213,7 @@ def test_list_events_filters_by_entity_incident_and_time(api_client) -> None:
     ]
 
     incident_response = client.get(
-        "/events/", params={"incident_id": str(incident_id)}
+        "/events/", params={"incident_id": str(incident_id), "include_total": "true"}
     ).json()
     assert incident_response["total"] == 1
     assert incident_response["items"][0]["id"] == second["id"]
@@ -220,14 +221,20 @@ def test_list_events_filters_by_entity_incident_and_time(api_client) -> None:
 
     after_response = client.get(
         "/events/",
-        params={"occurred_after": (base_time + timedelta(minutes=10)).isoformat()},
+        params={
+            "occurred_after": (base_time + timedelta(minutes=10)).isoformat(),
+            "include_total": "true",
+        },
     ).json()
     assert after_response["total"] == 1
     assert after_response["items"][0]["id"] == third["id"]
 
     before_response = client.get(
         "/events/",
-        params={"occurred_before": (base_time + timedelta(minutes=1)).isoformat()},
+        params={
+            "occurred_before": (base_time + timedelta(minutes=1)).isoformat(),
+            "include_total": "true",
+        },
     ).json()
     assert before_response["total"] == 1
     assert before_response["items"][0]["id"] == first["id"]
@@ -352,7 +359,7 @@ def test_pipeline_scores_and_correlates_events(api_client) -> None:
         assert incident.score is not None
         assert incident.score >= second["score"]
 
-    incident_list = client.get("/incidents/").json()
+    incident_list = client.get("/incidents/", params={"include_total": "true"}).json()
     assert incident_list["total"] == 1
     assert incident_list["items"][0]["event_count"] == 2
 
@@ -421,3 +428,102 @@ def test_pipeline_correlates_late_arrivals(api_client) -> None:
         incident = session.get(Incident, incident_id)
         assert incident is not None
         assert _normalize(incident.last_event_at) == _normalize(later_time)
+
+
+def test_pipeline_finds_entity_match_in_busy_window(api_client, monkeypatch) -> None:
+    client, session_factory = api_client
+    monkeypatch.setenv("CORRELATION_INDEX", "off")
+    monkeypatch.setenv("STORM_CONTROL", "off")  # the noise burst would count as a storm
+    base_time = datetime(2025, 9, 29, 9, tzinfo=timezone.utc)
+
+    def payload(occurred_at: datetime, entity_id: str, tags: list[str]) -> dict:
+        return {
+            "source": "coinbase",
+            "occurred_at": occurred_at.isoformat(),
+            "received_at": occurred_at.isoformat(),
+            "entity": {"type": "asset", "id": entity_id},
+            "type": "price_move",
+            "title": f"{entity_id} moved",
+            "tags": tags,
+        }
+
+    closed_id = uuid.uuid4()
+    with session_factory() as session:
+        session.add(Incident(id=closed_id, status="closed"))
+        session.commit()
+    closed = payload(base_time - timedelta(minutes=1), "ETH", [])
+    closed["incident_id"] = str(closed_id)
+    anchor = client.post("/events/", json=payload(base_time - timedelta(minutes=10), "ETH", []))
+    client.post("/events/", json=closed)
+    client.post(
+        "/events/batch",
+        json=[
+            payload(base_time + timedelta(seconds=i), f"noise-{i}", [f"n{i}"]) for i in range(60)
+        ],
+    )
+
+    follow_up = client.post("/events/", json=payload(base_time, "ETH", [])).json()
+    assert follow_up["incident_id"] is not None
+    assert follow_up["incident_id"] != str(closed_id)
+    with session_factory() as session:
+        stored = session.get(Event, uuid.UUID(anchor.json()["id"]))
+        assert stored is not None and str(stored.incident_id) == follow_up["incident_id"]
+
+
+def test_list_events_sparse_fields(api_client, monkeypatch) -> None:
+    client, _ = api_client
+    base_time = datetime(2025, 10, 1, 9, tzinfo=timezone.utc)
+    for minutes in range(5):
+        occurred_at = base_time + timedelta(minutes=minutes)
+        response = client.post(
+            "/events/",
+            json={
+                "source": "alpaca",
+                "occurred_at": occurred_at.isoformat(),
+                "received_at": occurred_at.isoformat(),
+                "entity": {"type": "asset", "id": f"asset-{minutes % 2}"},
+                "type": "price_move",
+                "title": f"Move {minutes}",
+                "tags": ["finance", f"t-{minutes}"],
+                "metrics": [{"name": "pct_change", "value": minutes / 10, "unit": "pct"}],
+                "links": [{"href": "https://example.com/quote", "rel": "source"}],
+            },
+        )
+        assert response.status_code == 201
+    full = client.get("/events/", params={"tag": "finance"}).json()["items"]
+
+    from app.api.schemas import EventResponse
+
+    def refuse(*args, **kwargs):
+        raise AssertionError("sparse lists must not build EventResponse")
+
+    monkeypatch.setattr(EventResponse, "model_validate", refuse)
+    feed = client.get(
+        "/events/", params={"fields": "id,title,score,occurred_at,incident_id", "tag": "finance"}
+    ).json()["items"]
+    assert [item["id"] for item in feed] == [item["id"] for item in full]
+    for item, expected in zip(feed, full):
+        assert set(item) == {"id", "title", "score", "occurred_at"} | (
+            {"incident_id"} if "incident_id" in expected else set()
+        )
+        assert {key: expected[key] for key in item} == item
+
+    nested = client.get("/events/", params={"fields": "entity,tags,metrics,links"}).json()["items"]
+    assert [
+        {key: item[key] for key in ("entity", "tags", "metrics", "links")} for item in full
+    ] == nested
+
+    ids: list[str] = []
+    cursor = None
+    while True:
+        params = {"fields": "title", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/events/", params=params).json()
+        ids.extend(item["title"] for item in page["items"])
+        cursor = page.get("next_cursor")
+        if cursor is None:
+            break
+    assert ids == [item["title"] for item in full]
+
+    response = client.get("/events/", params={"fields": "title,secret"})
+    assert response.status_code == 400
+    assert "secret" in response.json()["detail"]
@@ -0,0 +1,100 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.api.schemas import EventCreate
+from app.db import Event, Incident
+from app.ingest.pipeline import build_event_row, process_event, process_events
+
+
+def _payload(occurred_at: datetime, entity_id: str, tags: list[str], **overrides) -> dict:
+    payload = {
+        "source": "alpaca",
+        "occurred_at": occurred_at.isoformat(),
+        "received_at": (occurred_at + timedelta(seconds=3)).isoformat(),
+        "entity": {"type": "portfolio", "id": entity_id},
+        "type": "price_move",
+        "title": f"Move on {entity_id}",
+        "tags": tags,
+        "metrics": [{"name": "pct_change", "value": -0.05}],
+        "extras": {"portfolio_exposure": 0.8},
+    }
+    payload.update(overrides)
+    return payload
+
+
+def test_batch_creates_events_and_reports_item_errors(api_client) -> None:
+    client, session_factory = api_client
+    base_time = datetime(2025, 9, 27, 9, tzinfo=timezone.utc)
+    response = client.post(
+        "/events/batch",
+        json=[
+            _payload(base_time, "acct-1", ["finance"]),
+            {"source": "alpaca"},
+            _payload(base_time + timedelta(minutes=4), "acct-1", ["portfolio"]),
+            _payload(base_time, "acct-2", ["crypto"], incident_id=str(uuid.uuid4())),
+        ],
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["created"], data["failed"]) == (2, 2)
+    assert [(item["index"], item["status"]) for item in data["items"]] == [
+        (0, "created"),
+        (1, "error"),
+        (2, "created"),
+        (3, "error"),
+    ]
+    assert data["items"][3]["errors"][0]["loc"] == ["incident_id"]
+
+    first, second = data["items"][0]["event"], data["items"][2]["event"]
+    assert second["incident_id"] is not None
+    assert first["incident_id"] == second["incident_id"]
+
+    with session_factory() as session:
+        stored = session.get(Event, uuid.UUID(first["id"]))
+        assert stored is not None
+        assert str(stored.incident_id) == second["incident_id"]
+        incident = session.get(Incident, stored.incident_id)
+        assert incident is not None and incident.score is not None
+
+
+def test_batch_rejects_oversized_payload(api_client) -> None:
+    client, _ = api_client
+    base_time = datetime(2025, 9, 27, 9, tzinfo=timezone.utc)
+    response = client.post("/events/batch", json=[_payload(base_time, "acct-1", [])] * 501)
+    assert response.status_code == 422
+
+
+def test_process_events_matches_sequential_ingest(api_client) -> None:
+    _, session_factory = api_client
+    base_time = datetime(2025, 9, 28, 9, tzinfo=timezone.utc)
+    anchor = EventCreate.model_validate(_payload(base_time, "acct-9", ["eth"]))
+    with session_factory() as session:
+        session.add(build_event_row(anchor, process_event(anchor, session)))
+        session.commit()
+
+    events = [
+        EventCreate.model_validate(_payload(base_time + timedelta(minutes=offset), entity, tags))
+        for offset, entity, tags in (
+            (1, "acct-7", ["btc"]),
+            (2, "acct-9", []),
+            (40, "acct-7", ["btc"]),
+            (41, "acct-8", ["btc"]),
+        )
+    ]
+    with session_factory() as session:
+        batch = process_events(events, session)
+        session.rollback()
+
+    with session_factory() as session:
+        sequential = []
+        for event in events:
+            result = process_event(event, session)
+            session.add(build_event_row(event, result))
+            session.flush()
+            sequential.append(result)
+        session.rollback()
+
+    assert [result.score for result in batch] == [result.score for result in sequential]
+    assert [result.incident_id is None for result in batch] == [True, False, False, False]
+    assert [result.incident_id is None for result in sequential[1::2]] == [False, False]
+    assert batch[2].incident_id == batch[3].incident_id != batch[1].incident_id
@@ -0,0 +1,141 @@
+import asyncio
+import zipfile
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.db import Event, EventMetric, EventTag, ImportCheckpoint
+from app.ingest.fitbit import export_members, parse_time, read_member
+from app.ingest.registry import create_connector
+from app.ingest.runtime import ConnectorRuntime
+from app.jobs import import_fitbit
+from app.jobs.import_fitbit import import_export
+
+SLEEP_HEADER = (
+    "sleep_log_entry_id,timestamp,overall_score,composition_score,revitalization_score,"
+    "duration_score,deep_sleep_in_minutes,resting_heart_rate,restlessness\n"
+)
+
+
+def _export(tmp_path, days: int = 10) -> str:
+    sleep = SLEEP_HEADER + "".join(
+        f"{n},2024-03-{n + 1:02d}T06:30:00Z,{70 + n},20,18,40,{60 + n},{55 + n % 3},0.08\n"
+        for n in range(days)
+    )
+    sleep += "99,not a date,80,20,18,40,70,55,0.1\n"
+    resting = "date,value\n" + "".join(f"03/{n + 1:02d}/2024,{58 + n % 4}\n" for n in range(days))
+    resting += "03/30/2024,\n"
+    path = tmp_path / "export.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("Takeout/Fitbit/Sleep/sleep_score.csv", sleep)
+        archive.writestr("Takeout/Fitbit/Heart/resting_heart_rate.csv", resting)
+        archive.writestr("Takeout/Fitbit/Profile/profile.csv", "name\nA\n")
+    return str(path)
+
+
+def _count(session_factory, model) -> int:
+    with session_factory() as session:
+        return session.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_export_members_stream_rows_as_ces_events(tmp_path) -> None:
+    with zipfile.ZipFile(_export(tmp_path, days=3)) as archive:
+        members = export_members(archive)
+        assert [spec.type for _, spec in members] == ["sleep", "resting_hr"]
+        sleep = list(read_member(archive, *members[0], user="user-1"))
+        resting = list(read_member(archive, *members[1], user="user-1", skip=1))
+
+    assert sleep[-1] is None and resting[-1] is None
+    first = sleep[0]
+    assert first is not None and resting[0] is not None
+    assert (first.source, first.entity_id, first.type) == ("fitbit", "user-1", "sleep")
+    assert first.metrics == {
+        "sleep_score": 70.0,
+        "deep_sleep_minutes": 60.0,
+        "restlessness": 0.08,
+        "resting_hr": 55.0,
+    }
+    assert resting[0].metrics == {"resting_hr": 59.0} and len(resting) == 3
+    assert parse_time("03/02/2024") == datetime(2024, 3, 2, tzinfo=timezone.utc)
+
+
+def test_import_loads_chunks_and_skips_finished_members(api_client, tmp_path) -> None:
+    _, session_factory = api_client
+    path = _export(tmp_path)
+
+    with session_factory() as session:
+        stats = import_export(session, path, "user-1", chunk_size=4)
+    assert (stats.members, stats.rows, stats.created, stats.skipped) == (2, 22, 20, 2)
+    assert _count(session_factory, Event) == 20
+    assert _count(session_factory, EventMetric) == 10 * 4 + 10
+    assert _count(session_factory, EventTag) == 20 * 3
+    with session_factory() as session:
+        event = session.execute(select(Event).where(Event.type == "sleep").limit(1)).scalar_one()
+        assert event.score is not None and event.explain["model"] == "builtin-v1"
+        assert event.incident_id is None and event.fingerprint.startswith("fitbit:")
+        checkpoints = session.execute(select(ImportCheckpoint.rows, ImportCheckpoint.done)).all()
+    assert sorted(checkpoints) == [(11, True), (11, True)]
+
+    with session_factory() as session:
+        again = import_export(session, path, "user-1", chunk_size=4)
+    assert (again.members, again.rows, again.created) == (0, 0, 0)
+    assert _count(session_factory, Event) == 20
+
+
+def test_interrupted_import_resumes_after_the_last_committed_chunk(
+    api_client, tmp_path, monkeypatch
+) -> None:
+    _, session_factory = api_client
+    path = _export(tmp_path)
+    load_chunk = import_fitbit.load_chunk
+    calls = []
+
+    def failing_load(session, events):
+        calls.append(len(events))
+        if len(calls) == 2:
+            raise RuntimeError("connection lost")
+        return load_chunk(session, events)
+
+    monkeypatch.setattr(import_fitbit, "load_chunk", failing_load)
+    with session_factory() as session, pytest.raises(RuntimeError):
+        import_export(session, path, "user-1", chunk_size=4)
+    assert _count(session_factory, Event) == 4
+
+    monkeypatch.setattr(import_fitbit, "load_chunk", load_chunk)
+    with session_factory() as session:
+        stats = import_export(session, path, "user-1", chunk_size=4)
+    assert (stats.rows, stats.created, stats.duplicates) == (18, 16, 0)
+    assert _count(session_factory, Event) == 20
+
+
+def test_fitbit_connector_runs_an_export_through_the_runtime(api_client, tmp_path) -> None:
+    _, session_factory = api_client
+    connector_runtime = ConnectorRuntime(session_factory, batch_size=50, max_wait=0.01)
+    connector_runtime.add(create_connector("fitbit_csv", path=_export(tmp_path), user="user-1"))
+
+    async def scenario() -> None:
+        await connector_runtime.start()
+        await asyncio.wait_for(connector_runtime.wait(), 10)
+        await connector_runtime.stop()
+
+    asyncio.run(scenario())
+    [status] = connector_runtime.status()
+    assert (status.state, status.created) == ("finished", 20)
+    assert _count(session_factory, Event) == 20
+
+
+def test_checkpoints_are_kept_per_user(api_client, tmp_path) -> None:
+    _, session_factory = api_client
+    path = _export(tmp_path)
+
+    with session_factory() as session:
+        import_export(session, path, "user-1", chunk_size=4)
+    with session_factory() as session:
+        stats = import_export(session, path, "user-2", chunk_size=4)
+    assert (stats.members, stats.created) == (2, 20)
+    with session_factory() as session:
+        users = session.execute(
+            select(Event.entity_id, func.count()).group_by(Event.entity_id)
+        ).all()
+    assert sorted(users) == [("user-1", 20), ("user-2", 20)]
@@ -0,0 +1,79 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.archive.archiver import archive_events
+from app.db import Incident
+from app.jobs.reconcile_incidents import reconcile_all
+
+
+def _payload(occurred_at: datetime, source: str, tags: list[str]) -> dict:
+    return {
+        "source": source,
+        "occurred_at": occurred_at.isoformat(),
+        "received_at": occurred_at.isoformat(),
+        "entity": {"type": "portfolio", "id": "acct-1"},
+        "type": "price_move",
+        "title": "Drawdown",
+        "tags": tags,
+    }
+
+
+def test_incident_counters_track_ingest_and_reconcile(api_client) -> None:
+    client, session_factory = api_client
+    base_time = datetime(2025, 10, 2, 9, tzinfo=timezone.utc)
+    client.post("/events/", json=_payload(base_time, "alpaca", ["finance", "portfolio"]))
+    client.post("/events/", json=_payload(base_time + timedelta(minutes=3), "rss", ["finance"]))
+    client.post("/events/", json=_payload(base_time - timedelta(minutes=2), "alpaca", ["news"]))
+
+    item = client.get("/incidents/").json()["items"][0]
+    assert item["event_count"] == 3
+    assert item["sources"] == ["alpaca", "rss"]
+    assert item["top_tags"][0] == "finance"
+    assert datetime.fromisoformat(item["first_event_at"]).replace(tzinfo=timezone.utc) == (
+        base_time - timedelta(minutes=2)
+    )
+
+    incident_id = uuid.UUID(item["id"])
+    with session_factory() as session:
+        incident = session.get(Incident, incident_id)
+        assert incident is not None
+        expected = (incident.event_count, incident.sources, incident.tag_counts)
+        incident.event_count = 99
+        incident.sources = []
+        session.add(Incident(id=uuid.uuid4(), status="open"))
+        session.commit()
+
+    with session_factory() as session:
+        assert reconcile_all(session, batch_size=1) == 1
+        assert reconcile_all(session) == 0
+        incident = session.get(Incident, incident_id)
+        assert incident is not None
+        assert (incident.event_count, incident.sources, incident.tag_counts) == expected
+
+
+def test_reconcile_counts_archived_events(api_client, tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path / "archive"))
+    client, session_factory = api_client
+    base_time = datetime(2025, 10, 2, 9, tzinfo=timezone.utc)
+    client.post("/events/", json=_payload(base_time, "alpaca", ["finance"]))
+    client.post("/events/", json=_payload(base_time + timedelta(minutes=1), "rss", ["news"]))
+    client.post("/events/", json=_payload(base_time + timedelta(minutes=3), "rss", ["finance"]))
+    incident_id = uuid.UUID(client.get("/incidents/").json()["items"][0]["id"])
+
+    with session_factory() as session:
+        assert archive_events(session, base_time + timedelta(minutes=2)).events == 2
+        assert reconcile_all(session) == 0
+        incident = session.get(Incident, incident_id)
+        assert incident is not None
+        incident.event_count = 1
+        incident.sources = ["rss"]
+        incident.tag_counts = {}
+        session.commit()
+
+    with session_factory() as session:
+        assert reconcile_all(session) == 1
+        incident = session.get(Incident, incident_id)
+        assert incident is not None
+        assert (incident.event_count, incident.sources) == (3, ["alpaca", "rss"])
+        assert incident.tag_counts == {"finance": 2, "news": 1}
+        assert incident.first_event_at.replace(tzinfo=timezone.utc) == base_time
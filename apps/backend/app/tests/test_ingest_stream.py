@@ -0,0 +1,82 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.db import Event
+from app.ingest.stream import (
+    CONSUMER_GROUP,
+    DEAD_LETTER_KEY,
+    STREAM_KEY,
+    StreamConsumer,
+    ensure_group,
+)
+
+
+def _payload(occurred_at: datetime, entity_id: str) -> dict:
+    return {
+        "source": "coinbase",
+        "occurred_at": occurred_at.isoformat(),
+        "received_at": occurred_at.isoformat(),
+        "entity": {"type": "asset", "id": entity_id},
+        "type": "price_move",
+        "title": f"{entity_id} moved",
+    }
+
+
+def _count_events(session_factory) -> int:
+    with session_factory() as session:
+        return session.execute(select(func.count(Event.id))).scalar_one()
+
+
+def test_async_ingest_queues_and_consumer_drains(api_client, redis_client) -> None:
+    client, session_factory = api_client
+    ensure_group(redis_client)
+    base_time = datetime(2025, 10, 3, 9, tzinfo=timezone.utc)
+
+    responses = [
+        client.post("/events/async", json=_payload(base_time + timedelta(minutes=i), "ETH"))
+        for i in range(3)
+    ]
+    assert [response.status_code for response in responses] == [202, 202, 202]
+    assert responses[0].json()["fingerprint"].startswith("coinbase:")
+    assert client.post("/events/async", json={"source": "coinbase"}).status_code == 422
+    assert _count_events(session_factory) == 0
+
+    consumer = StreamConsumer(redis_client, session_factory, "test-1", block_ms=1)
+    assert consumer.poll() == 3
+    assert consumer.poll() == 0
+    assert _count_events(session_factory) == 3
+    assert redis_client.xlen(STREAM_KEY) == 0
+    assert redis_client.xpending(STREAM_KEY, CONSUMER_GROUP)["pending"] == 0
+
+    with session_factory() as session:
+        incident_ids = set(session.execute(select(Event.incident_id)).scalars())
+    assert len(incident_ids) == 1 and None not in incident_ids
+
+
+def test_consumer_retries_then_dead_letters(api_client, redis_client, monkeypatch) -> None:
+    _, session_factory = api_client
+    ensure_group(redis_client)
+    redis_client.xadd(STREAM_KEY, {"event": "{not json"})
+    payload = _payload(datetime(2025, 10, 3, tzinfo=timezone.utc), "BTC")
+    redis_client.xadd(STREAM_KEY, {"event": json.dumps(payload)})
+
+    def explode(*_args, **_kwargs):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr("app.ingest.stream.insert_events", explode)
+    consumer = StreamConsumer(
+        redis_client, session_factory, "test-1", block_ms=1, max_retries=2, min_idle_ms=0
+    )
+    consumer.poll()
+    assert redis_client.xlen(DEAD_LETTER_KEY) == 1
+    assert redis_client.xpending(STREAM_KEY, CONSUMER_GROUP)["pending"] == 1
+
+    consumer.poll()
+    consumer.poll()
+    assert redis_client.xlen(DEAD_LETTER_KEY) == 2
+    assert redis_client.xpending(STREAM_KEY, CONSUMER_GROUP)["pending"] == 0
+    dead = redis_client.xrange(DEAD_LETTER_KEY)
+    assert dead[1][1]["error"] == "max retries exceeded"
+    assert _count_events(session_factory) == 0
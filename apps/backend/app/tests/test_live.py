@@ -0,0 +1,160 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import fakeredis
+import fakeredis.aioredis
+from pydantic_core import from_json
+
+from app.api import live
+from app.api.live import FeedFilter, LiveHub, Subscription, hub, sse_frames
+
+BASE_TIME = datetime(2025, 10, 6, 9, tzinfo=timezone.utc)
+
+
+def _payload(minutes: int, source: str, entity: str, tags: list[str]) -> dict:
+    occurred_at = (BASE_TIME + timedelta(minutes=minutes)).isoformat()
+    return {
+        "source": source,
+        "occurred_at": occurred_at,
+        "received_at": occurred_at,
+        "entity": {"type": "portfolio", "id": entity},
+        "type": "price_move",
+        "title": f"{source} {minutes}",
+        "tags": tags,
+    }
+
+
+def _message(source: str, tags: list[str], score: float = 0.5) -> dict:
+    entity = {"type": "asset", "id": "BTC"}
+    event = {"source": source, "entity": entity, "tags": tags, "score": score}
+    return {"type": "event", "event": event}
+
+
+def test_websocket_receives_matching_events_and_incidents(api_client) -> None:
+    client, _ = api_client
+    with client.websocket_connect("/events/stream?source=alpaca&tag=finance") as websocket:
+        client.post("/events/", json=_payload(0, "alpaca", "acct-1", ["finance", "portfolio"]))
+        first = websocket.receive_json()
+        assert first["type"] == "event"
+        assert first["event"]["title"] == "alpaca 0"
+        assert first["event"]["entity"] == {"type": "portfolio", "id": "acct-1"}
+
+        client.post("/events/", json=_payload(1, "rss", "feed-9", ["news"]))
+        client.post("/events/", json=_payload(2, "alpaca", "acct-1", ["finance"]))
+        second = websocket.receive_json()
+        assert second["event"]["title"] == "alpaca 2"
+        incident = websocket.receive_json()
+        assert incident["type"] == "incident"
+        assert incident["incident"]["id"] == second["event"]["incident_id"]
+        assert incident["incident"]["event_count"] == 2
+
+
+def test_slow_subscribers_drop_the_oldest_messages() -> None:
+    async def scenario() -> list[dict]:
+        subscription = Subscription(FeedFilter(), maxsize=2)
+        for index in range(5):
+            subscription.offer({"type": "event", "index": index})
+        return [*await subscription.next(), *await subscription.next()]
+
+    assert asyncio.run(scenario()) == [
+        {"type": "dropped", "count": 3},
+        {"type": "event", "index": 3},
+        {"type": "event", "index": 4},
+    ]
+
+
+def test_feed_filter_matches_events_and_incidents() -> None:
+    filters = FeedFilter(source="alpaca", tag="finance", min_score=0.4)
+    assert filters.matches(_message("alpaca", ["finance"]))
+    assert not filters.matches(_message("alpaca", ["finance"], score=0.1))
+    assert not filters.matches(_message("alpaca", ["news"]))
+    assert not filters.matches(_message("rss", ["finance"]))
+    incident = {"type": "incident", "incident": {"sources": ["alpaca", "rss"], "score": 0.6}}
+    assert filters.matches(incident)
+    assert not FeedFilter(source="coinbase").matches(incident)
+
+
+def test_sse_frames_send_heartbeats_and_events() -> None:
+    async def scenario() -> list[bytes]:
+        await hub.start()
+        frames = sse_frames(FeedFilter(tag="finance"), heartbeat=0.01)
+        received = [await frames.__anext__(), await frames.__anext__()]
+        hub.publish([_message("alpaca", ["news"]), _message("alpaca", ["finance"])])
+        received.append(await frames.__anext__())
+        await frames.aclose()
+        await hub.stop()
+        return received
+
+    connected, keepalive, event = asyncio.run(scenario())
+    assert (connected, keepalive) == (b": connected\n\n", b": keepalive\n\n")
+    assert event.startswith(b"event: event\ndata: {") and b'"finance"' in event
+    assert not hub.subscriptions
+
+
+def test_sse_heartbeats_keep_the_pending_read(monkeypatch) -> None:
+    reads = []
+    original = Subscription.next
+
+    def counted(self: Subscription):
+        reads.append(self)
+        return original(self)
+
+    monkeypatch.setattr(Subscription, "next", counted)
+
+    async def scenario() -> bytes:
+        await hub.start()
+        frames = sse_frames(FeedFilter(), heartbeat=0.01)
+        for _ in range(4):  # connected, then three keepalives
+            await frames.__anext__()
+        hub.publish([_message("alpaca", ["finance"])])
+        event = await frames.__anext__()
+        await frames.aclose()
+        await hub.stop()
+        return event
+
+    assert asyncio.run(scenario()).startswith(b"event: event\n")
+    assert len(reads) == 1
+
+
+def test_redis_bridge_relays_published_messages(monkeypatch) -> None:
+    server = fakeredis.FakeServer()
+    monkeypatch.setenv("LIVE_FEED_BRIDGE", "redis")
+    monkeypatch.setattr(live, "get_redis_client", lambda: fakeredis.FakeRedis(server=server))
+
+    async def scenario() -> list[dict]:
+        relay = LiveHub()
+        monkeypatch.setattr(live, "hub", relay)
+        await relay.start(fakeredis.aioredis.FakeRedis(server=server))
+        subscription = relay.subscribe(FeedFilter(source="alpaca"))
+        await asyncio.sleep(0.05)  # let the relay subscribe
+        live._publish([_message("rss", ["news"]), _message("alpaca", ["finance"])])
+        received = await asyncio.wait_for(subscription.next(), 2)
+        await relay.stop()
+        return received
+
+    assert asyncio.run(scenario()) == [_message("alpaca", ["finance"])]
+
+
+def test_async_ingest_publishes_to_the_bridge_off_the_event_loop(api_client, monkeypatch) -> None:
+    client, _ = api_client
+    redis_client = fakeredis.FakeRedis()
+    pubsub = redis_client.pubsub()
+    pubsub.subscribe(live.LIVE_CHANNEL)
+    pubsub.get_message()
+    on_loop = []
+
+    def recording_client():
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return redis_client
+
+    monkeypatch.setenv("LIVE_FEED_BRIDGE", "redis")
+    monkeypatch.setattr(live, "get_redis_client", recording_client)
+    client.post("/events/", json=_payload(0, "alpaca", "acct-1", ["finance"]))
+
+    assert on_loop == [False]
+    message = pubsub.get_message(timeout=1)
+    assert from_json(message["data"])[0]["event"]["title"] == "alpaca 0"
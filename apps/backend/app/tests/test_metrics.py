@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _payload(occurred_at: datetime) -> dict:
+    return {
+        "source": "coinbase",
+        "occurred_at": occurred_at.isoformat(),
+        "received_at": occurred_at.isoformat(),
+        "entity": {"type": "asset", "id": "ETH"},
+        "type": "price_move",
+        "title": f"ETH moved at {occurred_at:%H:%M}",
+    }
+
+
+def test_metrics_endpoint_exposes_pipeline_counters(api_client) -> None:
+    client, _ = api_client
+    before = {
+        "created": _sample("signalos_incidents_created_total"),
+        "no_match": _sample("signalos_correlation_decisions_total", outcome="no_match"),
+        "features": _sample("signalos_pipeline_stage_seconds_count", stage="features"),
+        "commit": _sample("signalos_pipeline_stage_seconds_count", stage="commit"),
+        "api": _sample("signalos_ingested_events_total", path="api", outcome="created"),
+    }
+    occurred_at = datetime(2025, 10, 4, 9, tzinfo=timezone.utc)
+    client.post("/events/", json=_payload(occurred_at))
+    client.post("/events/", json=_payload(occurred_at + timedelta(minutes=2)))
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    families = {family.name for family in text_string_to_metric_families(response.text)}
+    assert {
+        "signalos_pipeline_stage_seconds",
+        "signalos_correlation_candidates",
+        "signalos_db_pool_checkout_seconds",
+    } <= families
+
+    assert _sample("signalos_incidents_created_total") == before["created"] + 1
+    assert (
+        _sample("signalos_correlation_decisions_total", outcome="no_match")
+        == before["no_match"] + 1
+    )
+    assert (
+        _sample("signalos_pipeline_stage_seconds_count", stage="features")
+        == before["features"] + 2
+    )
+    assert _sample("signalos_pipeline_stage_seconds_count", stage="commit") == before["commit"] + 2
+    assert (
+        _sample("signalos_ingested_events_total", path="api", outcome="created")
+        == before["api"] + 2
+    )
@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.api.pagination import TotalMode, count_rows
+from app.db import Event, Incident
+
+
+def _walk(client, path: str, params: dict) -> list[str]:
+    ids: list[str] = []
+    cursor = None
+    while True:
+        page = client.get(path, params={**params, **({"cursor": cursor} if cursor else {})}).json()
+        ids.extend(item["id"] for item in page["items"])
+        cursor = page.get("next_cursor")
+        if cursor is None:
+            return ids
+
+
+def test_events_keyset_pagination_handles_ties(api_client) -> None:
+    client, _ = api_client
+    base_time = datetime(2025, 10, 1, 9, tzinfo=timezone.utc)
+    created: list[dict] = []
+    for minutes in (0, 5, 5, 5, 30):
+        occurred_at = base_time + timedelta(minutes=minutes)
+        response = client.post(
+            "/events/",
+            json={
+                "source": "rss",
+                "occurred_at": occurred_at.isoformat(),
+                "received_at": occurred_at.isoformat(),
+                "entity": {"type": "topic", "id": f"t-{len(created)}"},
+                "type": "news",
+                "title": "Headline",
+            },
+        )
+        created.append(response.json())
+
+    first_page = client.get("/events/", params={"limit": 2}).json()
+    assert "total" not in first_page
+    assert len(first_page["items"]) == 2
+
+    newest_first = sorted(created, key=lambda item: (item["occurred_at"], item["id"]), reverse=True)
+    expected = [item["id"] for item in newest_first]
+    assert _walk(client, "/events/", {"limit": 2}) == expected
+    assert client.get("/events/", params={"include_total": "estimate"}).json()["total"] == 5
+    assert client.get("/events/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_incidents_keyset_pagination_orders_nulls_last(api_client) -> None:
+    client, session_factory = api_client
+    now = datetime(2025, 10, 1, 12, tzinfo=timezone.utc)
+    incidents = [
+        Incident(id=uuid.uuid4(), status="open", last_event_at=now),
+        Incident(id=uuid.uuid4(), status="open", last_event_at=now),
+        Incident(id=uuid.uuid4(), status="open", last_event_at=now - timedelta(hours=1)),
+        Incident(id=uuid.uuid4(), status="open", last_event_at=None),
+        Incident(id=uuid.uuid4(), status="open", last_event_at=None),
+    ]
+    with session_factory() as session:
+        session.add_all(incidents)
+        session.commit()
+
+    expected = (
+        sorted(str(incident.id) for incident in incidents[:2])
+        + [str(incidents[2].id)]
+        + sorted(str(incident.id) for incident in incidents[3:])
+    )
+    assert _walk(client, "/incidents/", {"limit": 2}) == expected
+    assert client.get("/incidents/", params={"include_total": "true"}).json()["total"] == 5
+
+
+class _PlanResult:
+    def scalar_one(self) -> list[dict]:
+        return [{"Plan": {"Plan Rows": 42}}]
+
+
+class _PostgresSession:
+    """Records the driver SQL ``count_rows`` sends for an estimate."""
+
+    def __init__(self) -> None:
+        self.dialect = postgresql.dialect()
+        self.sent: list[str] = []
+
+    def get_bind(self) -> "_PostgresSession":
+        return self
+
+    def connection(self) -> "_PostgresSession":
+        return self
+
+    def exec_driver_sql(self, statement: str) -> _PlanResult:
+        self.sent.append(statement)
+        return _PlanResult()
+
+
+def test_estimates_send_literals_with_colons_verbatim() -> None:
+    session = _PostgresSession()
+    stmt = select(Event).where(Event.title == "BTC :up")
+    assert count_rows(session, stmt, TotalMode.estimate) == 42  # type: ignore[arg-type]
+    [sent] = session.sent
+    assert sent.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert "'BTC :up'" in sent
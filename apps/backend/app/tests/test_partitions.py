@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+
+from app.db import Event, EventTag
+from app.db.partitions import ensure_partitions, partition_name, partition_ranges, range_start
+from app.jobs.partitions import apply_retention
+
+NOW = datetime(2025, 10, 15, 13, 30, tzinfo=timezone.utc)  # a Wednesday
+
+
+def test_range_start_aligns_to_day_and_monday() -> None:
+    assert range_start(NOW, "day") == datetime(2025, 10, 15, tzinfo=timezone.utc)
+    assert range_start(NOW, "week") == datetime(2025, 10, 13, tzinfo=timezone.utc)
+    # Naive datetimes are read as UTC.
+    assert range_start(NOW.replace(tzinfo=None), "day") == range_start(NOW, "day")
+
+
+def test_partition_ranges_cover_the_span_without_gaps() -> None:
+    ranges = partition_ranges(NOW, NOW + timedelta(weeks=2), "week")
+    assert len(ranges) == 3
+    assert ranges[0][0] == datetime(2025, 10, 13, tzinfo=timezone.utc)
+    assert all(upper == lower for (_, upper), (lower, _) in zip(ranges, ranges[1:]))
+    assert partition_name("event_tags", ranges[0][0]) == "event_tags_p20251013"
+
+
+def test_sqlite_retention_deletes_old_events(api_client) -> None:
+    client, factory = api_client
+    for age in (40, 10):
+        occurred_at = datetime.now(timezone.utc) - timedelta(days=age)
+        response = client.post(
+            "/events/",
+            json={
+                "source": "fitbit",
+                "occurred_at": occurred_at.isoformat(),
+                "received_at": occurred_at.isoformat(),
+                "entity": {"type": "user", "id": f"user-{age}"},
+                "type": "health_anomaly",
+                "title": "Resting HR high",
+                "tags": ["health"],
+            },
+        )
+        assert response.status_code == 201
+
+    engine = factory.kw["bind"]
+    assert ensure_partitions(engine) == []
+    removed = apply_retention(engine, datetime.now(timezone.utc) - timedelta(days=30))
+    assert removed == 1
+    with factory() as session:
+        assert [e.entity_id for e in session.execute(select(Event)).scalars()] == ["user-10"]
+        assert session.execute(select(func.count(EventTag.id))).scalar() == 1
@@ -0,0 +1,107 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.archive import store as archive_store
+from app.archive.blobs import blob_key
+from app.db import Event
+from app.ingest import dedup
+
+
+@pytest.fixture()
+def blob_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("ARCHIVE_DIR", str(tmp_path / "objects"))
+    monkeypatch.setenv("EVENT_PAYLOAD_INLINE_BYTES", "1024")
+    return tmp_path / "objects"
+
+
+def _post(client, title: str, body: str) -> dict:
+    occurred_at = datetime(2025, 10, 1, 9, tzinfo=timezone.utc).isoformat()
+    response = client.post(
+        "/events/",
+        json={
+            "source": "rss",
+            "occurred_at": occurred_at,
+            "received_at": occurred_at,
+            "entity": {"type": "topic", "id": title},
+            "type": "news",
+            "title": title,
+            "body": body,
+            "links": [{"href": "https://example.com/story", "rel": "source"}],
+            "extras": {"raw": {"html": body}},
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_large_payloads_are_stored_once_and_resolved_on_detail(api_client, blob_dir) -> None:
+    client, factory = api_client
+    body = "lorem ipsum " * 200
+    first = _post(client, "first", body)
+    second = _post(client, "second", body)
+    small = _post(client, "small", "short")
+
+    assert first["payload_ref"] == second["payload_ref"]
+    assert first["body"] == body and first["extras"] == {"raw": {"html": body}}
+    assert "payload_ref" not in small and small["body"] == "short"
+    assert list(blob_dir.rglob("*.json.gz")) == [blob_dir / blob_key(first["payload_ref"])]
+    with factory() as session:
+        row = session.execute(select(Event).where(Event.title == "first")).scalar_one()
+        assert row.body is None and row.payload_ref == first["payload_ref"]
+
+    listed = {item["title"]: item for item in client.get("/events/").json()["items"]}
+    assert "body" not in listed["second"]
+    detail = client.get(f"/events/{second['id']}").json()
+    assert detail["body"] == body
+    assert detail["extras"] == {"raw": {"html": body}}
+    assert detail["links"][0]["rel"] == "source"
+    assert client.get(f"/events/{small['id']}").json()["body"] == "short"
+
+
+def test_unknown_event_is_404(api_client) -> None:
+    client, _ = api_client
+    response = client.get("/events/0b2e4e4e-6c7a-4f94-9f20-8f0b61b9b9a4")
+    assert response.status_code == 404
+
+
+def test_export_resolves_offloaded_payloads(api_client, blob_dir) -> None:
+    client, _ = api_client
+    body = "dolor sit amet " * 200
+    _post(client, "large", body)
+    _post(client, "small", "short")
+
+    lines = client.get("/events/export").text.splitlines()
+    exported = {item["title"]: item for item in map(json.loads, lines)}
+    assert exported["large"]["body"] == body
+    assert exported["large"]["extras"] == {"raw": {"html": body}}
+    assert exported["small"]["body"] == "short" and "payload_ref" not in exported["small"]
+
+
+def test_blobs_are_written_only_once_an_ingest_commits(api_client, blob_dir, monkeypatch) -> None:
+    client, factory = api_client
+    body = "consectetur " * 200
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("ingest failed before commit")
+
+    monkeypatch.setattr(dedup, "update_digests", fail)
+    with pytest.raises(RuntimeError):
+        _post(client, "rolled-back", body)
+    assert list(blob_dir.rglob("*.json.gz")) == []
+
+    monkeypatch.undo()
+    monkeypatch.setenv("ARCHIVE_DIR", str(blob_dir))
+    monkeypatch.setenv("EVENT_PAYLOAD_INLINE_BYTES", "1024")
+
+    def refuse(self, key: str, data: bytes) -> None:
+        raise OSError("object store down")
+
+    monkeypatch.setattr(archive_store.LocalObjectStore, "put", refuse)
+    created = _post(client, "kept-inline", body)
+    assert created["body"] == body
+    with factory() as session:
+        row = session.execute(select(Event).where(Event.title == "kept-inline")).scalar_one()
+        assert row.payload_ref is None and row.body == body
@@ -0,0 +1,118 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import redis
+from prometheus_client import REGISTRY
+
+from app.api import cache as response_cache
+
+BASE_TIME = datetime(2025, 10, 5, 9, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def cached_client(api_client, redis_client, monkeypatch):
+    monkeypatch.setenv("RESPONSE_CACHE_TTL", "30")
+    monkeypatch.setattr(response_cache, "get_redis_client", lambda: redis_client)
+    return api_client[0]
+
+
+def _sample(route: str, outcome: str) -> float:
+    labels = {"route": route, "outcome": outcome}
+    return REGISTRY.get_sample_value("signalos_response_cache_total", labels) or 0.0
+
+
+def _post(client, minutes: int, source: str, entity: str = "acct-1", tags=("finance",)) -> dict:
+    occurred_at = (BASE_TIME + timedelta(minutes=minutes)).isoformat()
+    response = client.post(
+        "/events/",
+        json={
+            "source": source,
+            "occurred_at": occurred_at,
+            "received_at": occurred_at,
+            "entity": {"type": "portfolio", "id": entity},
+            "type": "price_move",
+            "title": f"{source} move {minutes}",
+            "tags": list(tags),
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def _titles(client, **params) -> list[str]:
+    return [item["title"] for item in client.get("/events/", params=params).json()["items"]]
+
+
+def test_ingest_only_invalidates_the_scopes_it_writes(cached_client) -> None:
+    client = cached_client
+    _post(client, 0, "alpaca")
+    _post(client, 1, "rss", entity="feed-1", tags=("news",))
+    hits = _sample("events", "hit")
+
+    assert _titles(client, source="alpaca") == ["alpaca move 0"]
+    assert _titles(client, source="alpaca") == ["alpaca move 0"]
+    assert _titles(client) == ["rss move 1", "alpaca move 0"]
+    assert _sample("events", "hit") == hits + 1
+
+    _post(client, 2, "rss", entity="feed-1", tags=("news",))
+    assert _titles(client, source="alpaca") == ["alpaca move 0"]
+    assert _sample("events", "hit") == hits + 2
+    assert _titles(client) == ["rss move 2", "rss move 1", "alpaca move 0"]
+    assert _titles(client, source="rss", fields="title") == ["rss move 2", "rss move 1"]
+
+    _post(client, 3, "alpaca")
+    assert _titles(client, source="alpaca") == ["alpaca move 3", "alpaca move 0"]
+
+    bypassed = _sample("events", "bypass")
+    client.get("/events/", params={"source": "alpaca"}, headers={"Cache-Control": "no-cache"})
+    assert _sample("events", "bypass") == bypassed + 1
+    assert _sample("events", "hit") == hits + 2
+
+
+def test_correlation_refreshes_incident_listings(cached_client) -> None:
+    client = cached_client
+    _post(client, 0, "alpaca", tags=("finance", "portfolio"))
+    first = _post(client, 2, "rss", tags=("finance",))
+    incident_id = first["incident_id"]
+    assert client.get("/incidents/").json()["items"][0]["event_count"] == 2
+    assert len(_titles(client, incident_id=incident_id)) == 2
+
+    _post(client, 4, "coinbase", tags=("finance", "portfolio"))
+    assert client.get("/incidents/").json()["items"][0]["event_count"] == 3
+    assert len(_titles(client, incident_id=incident_id)) == 3
+
+
+def test_redis_errors_serve_uncached(cached_client, redis_client, monkeypatch) -> None:
+    client = cached_client
+    _post(client, 0, "alpaca")
+
+    def unavailable(*args, **kwargs):
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(redis_client, "mget", unavailable)
+    errors = _sample("incidents", "error")
+    response = client.get("/incidents/")
+    assert response.status_code == 200
+    assert _sample("incidents", "error") == errors + 1
+    assert _titles(client) == ["alpaca move 0"]
+
+
+def test_async_ingest_invalidates_off_the_event_loop(cached_client, monkeypatch) -> None:
+    bump = response_cache._bump
+    on_loop = []
+
+    def recording_bump(scopes) -> None:
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        bump(scopes)
+
+    monkeypatch.setattr(response_cache, "_bump", recording_bump)
+    client = cached_client
+    assert _titles(client, source="alpaca") == []
+    _post(client, 0, "alpaca")
+    assert on_loop == [False]
+    assert _titles(client, source="alpaca") == ["alpaca move 0"]
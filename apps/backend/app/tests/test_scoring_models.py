@@ -0,0 +1,122 @@
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+from app.api.schemas import EntityRef, EventCreate, EventMetricPayload
+from app.db import ModelVersion
+from app.ingest.pipeline import _enrich, _enrich_many
+from app.ingest.scoring_models import ModelRegistry
+from app.services.scoring import DEFAULT_MODEL, ScoringModel
+
+CANDIDATE: dict[str, Any] = {
+    "weights": {"impact": 0.5, "actionability": 0.2, "urgency": 0.2, "personal_relevance": 0.1},
+    "factors": {"urgency": {"features": ["urgency"], "default": 0.1}},
+    "caps": {"impact": 0.8},
+}
+BASE_TIME = datetime(2025, 10, 9, 9, tzinfo=timezone.utc)
+
+
+def _event(rng: random.Random) -> EventCreate:
+    event_type, names = rng.choice(
+        [
+            ("price_move", ["pct_change", "pct_change_5m"]),
+            ("health_anomaly", ["rhr_z", "days_persistent"]),
+            ("news", ["credibility", "topic_relevance", "velocity"]),
+        ]
+    )
+    return EventCreate(
+        source="bench",
+        occurred_at=BASE_TIME,
+        received_at=BASE_TIME,
+        entity=EntityRef(type="asset", id="x"),
+        type=event_type,
+        title="t",
+        metrics=[EventMetricPayload(name=name, value=rng.uniform(-4, 4)) for name in names],
+        extras={"personal_relevance": rng.random()},
+    )
+
+
+def _post(client, minutes: int) -> dict:
+    occurred_at = (BASE_TIME + timedelta(minutes=minutes)).isoformat()
+    response = client.post(
+        "/events/",
+        json={
+            "source": "alpaca",
+            "occurred_at": occurred_at,
+            "received_at": occurred_at,
+            "entity": {"type": "portfolio", "id": f"acct-{minutes}"},
+            "type": "price_move",
+            "title": f"Move {minutes}",
+            "tags": [f"tag-{minutes}"],
+            "metrics": [{"name": "pct_change", "value": 0.9}],
+        },
+    )
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_builtin_model_keeps_the_v1_weights() -> None:
+    features = {"impact_news": 0.3, "urgency": 0.7, "personal_relevance": 0.9}
+    assert DEFAULT_MODEL.score(features) == 0.4 * 0.3 + 0.25 * 0.5 + 0.2 * 0.7 + 0.15 * 0.9
+    with pytest.raises(ValueError, match="unknown factors"):
+        ScoringModel.compile("bad", {"weights": {**CANDIDATE["weights"], "novelty": 0.1}})
+    with pytest.raises(ValueError, match="among"):
+        ScoringModel.compile("bad", {**CANDIDATE, "factors": {"urgency": {"features": ["x"]}}})
+
+
+def test_shadow_scores_match_between_scalar_and_vectorized_paths() -> None:
+    rng = random.Random(3)
+    events = [_event(rng) for _ in range(100)]
+    shadow = ScoringModel.compile("candidate", CANDIDATE)
+    expected = [_enrich(event, None, DEFAULT_MODEL, shadow) for event in events]
+    actual = _enrich_many(events, None, DEFAULT_MODEL, shadow)
+    for want, got in zip(expected, actual):
+        assert got.explain == want.explain
+        assert got.explain["shadow"]["score"] == round(shadow.score(want.features), 6)
+
+
+def test_registered_models_are_promoted_without_restart(api_client) -> None:
+    client, _ = api_client
+    assert client.put("/scoring/models/v2", json=CANDIDATE).status_code == 200
+    assert client.put("/scoring/models/v2", json=CANDIDATE).status_code == 200
+    changed = {**CANDIDATE, "caps": {}}
+    assert client.put("/scoring/models/v2", json=changed).status_code == 409
+    invalid = {"weights": {"impact": 1.0}}
+    assert client.put("/scoring/models/v3", json=invalid).status_code == 422
+    assert client.put("/scoring/models/v9/status", json={"status": "live"}).status_code == 404
+
+    assert "shadow" not in _post(client, 0)["explain"]
+    promoted = client.put("/scoring/models/v2/status", json={"status": "shadow"})
+    assert promoted.json()["status"] == "shadow"
+    shadowed = _post(client, 1)
+    candidate = ScoringModel.compile("v2", CANDIDATE)
+    assert shadowed["explain"]["model"] == DEFAULT_MODEL.version
+    assert shadowed["explain"]["shadow"] == {
+        "model": "v2",
+        "score": round(candidate.score(shadowed["features"]), 6),
+    }
+
+    client.put("/scoring/models/v2/status", json={"status": "live"})
+    live = _post(client, 2)
+    assert live["explain"]["model"] == "v2" and "shadow" not in live["explain"]
+    assert live["score"] == candidate.score(live["features"])
+    assert client.post("/scoring/debug", json=live["features"]).json()["model"] == "v2"
+    listed = client.get("/scoring/models").json()
+    assert [(item["version"], item["status"]) for item in listed] == [("v2", "live")]
+
+
+def test_registry_reloads_after_the_interval(api_client) -> None:
+    client, factory = api_client
+    client.put("/scoring/models/v2", json=CANDIDATE)
+    now = [0.0]
+    registry = ModelRegistry(reload_seconds=10, clock=lambda: now[0])
+    with factory() as session:
+        assert registry.current(session) == (DEFAULT_MODEL, None)
+        session.get(ModelVersion, "v2").status = "live"  # promoted by another process
+        session.commit()
+        now[0] += 5
+        assert registry.current(session)[0] is DEFAULT_MODEL
+        now[0] += 5
+        assert registry.current(session)[0].version == "v2"
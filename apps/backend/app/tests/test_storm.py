@@ -0,0 +1,155 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.api.live import _held_back
+from app.api.schemas import EventCreate
+from app.db import Event
+from app.ingest.pipeline import process_events
+from app.ingest.storm import StormTracker
+
+BASE_TIME = datetime(2025, 10, 7, 9, tzinfo=timezone.utc)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _event(source: str = "alpaca", entity: str = "acct-1") -> EventCreate:
+    return EventCreate.model_validate(
+        {
+            "source": source,
+            "occurred_at": BASE_TIME,
+            "received_at": BASE_TIME,
+            "entity": {"type": "portfolio", "id": entity},
+            "type": "price_move",
+            "title": "Move",
+            "tags": ["finance"],
+        }
+    )
+
+
+def test_bursts_raise_the_threshold_and_route_low_scores_to_the_digest() -> None:
+    clock = FakeClock()
+    tracker = StormTracker(min_rate=10, multiplier=4, clock=clock)
+    calm = tracker.assess(_event(), 0.3)
+    assert (calm.route, calm.storm_key, calm.skip_correlation) == ("digest", None, False)
+    assert calm.explain() == {"route": "digest", "threshold": 0.6}
+
+    for index in range(40):
+        clock.now += 0.5
+        assessment = tracker.assess(_event(entity=f"acct-{index}"), 0.3)
+    assert assessment.storm_key == "source:alpaca"
+    assert assessment.rate and assessment.rate > 10
+    assert assessment.threshold > 0.6
+    assert assessment.skip_correlation and assessment.suppressed
+    assert assessment.explain()["storm"]["key"] == "source:alpaca"
+    assert assessment.explain()["correlation"] == "skipped"
+
+    urgent = tracker.assess(_event(entity="acct-x"), 0.99)
+    assert (urgent.route, urgent.skip_correlation) == ("push", False)
+    assert not tracker.assess(_event(source="rss", entity="feed-1"), 0.3).storm_key
+
+
+def test_steady_volume_becomes_the_baseline() -> None:
+    clock = FakeClock()
+    tracker = StormTracker(min_rate=10, multiplier=4, clock=clock)
+    for _ in range(2 * 3600):
+        clock.now += 1.0  # 60 events/min for two hours
+        steady = tracker.assess(_event(entity=f"acct-{int(clock.now) % 100}"), 0.3)
+    assert steady.storm_key is None
+
+    for _ in range(600):
+        clock.now += 0.05  # 1200 events/min
+        spike = tracker.assess(_event(entity=f"acct-{int(clock.now * 20) % 100}"), 0.3)
+    assert spike.storm_key == "source:alpaca"
+
+
+def test_storming_events_skip_correlation(api_client, monkeypatch) -> None:
+    monkeypatch.setenv("STORM_MIN_RATE", "5")
+    client, _ = api_client
+    items = []
+    for minutes in range(12):
+        occurred_at = (BASE_TIME + timedelta(minutes=minutes)).isoformat()
+        response = client.post(
+            "/events/",
+            json={
+                "source": "alpaca",
+                "occurred_at": occurred_at,
+                "received_at": occurred_at,
+                "entity": {"type": "portfolio", "id": "acct-1"},
+                "type": "price_move",
+                "title": f"Move {minutes}",
+                "tags": ["finance"],
+            },
+        )
+        items.append(response.json())
+
+    delivery = [item["explain"]["delivery"] for item in items]
+    assert all(entry["route"] == "digest" for entry in delivery)
+    assert "storm" not in delivery[0] and items[1]["incident_id"]
+    assert delivery[-1]["storm"]["key"] in ("source:alpaca", "entity:portfolio:acct-1")
+    assert delivery[-1]["correlation"] == "skipped" and "incident_id" not in items[-1]
+    listed = client.get("/events/", params={"source": "alpaca"}).json()["items"]
+    incident = client.get("/incidents/").json()["items"][0]
+    assert incident["event_count"] == sum(1 for item in listed if "incident_id" in item) < 12
+
+
+def test_held_back_events_are_not_pushed() -> None:
+    storm = {
+        "route": "digest",
+        "threshold": 0.8,
+        "storm": {"key": "source:alpaca", "rate_per_min": 40.0},
+    }
+    assert _held_back(Event(explain={"delivery": storm}))
+    assert not _held_back(Event(explain={"delivery": {"route": "digest", "threshold": 0.6}}))
+    assert not _held_back(Event(explain={}))
+
+
+@pytest.mark.parametrize("index", ["off", "on"])
+def test_held_back_events_stay_correlation_candidates(api_client, monkeypatch, index) -> None:
+    monkeypatch.setenv("STORM_MIN_RATE", "5")
+    monkeypatch.setenv("CORRELATION_INDEX", index)
+    client, _ = api_client
+    now = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(minutes=20)
+
+    def post(minutes: int, source: str, entity: str) -> dict:
+        occurred_at = (now + timedelta(minutes=minutes)).isoformat()
+        return client.post(
+            "/events/",
+            json={
+                "source": source,
+                "occurred_at": occurred_at,
+                "received_at": occurred_at,
+                "entity": {"type": "portfolio", "id": entity},
+                "type": "price_move",
+                "title": f"{source} move {minutes}",
+                "tags": ["finance"],
+            },
+        ).json()
+
+    items = [post(minutes, "alpaca", "acct-1") for minutes in range(12)]
+    assert items[-1]["explain"]["delivery"]["correlation"] == "skipped"
+    calm = post(12, "rss", "acct-2")
+
+    # The newest candidate is the held-back event, so a new incident pairs it with ``calm``.
+    assert calm["incident_id"] != items[1]["incident_id"]
+    listed = client.get("/events/", params={"source": "alpaca"}).json()["items"]
+    [held_back] = [item for item in listed if item["id"] == items[-1]["id"]]
+    assert held_back["incident_id"] == calm["incident_id"]
+
+
+def test_batches_keep_held_back_events_as_candidates(api_client, monkeypatch) -> None:
+    monkeypatch.setenv("STORM_MIN_RATE", "5")
+    _, session_factory = api_client
+    events = [_event(entity="acct-1") for _ in range(12)]
+    events.append(_event(source="rss", entity="acct-2"))
+    with session_factory() as session:
+        results = process_events(events, session)
+    assert results[-2].suppressed and not results[-1].suppressed
+    assert results[-1].incident_id is not None
+    assert results[-2].incident_id == results[-1].incident_id != results[1].incident_id
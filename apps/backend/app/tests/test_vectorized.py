@@ -0,0 +1,84 @@
+import random
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.api.schemas import EntityRef, EventCreate, EventMetricPayload
+from app.ingest.pipeline import _enrich, _enrich_many, score_events
+from app.services.vectorized import round6
+
+TYPES = ["price_move", "health_anomaly", "news", "health_alert"]
+
+
+def _random_event(rng: random.Random) -> EventCreate:
+    event_type = rng.choice(TYPES)
+    names = {
+        "price_move": ["pct_change", "pct_change_5m"],
+        "health_anomaly": ["rhr_z", "days_persistent"],
+        "news": ["credibility", "topic_relevance", "velocity", "has_action"],
+        "health_alert": ["pct_change"],
+    }[event_type]
+    metrics = [
+        EventMetricPayload(name=name, value=round(rng.uniform(-4, 4), rng.randint(0, 6)))
+        for name in names
+        if rng.random() < 0.8
+    ]
+    extras = {
+        key: value
+        for key, value in (
+            ("portfolio_exposure", rng.uniform(0, 2)),
+            ("market_open", rng.choice([True, False, "false", 1])),
+            ("personal_relevance", rng.random()),
+        )
+        if rng.random() < 0.7
+    }
+    now = datetime(2025, 10, 1, tzinfo=timezone.utc)
+    return EventCreate(
+        source="bench",
+        occurred_at=now,
+        received_at=now,
+        entity=EntityRef(type="asset", id="x"),
+        type=event_type,
+        title="t",
+        metrics=metrics,
+        extras=extras,
+    )
+
+
+def test_vectorized_results_match_scalar_pipeline() -> None:
+    rng = random.Random(7)
+    events = [_random_event(rng) for _ in range(500)]
+    expected = [_enrich(event) for event in events]
+    actual = _enrich_many(events)
+    for want, got in zip(expected, actual):
+        assert list(got.features.items()) == list(want.features.items())
+        assert got.score == want.score
+        assert got.explain == want.explain
+
+
+def test_scoring_batch_endpoint(api_client) -> None:
+    client, _ = api_client
+    rng = random.Random(11)
+    events = [_random_event(rng) for _ in range(20)]
+    response = client.post("/scoring/batch", json=[e.model_dump(mode="json") for e in events])
+    assert response.status_code == 200
+    data = response.json()
+    assert data["scores"] == score_events(events).scores.tolist()
+    assert data["scores"] == [_enrich(event).score for event in events]
+    for position, event in enumerate(events):
+        scalar = _enrich(event)
+        present = {
+            name: column[position]
+            for name, column in data["features"].items()
+            if column[position] is not None
+        }
+        assert present == scalar.features
+        assert data["top_factors"][position] == scalar.explain["top_factor"]
+
+
+def test_round6_matches_builtin_round() -> None:
+    rng = np.random.default_rng(3)
+    values = np.concatenate(
+        [rng.uniform(-2, 2, 20_000), (np.arange(-5_000, 5_000) + 0.5) / 1e6, [1e12, np.inf]]
+    )
+    assert round6(values).tolist() == [round(value, 6) for value in values.tolist()]
@@ -0,0 +1,13 @@
+"""Datetime helpers shared across the app; imports nothing beyond the standard library."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+
+def utc(value: datetime) -> datetime:
+    """``value`` as an aware UTC datetime; naive values (SQLite) are taken to be UTC."""
+
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
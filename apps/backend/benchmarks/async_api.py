@@ -0,0 +1,125 @@
+"""Concurrent request throughput of the async list route vs. a sync threadpool route.
+
+Both routes run the same ``GET /events`` query. The sync variant blocks a threadpool
+thread per request (the previous behaviour); the async variant is the production route.
+
+    python -m benchmarks.async_api --rows 5000 --concurrency 10 50 200
+    python -m benchmarks.async_api --database-url postgresql+psycopg://localhost/signalos
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterator
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+
+from app.api.routes import events
+from app.api.schemas import EventResponse
+from app.db import Base, Event
+from app.db.session import get_async_session, to_async_url
+from benchmarks.correlation import seed
+
+
+def _pool_options(url: str) -> dict:
+    return {} if url.startswith("sqlite") else {"pool_size": 20, "max_overflow": 0}
+
+
+def build_app(url: str) -> FastAPI:
+    engine = create_engine(url, future=True, **_pool_options(url))
+    factory = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+    async_factory = async_sessionmaker(
+        bind=create_async_engine(to_async_url(url), **_pool_options(url)),
+        expire_on_commit=False,
+    )
+
+    def sync_session() -> Iterator[Session]:
+        with factory() as session:
+            yield session
+
+    async def async_session() -> AsyncIterator[AsyncSession]:
+        async with async_factory() as session:
+            yield session
+
+    app = FastAPI()
+    app.include_router(events.router, prefix="/events")
+    app.dependency_overrides[get_async_session] = async_session
+
+    @app.get("/sync/events")
+    def sync_list(session: Session = Depends(sync_session)) -> list[EventResponse]:
+        stmt = (
+            select(Event)
+            .options(selectinload(Event.metrics), selectinload(Event.tag_rows))
+            .order_by(Event.occurred_at.desc(), Event.id.desc())
+            .limit(50)
+        )
+        return [EventResponse.model_validate(row) for row in session.execute(stmt).scalars()]
+
+    return app
+
+
+async def hammer(app: FastAPI, path: str, concurrency: int, requests: int) -> tuple[float, float]:
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    queue: asyncio.Queue[None] = asyncio.Queue()
+    for _ in range(requests):
+        queue.put_nowait(None)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker() -> None:
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(path, params={"limit": 50})
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    latencies.sort()
+    return requests / elapsed, latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite+pysqlite:///{tmp}/bench.db"
+        engine = create_engine(url, future=True)
+        Base.metadata.create_all(engine)
+        with sessionmaker(bind=engine, future=True)() as session:
+            seed(session, args.rows)
+        engine.dispose()
+        app = build_app(url)
+
+        print(
+            f"{'concurrency':>11} {'sync rps':>9} {'sync p95':>9}"
+            f" {'async rps':>10} {'async p95':>10}"
+        )
+        for concurrency in args.concurrency:
+            sync_rps, sync_p95 = asyncio.run(
+                hammer(app, "/sync/events", concurrency, args.requests)
+            )
+            async_rps, async_p95 = asyncio.run(hammer(app, "/events/", concurrency, args.requests))
+            print(
+                f"{concurrency:>11} {sync_rps:>9.0f} {sync_p95:>8.1f}ms"
+                f" {async_rps:>10.0f} {async_p95:>9.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Correlation candidate selection latency vs. window density.
+
+Compares the original candidate scan (latest 50 events in the window, ``should_merge``
+in Python, one ``session.get`` per candidate incident) with the predicate-pushdown query
+used by the pipeline's SQL path.
+
+    python -m benchmarks.correlation --densities 100 1000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, selectinload, sessionmaker
+
+from app.api.schemas import EventCreate
+from app.db import Base, Event, EventTag, Incident
+from app.ingest.pipeline import _event_view, process_event
+from app.services.correlate import should_merge
+
+BASE_TIME = datetime(2025, 1, 1, 12, tzinfo=timezone.utc)
+
+
+def legacy_correlate(event: EventCreate, session: Session) -> uuid.UUID | None:
+    stmt = (
+        select(Event)
+        .options(selectinload(Event.tag_rows))
+        .where(Event.occurred_at >= event.occurred_at - timedelta(minutes=15))
+        .where(Event.occurred_at <= event.occurred_at + timedelta(minutes=15))
+        .order_by(Event.occurred_at.desc())
+        .limit(50)
+    )
+    new_view = _event_view(event)
+    for candidate in session.execute(stmt).unique().scalars().all():
+        if should_merge(_event_view(candidate), new_view):
+            if candidate.incident_id is not None:
+                incident = session.get(Incident, candidate.incident_id)
+                if incident is None or incident.status != "open":
+                    continue
+                return incident.id
+            return candidate.id
+    return None
+
+
+def seed(session: Session, density: int) -> None:
+    """Fill the ±15 minute window with ``density`` unrelated events, half on incidents."""
+
+    incidents = [{"id": uuid.uuid4(), "status": "open"} for _ in range(max(1, density // 20))]
+    session.execute(insert(Incident), incidents)
+    rows = []
+    for i in range(density):
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "source": "bench",
+                "occurred_at": BASE_TIME + timedelta(seconds=(i * 1800 // density) - 900),
+                "received_at": BASE_TIME,
+                "entity_type": "asset",
+                "entity_id": f"noise-{i}",
+                "type": "price_move",
+                "title": "noise",
+                "links": [],
+                "extras": {},
+                "features": {},
+                "explain": {},
+                "score": 0.1,
+                "incident_id": incidents[i % len(incidents)]["id"] if i % 2 else None,
+            }
+        )
+    session.execute(insert(Event), rows)
+    session.execute(
+        insert(EventTag),
+        [
+            {"event_id": row["id"], "occurred_at": row["occurred_at"], "value": f"tag-{i}"}
+            for i, row in enumerate(rows)
+        ],
+    )
+    target = EventCreate.model_validate(_payload(BASE_TIME - timedelta(minutes=14)))
+    session.add(
+        Event(
+            source="bench",
+            occurred_at=target.occurred_at,
+            received_at=target.received_at,
+            entity_type="asset",
+            entity_id="target",
+            type="price_move",
+            title="target",
+        )
+    )
+    session.commit()
+
+
+def _payload(occurred_at: datetime) -> dict:
+    return {
+        "source": "bench",
+        "occurred_at": occurred_at.isoformat(),
+        "received_at": occurred_at.isoformat(),
+        "entity": {"type": "asset", "id": "target"},
+        "type": "price_move",
+        "title": "target",
+    }
+
+
+def measure(
+    factory: sessionmaker[Session], fn: Callable[[EventCreate, Session], object], repeat: int
+) -> tuple[float, bool]:
+    event = EventCreate.model_validate(_payload(BASE_TIME))
+    samples = []
+    matched = False
+    for _ in range(repeat):
+        with factory() as session:
+            start = time.perf_counter()
+            matched = fn(event, session) is not None
+            samples.append((time.perf_counter() - start) * 1000)
+            session.rollback()
+    return statistics.median(samples), matched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--densities", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=25)
+    args = parser.parse_args()
+    os.environ["CORRELATION_INDEX"] = "off"
+
+    print(f"{'density':>8} {'before ms':>10} {'match':>6} {'after ms':>10} {'match':>6}")
+    for density in args.densities:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite+pysqlite:///{tmp}/bench.db", future=True)
+            Base.metadata.create_all(engine)
+            factory = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+            with factory() as session:
+                seed(session, density)
+            before, before_match = measure(factory, legacy_correlate, args.repeat)
+            after, after_match = measure(
+                factory, lambda e, s: process_event(e, s).incident_id, args.repeat
+            )
+            engine.dispose()
+        print(f"{density:>8} {before:>10.2f} {before_match!s:>6} {after:>10.2f} {after_match!s:>6}")
+
+
+if __name__ == "__main__":
+    main()
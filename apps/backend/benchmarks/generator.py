@@ -0,0 +1,172 @@
+"""Seeded synthetic CES workload for the benchmarks.
+
+``WorkloadSpec`` controls how many sources and entities exist, how large the tag
+vocabulary is and how often events share its hot tags, and how densely events fall in
+time. The same spec and seed always produce the same events, so numbers from different
+commits are measured against identical data.
+"""
+
+from __future__ import annotations
+
+import random
+import uuid
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.engine import Engine
+
+from app.api.schemas import EventCreate
+from app.db import Event, EventTag, Incident
+from app.ingest.pipeline import fingerprint_event
+
+EVENT_SHAPES = [
+    ("price_move", "asset", ["pct_change", "pct_change_5m"]),
+    ("health_anomaly", "user", ["rhr_z", "days_persistent"]),
+    ("news", "topic", ["credibility", "topic_relevance", "velocity"]),
+]
+
+
+@dataclass(frozen=True)
+class WorkloadSpec:
+    sources: int = 8
+    entities: int = 1_000
+    tags: int = 200
+    tags_per_event: int = 2
+    tag_overlap: float = 0.2  # chance each tag comes from the hot 5% of the vocabulary
+    density: float = 60.0  # events per minute, i.e. ~30x this many per correlation window
+    incident_share: float = 0.3  # fraction of seeded events already attached to an incident
+    seed: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class EventGenerator:
+    """Deterministic stream of CES payloads for a ``WorkloadSpec``."""
+
+    def __init__(self, spec: WorkloadSpec) -> None:
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self._hot_tags = max(1, spec.tags // 20)
+
+    @property
+    def spacing(self) -> timedelta:
+        return timedelta(minutes=1) / self.spec.density
+
+    def payload(self, occurred_at: datetime) -> dict[str, Any]:
+        rng = self.rng
+        event_type, entity_type, metric_names = rng.choice(EVENT_SHAPES)
+        entity = rng.randrange(self.spec.entities)
+        vocabulary = [
+            self._hot_tags if rng.random() < self.spec.tag_overlap else self.spec.tags
+            for _ in range(self.spec.tags_per_event)
+        ]
+        tags = {f"tag-{rng.randrange(size)}" for size in vocabulary}
+        return {
+            "source": f"source-{rng.randrange(self.spec.sources)}",
+            "occurred_at": occurred_at,
+            "received_at": occurred_at + timedelta(seconds=rng.uniform(0, 5)),
+            "entity": {"type": entity_type, "id": f"{entity_type}-{entity}"},
+            "type": event_type,
+            "title": f"{event_type} {entity}",
+            "tags": sorted(tags),
+            "metrics": [
+                {"name": name, "value": round(rng.uniform(-3, 3), 4)} for name in metric_names
+            ],
+            "extras": {"portfolio_exposure": round(rng.random(), 3)},
+        }
+
+    def events(self, count: int, start: datetime) -> Iterator[EventCreate]:
+        """Yield ``count`` validated events spaced by ``spacing`` from ``start`` on."""
+
+        for position in range(count):
+            yield EventCreate.model_validate(self.payload(start + self.spacing * position))
+
+
+def bulk_load(engine: Engine, generator: EventGenerator, count: int, end: datetime) -> None:
+    """Insert ``count`` events ending at ``end`` with Core inserts, bypassing the pipeline.
+
+    A share of the events is attached to incidents whose counters match their events, so
+    list and correlation queries see realistic incident joins.
+    """
+
+    spec = generator.spec
+    start = end - generator.spacing * count
+    incidents: dict[uuid.UUID, dict[str, Any]] = {}
+    chunk_size = 10_000
+    with engine.begin() as connection:
+        for offset in range(0, count, chunk_size):
+            opened = len(incidents)
+            events: list[dict[str, Any]] = []
+            tags: list[dict[str, Any]] = []
+            chunk_start = start + generator.spacing * offset
+            for event in generator.events(min(chunk_size, count - offset), chunk_start):
+                event_id = uuid.uuid4()
+                incident_id = None
+                if generator.rng.random() < spec.incident_share:
+                    incident_id = _incident_for(generator, incidents, event)
+                events.append(
+                    {
+                        "id": event_id,
+                        "source": event.source,
+                        "occurred_at": event.occurred_at,
+                        "received_at": event.received_at,
+                        "entity_type": event.entity.type,
+                        "entity_id": event.entity.id,
+                        "type": event.type,
+                        "title": event.title,
+                        "links": [],
+                        "extras": event.extras,
+                        "features": {},
+                        "explain": {},
+                        "score": round(generator.rng.random(), 4),
+                        "incident_id": incident_id,
+                        "fingerprint": fingerprint_event(event),
+                    }
+                )
+                tags.extend(
+                    {"event_id": event_id, "occurred_at": event.occurred_at, "value": tag}
+                    for tag in event.tags
+                )
+            new_incidents = [{"id": key, "status": "open"} for key in list(incidents)[opened:]]
+            if new_incidents:
+                connection.execute(insert(Incident), new_incidents)
+            connection.execute(insert(Event), events)
+            connection.execute(insert(EventTag), tags)
+        if incidents:
+            connection.execute(
+                update(Incident).where(Incident.id == bindparam("incident_id")),
+                [
+                    {"incident_id": key, **{k: v for k, v in values.items() if k != "id"}}
+                    for key, values in incidents.items()
+                ],
+            )
+
+
+def _incident_for(
+    generator: EventGenerator, incidents: dict[uuid.UUID, dict[str, Any]], event: EventCreate
+) -> uuid.UUID:
+    # About 20 seeded events per incident, consecutive in time.
+    if not incidents or generator.rng.random() < 0.05:
+        incident_id = uuid.uuid4()
+        incidents[incident_id] = {
+            "id": incident_id,
+            "status": "open",
+            "score": 0.0,
+            "first_event_at": event.occurred_at,
+            "last_event_at": event.occurred_at,
+            "event_count": 0,
+            "sources": [],
+            "tag_counts": {},
+        }
+    incident = incidents[next(reversed(incidents))]
+    incident["last_event_at"] = event.occurred_at
+    incident["event_count"] += 1
+    if event.source not in incident["sources"]:
+        incident["sources"] = sorted([*incident["sources"], event.source])
+    for tag in event.tags:
+        incident["tag_counts"][tag] = incident["tag_counts"].get(tag, 0) + 1
+    return incident["id"]
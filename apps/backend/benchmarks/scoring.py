@@ -0,0 +1,88 @@
+"""Scalar ``feature_vector`` + ``score`` loop vs. the vectorized scoring engine.
+
+Both sides start from validated ``EventCreate`` objects and end with per-event features,
+score and explain payloads, i.e. what the pipeline stores.
+
+    python -m benchmarks.scoring --sizes 10 100 1000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable, Sequence
+from datetime import datetime, timezone
+
+from app.api.schemas import EntityRef, EventCreate, EventMetricPayload
+from app.ingest import pipeline
+
+NOW = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def make_events(count: int, seed: int = 0) -> list[EventCreate]:
+    rng = random.Random(seed)
+    shapes = [
+        ("price_move", ["pct_change", "pct_change_5m"]),
+        ("health_anomaly", ["rhr_z", "days_persistent"]),
+        ("news", ["credibility", "topic_relevance", "velocity"]),
+    ]
+    events = []
+    for _ in range(count):
+        event_type, names = rng.choice(shapes)
+        events.append(
+            EventCreate(
+                source="bench",
+                occurred_at=NOW,
+                received_at=NOW,
+                entity=EntityRef(type="asset", id="x"),
+                type=event_type,
+                title="bench",
+                metrics=[EventMetricPayload(name=name, value=rng.uniform(-3, 3)) for name in names],
+                extras={"portfolio_exposure": rng.random()},
+            )
+        )
+    return events
+
+
+def measure(
+    fn: Callable[[Sequence[EventCreate]], object], events: list[EventCreate], repeat: int
+) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(events)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def scalar(events: Sequence[EventCreate]) -> list[pipeline.PipelineResult]:
+    return [pipeline._enrich(event) for event in events]
+
+
+def vectorized(events: Sequence[EventCreate]) -> list[pipeline.PipelineResult]:
+    threshold, pipeline.VECTORIZE_MIN_BATCH = pipeline.VECTORIZE_MIN_BATCH, 0
+    try:
+        return pipeline._enrich_many(events)
+    finally:
+        pipeline.VECTORIZE_MIN_BATCH = threshold
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"{'events':>8} {'scalar ms':>10} {'vector ms':>10} {'arrays ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        events = make_events(size)
+        before = measure(scalar, events, args.repeat)
+        after = measure(vectorized, events, args.repeat)
+        arrays = measure(pipeline.score_events, events, args.repeat)
+        print(f"{size:>8} {before:>10.2f} {after:>10.2f} {arrays:>10.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Ingest and query benchmarks over a seeded synthetic workload, saved as JSON.
+
+For every row count the target database is recreated, bulk-loaded from
+``benchmarks.generator`` and then measured: correlation latency (index and SQL paths),
+list-endpoint latency, and ingest throughput through the API. Results carry the git
+commit so runs can be compared with ``--baseline``.
+
+    python -m benchmarks.suite --rows 10000 100000 1000000
+    python -m benchmarks.suite --database-url postgresql+psycopg://localhost/signalos_bench
+    python -m benchmarks.suite --rows 10000 --baseline bench-sqlite-1a2b3c4.json
+
+``--database-url`` is dropped and recreated; point it at a scratch database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import sqlalchemy
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.db import Base
+from app.db.session import get_async_session, get_session, to_async_url
+from app.ingest import correlation_index, dedup
+from app.ingest.correlation_index import get_correlation_index
+from app.ingest.pipeline import process_event
+from app.main import app
+from benchmarks.generator import EventGenerator, WorkloadSpec, bulk_load
+
+INGEST_BATCH = 100
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50": round(cuts[49], 3),
+        "p95": round(cuts[94], 3),
+        "p99": round(cuts[98], 3),
+        "mean": round(statistics.fmean(samples), 3),
+    }
+
+
+def timed(fn: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def reset(engine: Engine) -> None:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    # In-process state is keyed by database URL and would outlive the dropped tables.
+    correlation_index._indexes.clear()
+    dedup._caches.clear()
+
+
+@contextmanager
+def api_client(url: str) -> Iterator[TestClient]:
+    engine = create_engine(url, future=True)
+    factory = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+    async_options = {"poolclass": NullPool} if url.startswith("sqlite") else {}
+    async_factory = async_sessionmaker(
+        bind=create_async_engine(to_async_url(url), **async_options), expire_on_commit=False
+    )
+
+    def sync_session() -> Iterator[Session]:
+        with factory() as session:
+            yield session
+
+    async def async_session() -> AsyncIterator[AsyncSession]:
+        async with async_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_session] = sync_session
+    app.dependency_overrides[get_async_session] = async_session
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+        app.dependency_overrides.pop(get_async_session, None)
+        engine.dispose()
+
+
+def bench_correlation(
+    factory: sessionmaker[Session], generator: EventGenerator, start: datetime, samples: int
+) -> dict[str, Any]:
+    """``process_event`` latency for events inside the seeded window, rolled back each time."""
+
+    events = list(generator.events(samples, start))
+    results: dict[str, Any] = {}
+    previous = os.environ.get("CORRELATION_INDEX")
+    try:
+        for mode in ("on", "off"):
+            os.environ["CORRELATION_INDEX"] = mode
+            with factory() as session:
+                if mode == "on":
+                    warm_ms = timed(lambda: get_correlation_index(session))
+                    results["index_warm_ms"] = round(warm_ms, 3)
+                latencies = []
+                for event in events:
+                    latencies.append(timed(lambda: process_event(event, session)))
+                    session.rollback()
+            results["index" if mode == "on" else "sql"] = percentiles(latencies)
+    finally:
+        if previous is None:
+            os.environ.pop("CORRELATION_INDEX", None)
+        else:
+            os.environ["CORRELATION_INDEX"] = previous
+    return results
+
+
+def bench_lists(client: TestClient, spec: WorkloadSpec, repeat: int) -> dict[str, Any]:
+    def get(path: str, **params: Any) -> dict[str, Any]:
+        response = client.get(path, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def walk(path: str, pages: int) -> list[float]:
+        """Page through ``path`` by cursor, starting over at the end, ``pages`` times."""
+
+        latencies, cursor = [], None
+        for _ in range(pages):
+            start = time.perf_counter()
+            page = get(path, limit=50, **({"cursor": cursor} if cursor else {}))
+            latencies.append((time.perf_counter() - start) * 1000)
+            cursor = page.get("next_cursor")
+        return latencies
+
+    queries: dict[str, Callable[[], object]] = {
+        "events_first_page": lambda: get("/events/", limit=50),
+        "events_by_entity": lambda: get("/events/", entity_type="asset", entity_id="asset-1"),
+        "events_by_tag": lambda: get("/events/", tag="tag-0"),
+        "events_exact_total": lambda: get("/events/", include_total="true"),
+        "events_estimated_total": lambda: get("/events/", include_total="estimate"),
+        "incidents_first_page": lambda: get("/incidents/", limit=50),
+    }
+    results = {
+        name: percentiles([timed(fn) for _ in range(repeat)]) for name, fn in queries.items()
+    }
+    results["events_cursor_walk"] = percentiles(walk("/events/", repeat))
+    results["incidents_cursor_walk"] = percentiles(walk("/incidents/", repeat))
+    return results
+
+
+def bench_ingest(
+    client: TestClient, generator: EventGenerator, start: datetime, count: int
+) -> dict[str, Any]:
+    single = list(generator.events(count, start))
+    elapsed = timed(
+        lambda: [
+            client.post("/events/", content=event.model_dump_json()).raise_for_status()
+            for event in single
+        ]
+    )
+    batched = [
+        event.model_dump(mode="json")
+        for event in generator.events(count, start + generator.spacing * count)
+    ]
+    batch_elapsed = timed(
+        lambda: [
+            client.post(
+                "/events/batch", json=batched[offset : offset + INGEST_BATCH]
+            ).raise_for_status()
+            for offset in range(0, len(batched), INGEST_BATCH)
+        ]
+    )
+    return {
+        "single_events_per_sec": round(count / (elapsed / 1000), 1),
+        "batch_events_per_sec": round(count / (batch_elapsed / 1000), 1),
+        "batch_size": INGEST_BATCH,
+    }
+
+
+def run(url: str, rows: int, spec: WorkloadSpec, args: argparse.Namespace) -> dict[str, Any]:
+    engine = create_engine(url, future=True)
+    reset(engine)
+    # Seeded data ends just before "now" so the newest hour is inside the correlation index.
+    end = datetime.now(timezone.utc) - timedelta(minutes=20)
+    generator = EventGenerator(spec)
+    load_ms = timed(lambda: bulk_load(engine, generator, rows, end))
+    factory = sessionmaker(bind=engine, expire_on_commit=False, future=True)
+    result: dict[str, Any] = {"rows": rows, "load_seconds": round(load_ms / 1000, 2)}
+    result["correlation_ms"] = bench_correlation(
+        factory, generator, end - timedelta(minutes=10), args.samples
+    )
+    with api_client(url) as client:
+        result["list_ms"] = bench_lists(client, spec, args.samples)
+        result["ingest"] = bench_ingest(client, generator, end, args.ingest)
+    engine.dispose()
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(value: Any, prefix: str = "") -> dict[str, float]:
+    if isinstance(value, dict):
+        flat: dict[str, float] = {}
+        for key, item in value.items():
+            flat.update(flatten(item, f"{prefix}.{key}" if prefix else str(key)))
+        return flat
+    return {prefix: value} if isinstance(value, (int, float)) else {}
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any]) -> None:
+    before = {f"{r['rows']}.{k}": v for r in baseline["results"] for k, v in flatten(r).items()}
+    after = {f"{r['rows']}.{k}": v for r in current["results"] for k, v in flatten(r).items()}
+    commits = (baseline["meta"]["commit"], current["meta"]["commit"])
+    print(f"\n{'metric':<48} {commits[0]:>10} {commits[1]:>10} {'ratio':>7}")
+    for key in sorted(before.keys() & after.keys()):
+        if key.endswith(".rows") or before[key] == 0:
+            continue
+        print(f"{key:<48} {before[key]:>10} {after[key]:>10} {after[key] / before[key]:>7.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="scratch database (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--samples", type=int, default=200, help="latency samples per metric")
+    parser.add_argument("--ingest", type=int, default=1_000, help="events per ingest mode")
+    parser.add_argument("--sources", type=int, default=WorkloadSpec.sources)
+    parser.add_argument("--entities", type=int, default=WorkloadSpec.entities)
+    parser.add_argument("--tags", type=int, default=WorkloadSpec.tags)
+    parser.add_argument("--tag-overlap", type=float, default=WorkloadSpec.tag_overlap)
+    parser.add_argument("--density", type=float, default=WorkloadSpec.density)
+    parser.add_argument("--seed", type=int, default=WorkloadSpec.seed)
+    parser.add_argument("--output", type=Path, help="JSON results path")
+    parser.add_argument("--baseline", type=Path, help="earlier results to compare against")
+    args = parser.parse_args()
+    # Synthetic ingest is one long burst; storm control would skip correlation for most of it.
+    os.environ.setdefault("STORM_CONTROL", "off")
+    os.environ.setdefault("CORRELATION_INDEX_SYNC", "off")  # the suite is the only writer
+    spec = WorkloadSpec(
+        sources=args.sources,
+        entities=args.entities,
+        tags=args.tags,
+        tag_overlap=args.tag_overlap,
+        density=args.density,
+        seed=args.seed,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite+pysqlite:///{tmp}/bench.db"
+        backend = sqlalchemy.engine.make_url(url).get_backend_name()
+        report: dict[str, Any] = {
+            "meta": {
+                "commit": git_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "backend": backend,
+                "python": platform.python_version(),
+                "sqlalchemy": sqlalchemy.__version__,
+                "spec": spec.as_dict(),
+                "samples": args.samples,
+                "ingest": args.ingest,
+            },
+            "results": [],
+        }
+        for rows in args.rows:
+            result = run(url, rows, spec, args)
+            report["results"].append(result)
+            print(json.dumps(result, indent=2))
+
+    output = args.output or Path(f"bench-{backend}-{report['meta']['commit']}.json")
+    output.write_text(json.dumps(report, indent=2) + "\n")
+    print(f"results written to {output}")
+    if args.baseline:
+        compare(json.loads(args.baseline.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()